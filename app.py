@@ -1,11 +1,26 @@
 # ==============================================================
 # 📊 DASHBOARD CVM - Indicadores Financeiros (VERSÃO FINAL CORRIGIDA)
 # ==============================================================
+import os
+import time
+
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 import numpy as np
-import os
+
+from cvm_indicators import (
+    comparacao, cubo, exportacao, instrumentacao, janelas, particoes, pontuacao, qualidade, snapshot
+)
+from cvm_indicators.atualizacao import Atualizador
+from cvm_indicators.cache_figuras import CacheFiguras
+from cvm_indicators.cenarios import COLUNAS_BASE, BaseCenarios
+from cvm_indicators.compartilhado import DatasetCompartilhado
+from cvm_indicators.fonte import CAMINHOS_POSSIVEIS, localizar_planilha
+from cvm_indicators.instrumentacao import Metricas, em_cache
+from cvm_indicators.paginacao import Paginador, total_paginas
+from cvm_indicators.tipos import RAZOES, compactar
+from cvm_indicators.ranking import IndiceRanking
 
 # ==============================
 # CONFIGURAÇÕES INICIAIS
@@ -13,237 +28,228 @@ import os
 st.set_page_config(page_title="Dashboard CVM - Indicadores", layout="wide")
 st.title("📊 Dashboard CVM - Análise de Indicadores Financeiros")
 
+# Instrumentação opt-in: CVM_DEBUG=1 (ou ?debug=1) mede tempo por seção;
+# "memoria" também mede o pico de alocações (tracemalloc deixa tudo mais lento)
+MODO_DEBUG = os.environ.get("CVM_DEBUG") or st.query_params.get("debug")
+medicao = instrumentacao.iniciar(
+    ativo=MODO_DEBUG in ("1", "memoria"), memoria=MODO_DEBUG == "memoria"
+)
+
 # ==============================
 # LEITURA DE DADOS
 # ==============================
-@st.cache_data
-def load_data():
-    # Procurar automaticamente o arquivo em locais possíveis
-    possible_paths = [
-        "/content/data_frame.xlsx",   # Google Colab
-        "data_frame.xlsx",            # mesma pasta do app
-        "./data/data_frame.xlsx"      # subpasta data/
-    ]
-    data_path = None
-    for path in possible_paths:
-        if os.path.exists(path):
-            data_path = path
-            break
+# Indicadores usados por cada tela: o motor calcula/carrega só esse subgrafo
+INDICADORES_RANKING = ["ROE", "ROA", "ROI", "Margem Líquida", "wacc"]
+INDICADORES_EMPRESA = [
+    "ROE", "ROA", "ROI", "ROI EBITDA", "Margem Bruta", "Margem Operacional", "Margem Líquida",
+    "Percentual Capital Terceiros", "Percentual Capital Próprio", "ki", "ke", "wacc",
+    "Investimento Médio", "Lucro Econômico 1", "Lucro Econômico 2", "Lucro Econômico EBITDA",
+    "Alavancagem Eficaz"
+]
+INDICADORES_SETOR = ["ROE", "ROA", "ROI", "Margem Líquida", "Percentual Capital Terceiros", "Percentual Capital Próprio"]
+INDICADORES_COMPARACAO = INDICADORES_EMPRESA
+ESTATISTICAS_SETOR = ["mediana", "média ponderada", "média", "p25", "p75"]
+INDICADORES_DASHBOARD = list(dict.fromkeys(INDICADORES_RANKING + INDICADORES_EMPRESA + INDICADORES_SETOR))
+# Colunas da planilha que as telas usam (o resto fica no snapshot/exportação)
+COLUNAS_DASHBOARD = [
+    "Ticker", "Ano", "SETOR_ATIV", "Ativo Total",
+    "Empréstimos e Financiamentos - Circulante", "Empréstimos e Financiamentos - Não Circulante",
+    "Patrimônio Líquido Consolidado", "Receita de Venda de Bens e/ou Serviços", "Resultado Bruto",
+    "Resultado Antes do Resultado Financeiro e dos Tributos", "Despesas Financeiras",
+    "Lucro/Prejuízo Consolidado do Período", "Pagamento de Dividendos",
+]
+# CVM_FLOAT32=1 guarda as razões (ROE, margens, wacc...) em float32 no frame em cache
+RAZOES_FLOAT32 = os.environ.get("CVM_FLOAT32") == "1"
+
+# Intervalo (s) da verificação em segundo plano da planilha; 0 desliga
+INTERVALO_ATUALIZACAO = float(os.environ.get("CVM_ATUALIZAR_INTERVALO", "30"))
+
+@em_cache(st.cache_resource)
+def load_atualizador():
+    data_path = localizar_planilha()
 
     if data_path is None:
         st.error(
             "❌ Arquivo 'data_frame.xlsx' não encontrado.\n\n"
             "Coloque o arquivo na mesma pasta do app ou em /content/ (se estiver no Colab),\n"
             "ou salve em ./data/data_frame.xlsx.\n\n"
-            "Caminhos verificados:\n- " + "\n- ".join(possible_paths)
+            "Caminhos verificados:\n- " + "\n- ".join(CAMINHOS_POSSIVEIS)
         )
         st.stop()
 
-    # Ler o Excel
-    df = pd.read_excel(data_path)
-    df.columns = [c.strip() for c in df.columns]
+    # Snapshot Arrow + partições Ano/Setor: o Excel só é relido quando o arquivo muda,
+    # numa thread em segundo plano que troca a versão servida só com o snapshot novo pronto
+    # (gerar antes do deploy com: python -m cvm_indicators snapshot)
+    return Atualizador(data_path, intervalo=INTERVALO_ATUALIZACAO).iniciar()
 
-    # =============================================================
-    # MAPEAMENTO EXATO DAS CONTAS (compatível com Excel CPFE3)
-    # =============================================================
-    # Ordenar por Ticker e Ano para garantir que shift() funcione corretamente
-    df = df.sort_values(['Ticker', 'Ano']).reset_index(drop=True)
+@em_cache(st.cache_resource(max_entries=8))
+def load_base(diretorio, ano):
+    # Um dataset por ano, somente leitura, compartilhado por todas as sessões do processo:
+    # só o ano é lido do IPC do snapshot (filtro sobre o memory-map), com as colunas usadas
+    # pelas telas e tipos compactos (category, int16). Em memória ficam no máximo 8 anos
+    # abertos por versão dos dados, nunca o histórico inteiro
+    df = snapshot.ler_indicadores(diretorio, COLUNAS_DASHBOARD + INDICADORES_DASHBOARD, ano=ano)
+    return DatasetCompartilhado(compactar(df, float32=RAZOES_FLOAT32))
 
-    # =============================================================
-    # CÁLCULOS DE MÉDIAS - CORRIGIDOS
-    # =============================================================
-    
-    # 1. Ativo Médio ✅ CORRETO
-    df["Ativo Médio"] = (df["Ativo Total"] + df.groupby("Ticker")["Ativo Total"].shift(1)) / 2
-
-    # 2. PL Médio ✅ CORRETO
-    df["PL Médio"] = (df["Patrimônio Líquido Consolidado"] + df.groupby("Ticker")["Patrimônio Líquido Consolidado"].shift(1)) / 2
+def load_data(diretorio, ano, setor=None, ticker=None):
+    # Recorte da sidebar resolvido pelos índices (Ticker, Ano)/(SETOR_ATIV, Ano) do
+    # dataset compartilhado; o ano inteiro é uma view, sem cópia por sessão;
+    # alterar o frame devolvido levanta ValueError: derivar com .assign()/.copy()
+    with instrumentacao.secao("recorte"):
+        return load_base(diretorio, ano).recorte(ano, setor, ticker)
 
-    # 3. Passivo Oneroso Médio ✅ CORRIGIDO
-    df["Passivo Oneroso Atual"] = (
-        df["Empréstimos e Financiamentos - Circulante"].fillna(0) + 
-        df["Empréstimos e Financiamentos - Não Circulante"].fillna(0)
-    )
-    df["Passivo Oneroso Anterior"] = (
-        df.groupby("Ticker")["Empréstimos e Financiamentos - Circulante"].shift(1).fillna(0) +
-        df.groupby("Ticker")["Empréstimos e Financiamentos - Não Circulante"].shift(1).fillna(0)
+@em_cache(st.cache_data(max_entries=32))
+def load_comparacao(diretorio, tickers, ano_inicial, ano_final):
+    # Todos os tickers e anos do recorte numa leitura só (filtros isin empurrados às partições)
+    df = particoes.ler_particoes(
+        diretorio, ano=list(range(ano_inicial, ano_final + 1)), ticker=list(tickers),
+        indicadores=INDICADORES_DASHBOARD
     )
-    df["Passivo Oneroso Médio"] = (df["Passivo Oneroso Atual"] + df["Passivo Oneroso Anterior"]) / 2
+    return comparacao.painel(df, indicadores=INDICADORES_COMPARACAO)
 
-    # 4. Investimento Médio ✅ CORRIGIDO
-    df["Investimento Atual"] = (
-        df["Empréstimos e Financiamentos - Circulante"].fillna(0) + 
-        df["Empréstimos e Financiamentos - Não Circulante"].fillna(0) + 
-        df["Patrimônio Líquido Consolidado"]
-    )
-    df["Investimento Anterior"] = (
-        df.groupby("Ticker")["Empréstimos e Financiamentos - Circulante"].shift(1).fillna(0) +
-        df.groupby("Ticker")["Empréstimos e Financiamentos - Não Circulante"].shift(1).fillna(0) +
-        df.groupby("Ticker")["Patrimônio Líquido Consolidado"].shift(1).fillna(0)
-    )
-    df["Investimento Médio"] = (df["Investimento Atual"] + df["Investimento Anterior"]) / 2
-
-    # =============================================================
-    # INDICADORES DE RENTABILIDADE - CORRIGIDOS
-    # =============================================================
-    
-    # ROA = Resultado Antes do Resultado Financeiro e dos Tributos / Ativo Médio
-    df["ROA"] = np.where(
-        df["Ativo Médio"] > 0,
-        df["Resultado Antes do Resultado Financeiro e dos Tributos"] / df["Ativo Médio"],
-        np.nan
-    )
+@em_cache(st.cache_resource(max_entries=2))
+def load_cubo(diretorio):
+    # Cubo (SETOR_ATIV, Ano) gravado com o snapshot: KPIs e comparações setoriais sem varrer linhas
+    return snapshot.ler_cubo(diretorio)
 
-    # ROI = Resultado Antes do Resultado Financeiro e dos Tributos / Investimento Médio
-    df["ROI"] = np.where(
-        df["Investimento Médio"] > 0,
-        df["Resultado Antes do Resultado Financeiro e dos Tributos"] / df["Investimento Médio"],
-        np.nan
-    )
-
-    # ROE = Lucro Líquido / PL Médio
-    df["ROE"] = np.where(
-        df["PL Médio"] > 0,
-        df["Lucro/Prejuízo Consolidado do Período"] / df["PL Médio"],
-        np.nan
-    )
-
-    # =============================================================
-    # MARGENS - ✅ TODOS CORRETOS
-    # =============================================================
-    
-    # Margem Bruta = Resultado Bruto / Receita
-    df["Margem Bruta"] = np.where(
-        df["Receita de Venda de Bens e/ou Serviços"] > 0,
-        df["Resultado Bruto"] / df["Receita de Venda de Bens e/ou Serviços"],
-        np.nan
-    )
+@em_cache(st.cache_resource(max_entries=2))
+def load_opcoes(diretorio):
+    # Listas da sidebar, uma vez por versão dos dados: anos e setores pelos diretórios das
+    # partições, tickers pela coluna Ticker do IPC (sem carregar os indicadores)
+    tickers = snapshot.ler_indicadores(diretorio, ["Ticker"])["Ticker"].dropna().unique()
+    return {
+        "anos": sorted(particoes.anos_disponiveis(diretorio), reverse=True),
+        "setores": particoes.setores_disponiveis(diretorio),
+        "tickers": sorted(tickers),
+        "colunas": particoes.colunas(diretorio),
+    }
 
-    # Margem Operacional = Resultado Operacional / Receita
-    df["Margem Operacional"] = np.where(
-        df["Receita de Venda de Bens e/ou Serviços"] > 0,
-        df["Resultado Antes do Resultado Financeiro e dos Tributos"] / df["Receita de Venda de Bens e/ou Serviços"],
-        np.nan
-    )
-
-    # Margem Líquida = Lucro Líquido / Receita
-    df["Margem Líquida"] = np.where(
-        df["Receita de Venda de Bens e/ou Serviços"] > 0,
-        df["Lucro/Prejuízo Consolidado do Período"] / df["Receita de Venda de Bens e/ou Serviços"],
-        np.nan
-    )
+# Rankings pré-ordenados por ano e setor: nome -> (coluna, colunas obrigatórias)
+RANKINGS_DASHBOARD = {
+    "ROE": ("ROE", []),
+    "ROA": ("ROA", []),
+    "ROI": ("ROI", []),
+    "Margem Líquida": ("Margem Líquida", []),
+    "wacc": ("wacc", []),
+    "Lucro": ("Lucro/Prejuízo Consolidado do Período", []),
+    "Receita": ("Receita de Venda de Bens e/ou Serviços", []),
+    "PL": ("Patrimônio Líquido Consolidado", []),
+    "Rentabilidade": ("ROE", ["ROA", "ROI"]),
+    "Estrutura Capital": ("Patrimônio Líquido Consolidado", ["Percentual Capital Próprio"]),
+}
 
-    # =============================================================
-    # ESTRUTURA DE CAPITAL - ✅ TODOS CORRETOS
-    # =============================================================
-    
-    # Total do Passivo = Passivo Circulante + Passivo Não Circulante + Patrimônio Líquido
-    df["Total Passivo"] = (
-        df["Passivo Circulante"].fillna(0) + 
-        df["Passivo Não Circulante"].fillna(0) + 
-        df["Patrimônio Líquido Consolidado"].fillna(0)
-    )
+@em_cache(st.cache_resource(max_entries=8))
+def load_ranking(diretorio, ano):
+    # Montado uma vez por ano selecionado; cada Top-N vira uma fatia O(N)
+    return IndiceRanking(load_data(diretorio, ano), RANKINGS_DASHBOARD, por_setor=True)
 
-    # Percentual Capital Terceiros = (Passivo Circulante + Passivo Não Circulante) / Total Passivo
-    df["Percentual Capital Terceiros"] = np.where(
-        df["Total Passivo"] > 0,
-        (df["Passivo Circulante"].fillna(0) + df["Passivo Não Circulante"].fillna(0)) / df["Total Passivo"],
-        np.nan
-    )
+# Scores entre pares (percentil médio no setor / no mercado), pré-ordenados por ano e setor
+RANKINGS_PONTUACAO = {
+    "Score mercado": (pontuacao.coluna_score("mercado"), []),
+    "Score setor": (pontuacao.coluna_score("setor"), []),
+}
+MEDIDAS_PONTUACAO = {"Percentil": "percentil", "Z-score robusto": "z"}
 
-    # Percentual Capital Próprio = Patrimônio Líquido / Total Passivo
-    df["Percentual Capital Próprio"] = np.where(
-        df["Total Passivo"] > 0,
-        df["Patrimônio Líquido Consolidado"] / df["Total Passivo"],
-        np.nan
-    )
+@em_cache(st.cache_resource(max_entries=2))
+def load_pontuacao(diretorio):
+    # Percentis e z-scores gravados com o snapshot: as telas só fatiam o índice
+    return IndiceRanking(snapshot.ler_pontuacao(diretorio), RANKINGS_PONTUACAO, por_setor=True)
 
-    # =============================================================
-    # CUSTO DE CAPITAL - ✅ TODOS CORRETOS
-    # =============================================================
-    
-    # ki (Custo da Dívida) = Despesas Financeiras / Passivo Oneroso Médio
-    df["ki"] = np.where(
-        (df["Passivo Oneroso Médio"] > 0) & (df["Despesas Financeiras"].notna()),
-        df["Despesas Financeiras"].abs() / df["Passivo Oneroso Médio"],
-        np.nan
+def tabela_pontuacao(top, grupo, medida):
+    # Top-N com o score e a medida escolhida de cada indicador (colunas renomeadas para o indicador)
+    colunas_medida = {pontuacao.coluna(i, medida, grupo): i for i in pontuacao.INDICADORES_PONTUACAO}
+    tabela = top[["Ticker", "SETOR_ATIV", "Score mercado", "Score setor", *colunas_medida]].rename(columns=colunas_medida)
+    formato = "{:.0%}" if medida == "percentil" else "{:+.2f}"
+    return tabela.style.format(
+        {"Score mercado": "{:.1f}", "Score setor": "{:.1f}", **{i: formato for i in colunas_medida.values()}},
+        na_rep="N/A"
     )
 
-    # ke (Custo do Capital Próprio) = Dividendos Pagos / PL Médio
-    df["ke"] = np.where(
-        (df["PL Médio"] > 0) & (df["Pagamento de Dividendos"].notna()),
-        df["Pagamento de Dividendos"].abs() / df["PL Médio"],
-        np.nan
-    )
+@em_cache(st.cache_resource(max_entries=2))
+def load_janelas(diretorio):
+    # Médias móveis, CAGR e tendências de 3/5 anos gravadas com o snapshot, com o mesmo
+    # índice (Ticker, Ano) do dataset base: o histórico de uma empresa é uma busca binária
+    return DatasetCompartilhado(compactar(snapshot.ler_janelas(diretorio)))
 
-    # WACC = (ki × % Capital Terceiros) + (ke × % Capital Próprio)
-    df["wacc"] = np.where(
-        (df["ki"].notna()) & (df["ke"].notna()) & 
-        (df["Percentual Capital Terceiros"].notna()) & (df["Percentual Capital Próprio"].notna()),
-        (df["ki"] * df["Percentual Capital Terceiros"]) + (df["ke"] * df["Percentual Capital Próprio"]),
-        np.nan
-    )
+@em_cache(st.cache_data(max_entries=32))
+def load_historico(diretorio, ticker):
+    # Todos os anos de um Ticker, filtrados no IPC do snapshot (os outros anos não são lidos)
+    colunas = ["Ano", *janelas.MEDIAS, *janelas.TENDENCIA]
+    return snapshot.ler_indicadores(diretorio, colunas, ticker=ticker).sort_values("Ano", ignore_index=True)
 
-    # =============================================================
-    # EBITDA E LUCRO ECONÔMICO - CORRIGIDOS PARA GARANTIR IGUALDADE
-    # =============================================================
-    
-    # EBITDA = Resultado Antes dos Tributos + Despesas Financeiras (APROXIMAÇÃO)
-    df["EBITDA"] = np.where(
-        (df["Resultado Antes dos Tributos sobre o Lucro"].notna()) & 
-        (df["Despesas Financeiras"].notna()),
-        df["Resultado Antes dos Tributos sobre o Lucro"] + df["Despesas Financeiras"].abs(),
-        np.nan
+def tabela_janelas(linha):
+    # Uma linha por indicador plurianual, uma coluna por janela (3a, 5a)
+    medidas = (
+        [(i, "média móvel", "{:.2%}", 1) for i in janelas.MEDIAS]
+        + [(r, "CAGR", "{:+.2%}", 1) for r in janelas.CRESCIMENTO]
+        + [(i, "tendência", "R$ {:+,.0f} mil/ano", 1000) for i in janelas.TENDENCIA]
     )
+    tabela = []
+    for indicador, medida, formato, escala in medidas:
+        item = {"Indicador": f"{indicador} ({medida})"}
+        for anos in janelas.ANOS_JANELA:
+            valor = linha[janelas.coluna(indicador, medida, anos)].iloc[0] if not linha.empty else np.nan
+            item[f"{anos} anos"] = formato.format(valor / escala) if pd.notna(valor) else "N/A"
+        tabela.append(item)
+    return pd.DataFrame(tabela)
 
-    # ROI EBITDA = EBITDA / Investimento Médio
-    df["ROI EBITDA"] = np.where(
-        (df["EBITDA"].notna()) & (df["Investimento Médio"] > 0),
-        df["EBITDA"] / df["Investimento Médio"],
-        np.nan
-    )
+@em_cache(st.cache_resource(max_entries=2))
+def load_cenarios(diretorio):
+    # Arrays base do custo de capital (todos os anos), extraídos uma vez por versão dos dados:
+    # cada cenário e cada varredura é uma expressão NumPy, sem recalcular indicadores.
+    # Só as colunas de COLUNAS_BASE, lidas quando a tela de cenários é aberta
+    return BaseCenarios(snapshot.ler_indicadores(diretorio, COLUNAS_BASE))
 
-    # LUCRO ECONÔMICO 1 = (ROI - WACC) × Investimento Médio
-    df["Lucro Econômico 1"] = np.where(
-        (df["ROI"].notna()) & (df["wacc"].notna()) & (df["Investimento Médio"].notna()),
-        (df["ROI"] - df["wacc"]) * df["Investimento Médio"],
-        np.nan
-    )
+# Parâmetros dos cenários: rótulo e faixa dos sliders (em %)
+PARAMETROS_CENARIO = {
+    "delta_ki": ("Δ ki (p.p.)", -10.0, 10.0),
+    "delta_ke": ("Δ ke (p.p.)", -10.0, 10.0),
+    "spread": ("Spread livre de risco (p.p.)", -5.0, 10.0),
+    "aliquota": ("Alíquota IR/CSLL sobre ki (%)", 0.0, 50.0),
+}
+MEDIDAS_VARREDURA = {
+    "Lucro Econômico 1 (R$ Bi)": ("Lucro Econômico 1", 1e-9),
+    "Empresas criando valor (%)": ("Criando valor", 100),
+    "wacc médio (%)": ("wacc médio", 100),
+}
 
-    # LUCRO ECONÔMICO 2 = Resultado Operacional - (WACC × Investimento Médio) ✅ CORRIGIDO
-    df["Lucro Econômico 2"] = np.where(
-        (df["Resultado Antes do Resultado Financeiro e dos Tributos"].notna()) & 
-        (df["wacc"].notna()) & 
-        (df["Investimento Médio"].notna()),
-        df["Resultado Antes do Resultado Financeiro e dos Tributos"] - (df["wacc"] * df["Investimento Médio"]),
-        np.nan
-    )
+@em_cache(st.cache_resource(max_entries=2))
+def load_qualidade(diretorio):
+    # Ocorrências das regras de qualidade, verificadas a cada atualização do snapshot
+    return snapshot.ler_qualidade(diretorio)
 
-    # VERIFICAÇÃO DE CONSISTÊNCIA
-    df["Diferença Lucro Econômico"] = abs(df["Lucro Econômico 1"] - df["Lucro Econômico 2"])
+# Screener: todas as empresas do ano com todos os indicadores, paginado no servidor
+COLUNAS_SCREENER = ["Ticker", "SETOR_ATIV"] + INDICADORES_DASHBOARD + [
+    "Receita de Venda de Bens e/ou Serviços", "Lucro/Prejuízo Consolidado do Período",
+    "Patrimônio Líquido Consolidado", "Ativo Total",
+]
+FORMATOS_SCREENER = {
+    **{c: "{:.2%}" for c in RAZOES},
+    **{c: "{:,.0f}" for c in COLUNAS_SCREENER[2:] if c not in RAZOES},
+    "Alavancagem Eficaz": "{:.2f}",
+}
 
-    # LUCRO ECONÔMICO EBITDA = (ROI EBITDA - WACC) × Investimento Médio
-    df["Lucro Econômico EBITDA"] = np.where(
-        (df["ROI EBITDA"].notna()) & (df["wacc"].notna()) & (df["Investimento Médio"].notna()),
-        (df["ROI EBITDA"] - df["wacc"]) * df["Investimento Médio"],
-        np.nan
-    )
+@em_cache(st.cache_resource(max_entries=8))
+def load_paginador(diretorio, ano):
+    # Ordens por coluna calculadas uma vez por ano e reaproveitadas entre páginas e sessões
+    return Paginador(load_data(diretorio, ano), COLUNAS_SCREENER)
 
-    # =============================================================
-    # ANÁLISE DE ALAVANCAGEM - ✅ CORRETO
-    # =============================================================
-    
-    # Verifica se a alavancagem é eficaz (ROE > ROA e ROE > ROI)
-    df["Alavancagem Eficaz"] = np.where(
-        (df["ROE"].notna()) & (df["ROA"].notna()) & (df["ROI"].notna()),
-        (df["ROE"] > df["ROA"]) & (df["ROE"] > df["ROI"]),
-        False
-    )
+@st.cache_resource
+def load_cache_figuras():
+    # Um cache LRU por processo, compartilhado por todas as sessões
+    return CacheFiguras(max_itens=512)
 
-    return df
+@st.cache_resource
+def load_metricas():
+    # Acumulado do processo para o texto Prometheus
+    return Metricas()
 
-# Carregar dados
-df = load_data()
+# Carregar dados: a versão servida é fixada no início do rerun e o diretório das
+# partições (com o hash da planilha) é a chave de todos os caches abaixo
+atualizador = load_atualizador()
+versao_dados = atualizador.versao()
+diretorio_dados = versao_dados["particoes"]
+opcoes = load_opcoes(diretorio_dados)
 
 # ==============================
 # SIDEBAR - FILTROS PRINCIPAIS
@@ -253,30 +259,78 @@ st.sidebar.header("🔧 Filtros Principais")
 # Seleção de modo de análise
 modo_analise = st.sidebar.radio(
     "Modo de Análise:",
-    ["🏆 Ranking Comparativo", "📈 Visão por Empresa", "🏭 Análise Setorial"]
+    ["🏆 Ranking Comparativo", "📈 Visão por Empresa", "🏭 Análise Setorial", "📉 Comparação de Empresas",
+     "🧪 Cenários de WACC", "🩺 Qualidade dos Dados"]
 )
 
 # Filtro de ano
-anos_disponiveis = sorted(df["Ano"].unique(), reverse=True)
+anos_disponiveis = opcoes["anos"]
 ano_selecionado = st.sidebar.selectbox("Selecione o Ano:", anos_disponiveis)
 
 # Filtro baseado no modo de análise
 if modo_analise == "📈 Visão por Empresa":
     ticker_selecionado = st.sidebar.selectbox(
         "Selecione a Empresa:",
-        sorted(df["Ticker"].dropna().unique())
+        opcoes["tickers"]
     )
-    df_filtrado = df[(df["Ticker"] == ticker_selecionado) & (df["Ano"] == ano_selecionado)]
+    df_filtrado = load_data(diretorio_dados, ano_selecionado, ticker=ticker_selecionado)
+    filtro_selecionado = ticker_selecionado
     
 elif modo_analise == "🏭 Análise Setorial":
     setor_selecionado = st.sidebar.selectbox(
         "Selecione o Setor:",
-        sorted(df["SETOR_ATIV"].dropna().unique())
+        opcoes["setores"]
     )
-    df_filtrado = df[(df["SETOR_ATIV"] == setor_selecionado) & (df["Ano"] == ano_selecionado)]
+    cubo_setorial = load_cubo(diretorio_dados)
+    resumo_setor = cubo.linha(cubo_setorial, setor_selecionado, ano_selecionado)
+    ranking = load_ranking(diretorio_dados, ano_selecionado)
+    filtro_selecionado = setor_selecionado
+
+elif modo_analise == "📉 Comparação de Empresas":
+    tickers_comparados = st.sidebar.multiselect(
+        "Empresas para comparar:",
+        opcoes["tickers"],
+        default=opcoes["tickers"][:5]
+    )
+    ano_inicial, ano_final = st.sidebar.select_slider(
+        "Período:",
+        options=sorted(anos_disponiveis),
+        value=(min(anos_disponiveis), max(anos_disponiveis))
+    )
+    painel_comparado = load_comparacao(diretorio_dados, tuple(tickers_comparados), ano_inicial, ano_final)
+    filtro_selecionado = (tuple(tickers_comparados), ano_inicial, ano_final)
+
+elif modo_analise == "🧪 Cenários de WACC":
+    setor_cenario = st.sidebar.selectbox("Setor:", ["Todos"] + opcoes["setores"], key="setor_cenario")
+    base_cenarios = load_cenarios(diretorio_dados)
+    filtro_selecionado = setor_cenario
+
+elif modo_analise == "🩺 Qualidade dos Dados":
+    problemas = load_qualidade(diretorio_dados)
+    filtro_selecionado = None
     
 else:  # Ranking Comparativo
-    df_filtrado = df[df["Ano"] == ano_selecionado]
+    ranking = load_ranking(diretorio_dados, ano_selecionado)
+    df_filtrado = ranking.df
+    filtro_selecionado = None
+
+def secao_ativa(rotulos, key):
+    # Navegação no lugar de st.tabs: só a seção escolhida é executada e enviada ao navegador
+    return st.segmented_control(
+        "Seção", rotulos, default=rotulos[0], key=key, label_visibility="collapsed"
+    ) or rotulos[0]
+
+def grafico(id_grafico, construir):
+    # Figura do cache LRU: (modo, ano, ticker/setor, gráfico, versão dos dados)
+    chave = (modo_analise, ano_selecionado, filtro_selecionado, id_grafico, diretorio_dados)
+
+    def construir_medido():
+        instrumentacao.registrar_execucao("grafico")
+        with instrumentacao.secao(f"grafico/{id_grafico}"):
+            return construir()
+
+    with instrumentacao.chamada_cache("grafico"):
+        return load_cache_figuras().obter(chave, construir_medido)
 
 # ==============================
 # TELA PRINCIPAL - RANKING COMPARATIVO
@@ -306,40 +360,39 @@ if modo_analise == "🏆 Ranking Comparativo":
     st.divider()
     
     # Abas para diferentes rankings
-    rank_tab1, rank_tab2, rank_tab3, rank_tab4 = st.tabs(["📈 Rentabilidade", "💰 Valor de Mercado", "🏛️ Solidez", "📊 Eficiência"])
+    aba_ranking = secao_ativa(["📈 Rentabilidade", "💰 Valor de Mercado", "🏛️ Solidez", "📊 Eficiência", "🏅 Score", "🔎 Screener"], "aba_ranking")
     
-    with rank_tab1:
+    if aba_ranking == "📈 Rentabilidade":
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("Top 15 Empresas por ROE")
-            roe_ranking = df_filtrado[df_filtrado["ROE"].notna()].nlargest(15, "ROE")[["Ticker", "SETOR_ATIV", "ROE"]]
+            roe_ranking = ranking.top(ano_selecionado, "ROE", 15, ["Ticker", "SETOR_ATIV", "ROE"])
             
             if not roe_ranking.empty:
-                fig_roe_rank = px.bar(roe_ranking, x="Ticker", y="ROE", color="SETOR_ATIV",
-                                    title="Ranking de ROE (Return on Equity)")
+                fig_roe_rank = grafico("fig_roe_rank", lambda: px.bar(roe_ranking, x="Ticker", y="ROE", color="SETOR_ATIV",
+                                                                    title="Ranking de ROE (Return on Equity)"))
                 st.plotly_chart(fig_roe_rank, use_container_width=True)
             else:
                 st.warning("Não há dados de ROE disponíveis para ranking")
         
         with col2:
             st.subheader("Top 15 Empresas por ROA")
-            roa_ranking = df_filtrado[df_filtrado["ROA"].notna()].nlargest(15, "ROA")[["Ticker", "SETOR_ATIV", "ROA"]]
+            roa_ranking = ranking.top(ano_selecionado, "ROA", 15, ["Ticker", "SETOR_ATIV", "ROA"])
             
             if not roa_ranking.empty:
-                fig_roa_rank = px.bar(roa_ranking, x="Ticker", y="ROA", color="SETOR_ATIV",
-                                    title="Ranking de ROA (Return on Assets)")
+                fig_roa_rank = grafico("fig_roa_rank", lambda: px.bar(roa_ranking, x="Ticker", y="ROA", color="SETOR_ATIV",
+                                                                    title="Ranking de ROA (Return on Assets)"))
                 st.plotly_chart(fig_roa_rank, use_container_width=True)
             else:
                 st.warning("Não há dados de ROA disponíveis para ranking")
         
         # Tabela consolidada de rentabilidade
         st.subheader("📋 Tabela de Rentabilidade - Top 20")
-        rentabilidade_consolidado = df_filtrado[
-            df_filtrado["ROE"].notna() & 
-            df_filtrado["ROA"].notna() & 
-            df_filtrado["ROI"].notna()
-        ].nlargest(20, "ROE")[["Ticker", "SETOR_ATIV", "ROE", "ROA", "ROI", "Margem Líquida"]]
+        rentabilidade_consolidado = ranking.top(
+            ano_selecionado, "Rentabilidade", 20,
+            ["Ticker", "SETOR_ATIV", "ROE", "ROA", "ROI", "Margem Líquida"]
+        )
         
         if not rentabilidade_consolidado.empty:
             # Formatar para porcentagem
@@ -349,93 +402,171 @@ if modo_analise == "🏆 Ranking Comparativo":
                 'ROI': '{:.2%}',
                 'Margem Líquida': '{:.2%}'
             }
-            st.dataframe(
-                rentabilidade_consolidado.style.format(format_dict),
-                use_container_width=True
-            )
+            with instrumentacao.secao("tabela/rentabilidade_consolidado"):
+                st.dataframe(
+                    rentabilidade_consolidado.style.format(format_dict),
+                    use_container_width=True
+                )
         else:
             st.warning("Não há dados suficientes para exibir a tabela consolidada")
     
-    with rank_tab2:
+    elif aba_ranking == "💰 Valor de Mercado":
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("Top 15 Empresas por Lucro Líquido")
-            lucro_ranking = df_filtrado.nlargest(15, "Lucro/Prejuízo Consolidado do Período")[["Ticker", "SETOR_ATIV", "Lucro/Prejuízo Consolidado do Período"]]
+            lucro_ranking = ranking.top(ano_selecionado, "Lucro", 15, ["Ticker", "SETOR_ATIV", "Lucro/Prejuízo Consolidado do Período"])
             
             if not lucro_ranking.empty:
                 # Converter para milhões
-                lucro_ranking["Lucro (R$ Mi)"] = lucro_ranking["Lucro/Prejuízo Consolidado do Período"] / 1e6
-                fig_lucro_rank = px.bar(lucro_ranking, x="Ticker", y="Lucro (R$ Mi)", color="SETOR_ATIV",
-                                      title="Ranking por Lucro Líquido")
+                lucro_ranking = lucro_ranking.assign(**{"Lucro (R$ Mi)": lucro_ranking["Lucro/Prejuízo Consolidado do Período"] / 1e6})
+                fig_lucro_rank = grafico("fig_lucro_rank", lambda: px.bar(lucro_ranking, x="Ticker", y="Lucro (R$ Mi)", color="SETOR_ATIV",
+                                                                        title="Ranking por Lucro Líquido"))
                 st.plotly_chart(fig_lucro_rank, use_container_width=True)
             else:
                 st.warning("Não há dados de lucro disponíveis para ranking")
         
         with col2:
             st.subheader("Top 15 Empresas por Receita")
-            receita_ranking = df_filtrado.nlargest(15, "Receita de Venda de Bens e/ou Serviços")[["Ticker", "SETOR_ATIV", "Receita de Venda de Bens e/ou Serviços"]]
+            receita_ranking = ranking.top(ano_selecionado, "Receita", 15, ["Ticker", "SETOR_ATIV", "Receita de Venda de Bens e/ou Serviços"])
             
             if not receita_ranking.empty:
                 # Converter para bilhões
-                receita_ranking["Receita (R$ Bi)"] = receita_ranking["Receita de Venda de Bens e/ou Serviços"] / 1e9
-                fig_receita_rank = px.bar(receita_ranking, x="Ticker", y="Receita (R$ Bi)", color="SETOR_ATIV",
-                                        title="Ranking por Receita")
+                receita_ranking = receita_ranking.assign(**{"Receita (R$ Bi)": receita_ranking["Receita de Venda de Bens e/ou Serviços"] / 1e9})
+                fig_receita_rank = grafico("fig_receita_rank", lambda: px.bar(receita_ranking, x="Ticker", y="Receita (R$ Bi)", color="SETOR_ATIV",
+                                                                            title="Ranking por Receita"))
                 st.plotly_chart(fig_receita_rank, use_container_width=True)
             else:
                 st.warning("Não há dados de receita disponíveis para ranking")
     
-    with rank_tab3:
+    elif aba_ranking == "🏛️ Solidez":
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("Top 15 Empresas por Patrimônio Líquido")
-            pl_ranking = df_filtrado.nlargest(15, "Patrimônio Líquido Consolidado")[["Ticker", "SETOR_ATIV", "Patrimônio Líquido Consolidado"]]
+            pl_ranking = ranking.top(ano_selecionado, "PL", 15, ["Ticker", "SETOR_ATIV", "Patrimônio Líquido Consolidado"])
             
             if not pl_ranking.empty:
                 # Converter para bilhões
-                pl_ranking["PL (R$ Bi)"] = pl_ranking["Patrimônio Líquido Consolidado"] / 1e9
-                fig_pl_rank = px.bar(pl_ranking, x="Ticker", y="PL (R$ Bi)", color="SETOR_ATIV",
-                                   title="Ranking de Patrimônio Líquido")
+                pl_ranking = pl_ranking.assign(**{"PL (R$ Bi)": pl_ranking["Patrimônio Líquido Consolidado"] / 1e9})
+                fig_pl_rank = grafico("fig_pl_rank", lambda: px.bar(pl_ranking, x="Ticker", y="PL (R$ Bi)", color="SETOR_ATIV",
+                                                                  title="Ranking de Patrimônio Líquido"))
                 st.plotly_chart(fig_pl_rank, use_container_width=True)
             else:
                 st.warning("Não há dados de patrimônio líquido disponíveis para ranking")
         
         with col2:
             st.subheader("Top 15 Empresas por ROI")
-            roi_ranking = df_filtrado[df_filtrado["ROI"].notna()].nlargest(15, "ROI")[["Ticker", "SETOR_ATIV", "ROI"]]
+            roi_ranking = ranking.top(ano_selecionado, "ROI", 15, ["Ticker", "SETOR_ATIV", "ROI"])
             
             if not roi_ranking.empty:
-                fig_roi_rank = px.bar(roi_ranking, x="Ticker", y="ROI", color="SETOR_ATIV",
-                                    title="Ranking de ROI (Return on Investment)")
+                fig_roi_rank = grafico("fig_roi_rank", lambda: px.bar(roi_ranking, x="Ticker", y="ROI", color="SETOR_ATIV",
+                                                                    title="Ranking de ROI (Return on Investment)"))
                 st.plotly_chart(fig_roi_rank, use_container_width=True)
             else:
                 st.warning("Não há dados de ROI disponíveis para ranking")
     
-    with rank_tab4:
+    elif aba_ranking == "📊 Eficiência":
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("Top 15 Empresas por Margem Líquida")
-            margem_ranking = df_filtrado[df_filtrado["Margem Líquida"].notna()].nlargest(15, "Margem Líquida")[["Ticker", "SETOR_ATIV", "Margem Líquida"]]
+            margem_ranking = ranking.top(ano_selecionado, "Margem Líquida", 15, ["Ticker", "SETOR_ATIV", "Margem Líquida"])
             
             if not margem_ranking.empty:
-                fig_margem_rank = px.bar(margem_ranking, x="Ticker", y="Margem Líquida", color="SETOR_ATIV",
-                                       title="Ranking por Margem Líquida")
+                fig_margem_rank = grafico("fig_margem_rank", lambda: px.bar(margem_ranking, x="Ticker", y="Margem Líquida", color="SETOR_ATIV",
+                                                                          title="Ranking por Margem Líquida"))
                 st.plotly_chart(fig_margem_rank, use_container_width=True)
             else:
                 st.warning("Não há dados de margem líquida disponíveis para ranking")
         
         with col2:
             st.subheader("Empresas com Melhor WACC")
-            wacc_ranking = df_filtrado[df_filtrado["wacc"].notna()].nsmallest(15, "wacc")[["Ticker", "SETOR_ATIV", "wacc"]]
+            wacc_ranking = ranking.top(ano_selecionado, "wacc", 15, ["Ticker", "SETOR_ATIV", "wacc"], ascendente=True)
             
             if not wacc_ranking.empty:
-                fig_wacc_rank = px.bar(wacc_ranking, x="Ticker", y="wacc", color="SETOR_ATIV",
-                                     title="Ranking por WACC (menor é melhor)")
+                fig_wacc_rank = grafico("fig_wacc_rank", lambda: px.bar(wacc_ranking, x="Ticker", y="wacc", color="SETOR_ATIV",
+                                                                      title="Ranking por WACC (menor é melhor)"))
                 st.plotly_chart(fig_wacc_rank, use_container_width=True)
             else:
                 st.warning("Não há dados de WACC disponíveis para ranking")
+    
+    elif aba_ranking == "🏅 Score":
+        st.subheader("Top 20 Empresas por Score Composto no Mercado")
+        indice_pontuacao = load_pontuacao(diretorio_dados)
+        top_score = indice_pontuacao.top(ano_selecionado, "Score mercado", 20)
+        
+        if not top_score.empty:
+            fig_score = grafico("fig_score_mercado", lambda: px.bar(top_score, x="Ticker", y="Score mercado", color="SETOR_ATIV",
+                                                                   title="Score Composto (percentil médio no mercado, 0-100)"))
+            st.plotly_chart(fig_score, use_container_width=True)
+            
+            medida_score = st.radio("Medida por indicador:", list(MEDIDAS_PONTUACAO), horizontal=True, key="medida_score")
+            with instrumentacao.secao("tabela/score_mercado"):
+                st.dataframe(
+                    tabela_pontuacao(top_score, "mercado", MEDIDAS_PONTUACAO[medida_score]),
+                    use_container_width=True, hide_index=True
+                )
+            st.caption("Comparação com todas as empresas do ano. Orientado para maior = melhor: "
+                       "ki, ke, wacc e Percentual Capital Terceiros contam com o sinal trocado.")
+        else:
+            st.warning("Não há dados suficientes para calcular o score neste ano")
+    
+    elif aba_ranking == "🔎 Screener":
+        st.subheader(f"🔎 Screener - Todas as Empresas ({ano_selecionado})")
+        paginador = load_paginador(diretorio_dados, ano_selecionado)
+        
+        col1, col2, col3, col4 = st.columns([2, 1, 2, 1])
+        with col1:
+            setores_screener = st.multiselect("Setores:", opcoes["setores"], key="screener_setores")
+        with col2:
+            busca_screener = st.text_input("Ticker contém:", key="screener_busca")
+        with col3:
+            ordenar_screener = st.selectbox("Ordenar por:", COLUNAS_SCREENER, index=COLUNAS_SCREENER.index("ROE"),
+                                            key="screener_ordem")
+        with col4:
+            ascendente_screener = st.toggle("Crescente", key="screener_ascendente")
+        
+        col1, col2, col3 = st.columns([2, 1, 1])
+        with col1:
+            faixa_indicador = st.selectbox("Filtrar indicador:", ["(nenhum)"] + INDICADORES_DASHBOARD,
+                                           key="screener_faixa")
+        faixas_screener = {}
+        if faixa_indicador != "(nenhum)":
+            with col2:
+                minimo = st.number_input("Mínimo:", value=None, format="%.4f", key="screener_minimo")
+            with col3:
+                maximo = st.number_input("Máximo:", value=None, format="%.4f", key="screener_maximo")
+            faixas_screener[faixa_indicador] = (minimo, maximo)
+        
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            tamanho_pagina = st.selectbox("Linhas por página:", [25, 50, 100], key="screener_tamanho")
+        # Ordenação e filtros no servidor: só a janela visível é formatada e enviada
+        with instrumentacao.secao("screener/selecao"):
+            posicoes_screener = paginador.selecao(ordenar_screener, ascendente_screener,
+                                                  setores_screener, busca_screener, faixas_screener)
+        total_filtrado = len(posicoes_screener)
+        paginas = total_paginas(total_filtrado, tamanho_pagina)
+        # Filtros que encolhem a seleção não podem deixar a página fora do intervalo
+        if st.session_state.get("screener_pagina", 1) > paginas:
+            st.session_state["screener_pagina"] = paginas
+        with col2:
+            pagina_atual = st.number_input(f"Página (de {paginas}):", min_value=1, max_value=paginas,
+                                           key="screener_pagina")
+        janela = paginador.janela(posicoes_screener, pagina_atual, tamanho_pagina)
+        
+        if total_filtrado:
+            inicio = (pagina_atual - 1) * tamanho_pagina
+            st.caption(f"Empresas {inicio + 1}–{inicio + len(janela)} de {total_filtrado} "
+                       f"(universo do ano: {len(paginador)})")
+            with instrumentacao.secao("tabela/screener"):
+                st.dataframe(
+                    janela.style.format(FORMATOS_SCREENER, na_rep="N/A"),
+                    use_container_width=True, hide_index=True
+                )
+        else:
+            st.warning("Nenhuma empresa atende aos filtros selecionados")
 
 # ==============================
 # TELA - VISÃO POR EMPRESA
@@ -486,8 +617,8 @@ elif modo_analise == "📈 Visão por Empresa":
         
         if pd.notna(lucro_eco1) and pd.notna(lucro_eco2):
             diferenca = abs(lucro_eco1 - lucro_eco2)
-            # Tolerância de 0.1% do maior valor absoluto
-            tolerancia = max(abs(lucro_eco1), abs(lucro_eco2)) * 0.001
+            # Tolerância de 0.1% do maior valor absoluto (mesma regra da validação da base)
+            tolerancia = max(abs(lucro_eco1), abs(lucro_eco2)) * qualidade.TOLERANCIA_LUCRO_ECONOMICO
             
             if diferenca <= tolerancia:
                 st.success("✅ LUCRO ECONÔMICO 1 = LUCRO ECONÔMICO 2")
@@ -546,9 +677,9 @@ elif modo_analise == "📈 Visão por Empresa":
         st.divider()
         
         # Abas para diferentes categorias de indicadores
-        tab1, tab2, tab3, tab4, tab5 = st.tabs(["📈 Rentabilidade", "🏛️ Estrutura Capital", "💰 Custo Capital", "📊 Lucro Econômico", "📋 Dados Brutos"])
+        aba_empresa = secao_ativa(["📈 Rentabilidade", "🏛️ Estrutura Capital", "💰 Custo Capital", "📊 Lucro Econômico", "📅 3 e 5 Anos", "📋 Dados Brutos"], "aba_empresa")
         
-        with tab1:
+        if aba_empresa == "📈 Rentabilidade":
             st.subheader("Indicadores de Rentabilidade")
             rentabilidade_cols = ["ROE", "ROA", "ROI", "ROI EBITDA", "Margem Bruta", "Margem Operacional", "Margem Líquida"]
             rentabilidade_data = []
@@ -575,7 +706,7 @@ elif modo_analise == "📈 Visão por Empresa":
             else:
                 st.warning("Não há dados de rentabilidade disponíveis")
         
-        with tab2:
+        elif aba_empresa == "🏛️ Estrutura Capital":
             st.subheader("Estrutura de Capital")
             estrutura_cols = ["Percentual Capital Terceiros", "Percentual Capital Próprio"]
             estrutura_data = []
@@ -607,16 +738,16 @@ elif modo_analise == "📈 Visão por Empresa":
                     valores = [df_filtrado["Percentual Capital Terceiros"].iloc[0], 
                               df_filtrado["Percentual Capital Próprio"].iloc[0]]
                     
-                    fig_pizza = px.pie(
+                    fig_pizza = grafico("fig_pizza", lambda: px.pie(
                         values=valores,
                         names=nomes,
                         title="Composição do Capital"
-                    )
+                    ))
                     st.plotly_chart(fig_pizza, use_container_width=True)
             else:
                 st.warning("Não há dados de estrutura de capital disponíveis")
         
-        with tab3:
+        elif aba_empresa == "💰 Custo Capital":
             st.subheader("Custo de Capital")
             custo_cols = ["ki", "ke", "wacc"]
             custo_data = []
@@ -643,7 +774,7 @@ elif modo_analise == "📈 Visão por Empresa":
             else:
                 st.warning("Não há dados de custo de capital disponíveis")
         
-        with tab4:
+        elif aba_empresa == "📊 Lucro Econômico":
             st.subheader("Lucro Econômico")
             lucro_cols = ["Lucro Econômico 1", "Lucro Econômico 2", "Lucro Econômico EBITDA"]
             lucro_data = []
@@ -672,7 +803,47 @@ elif modo_analise == "📈 Visão por Empresa":
             else:
                 st.warning("Não há dados de lucro econômico disponíveis")
         
-        with tab5:
+        elif aba_empresa == "📅 3 e 5 Anos":
+            st.subheader("Indicadores Plurianuais (janelas de 3 e 5 anos)")
+            # Histórico do Ticker (todos os anos) + janelas; anos ausentes não entram nas janelas
+            historico = load_historico(diretorio_dados, ticker_selecionado)
+            janelas_ticker = load_janelas(diretorio_dados).recorte(ticker=ticker_selecionado)
+            serie_anos = historico[["Ano", *janelas.MEDIAS, *janelas.TENDENCIA]].merge(
+                janelas_ticker.drop(columns=["Ticker", "SETOR_ATIV"]), on="Ano", how="left"
+            ).set_index("Ano")
+            st.dataframe(
+                tabela_janelas(janelas_ticker[janelas_ticker["Ano"] == ano_selecionado]),
+                use_container_width=True, hide_index=True
+            )
+            st.caption("Médias e tendência exigem todos os anos da janela; o CAGR, valores positivos nas duas pontas.")
+
+            serie_janela = st.radio(
+                "Série:", [*janelas.MEDIAS, "Crescimento (CAGR)", *janelas.TENDENCIA], horizontal=True, key="serie_janelas"
+            )
+            if serie_janela in janelas.MEDIAS:
+                colunas_serie = [serie_janela] + [janelas.coluna(serie_janela, "média móvel", a) for a in janelas.ANOS_JANELA]
+                fig_janelas = grafico(f"fig_janelas_{serie_janela}", lambda: px.line(
+                    serie_anos[colunas_serie], markers=True, labels={"value": serie_janela, "variable": "Série"}
+                ).update_yaxes(tickformat=".0%"))
+            elif serie_janela == "Crescimento (CAGR)":
+                colunas_serie = [janelas.coluna(r, "CAGR", a) for a in janelas.ANOS_JANELA for r in janelas.CRESCIMENTO]
+                fig_janelas = grafico("fig_janelas_cagr", lambda: px.line(
+                    serie_anos[colunas_serie], markers=True, labels={"value": "CAGR", "variable": "Série"}
+                ).update_yaxes(tickformat=".0%"))
+            else:
+                # Nível anual (R$ Mil) colorido pelo sentido da tendência de 3 anos
+                tendencia_3a = serie_anos[janelas.coluna(serie_janela, "tendência", janelas.ANOS_JANELA[0])]
+                barras = pd.DataFrame({
+                    "Ano": serie_anos.index,
+                    "R$ Mil": serie_anos[serie_janela].to_numpy() / 1000,
+                    "Tendência": np.select([tendencia_3a > 0, tendencia_3a < 0], ["Em alta", "Em queda"], "Sem janela completa"),
+                })
+                fig_janelas = grafico(f"fig_janelas_{serie_janela}", lambda: px.bar(
+                    barras, x="Ano", y="R$ Mil", color="Tendência", title=f"{serie_janela} (R$ Mil)"
+                ))
+            st.plotly_chart(fig_janelas, use_container_width=True)
+
+        elif aba_empresa == "📋 Dados Brutos":
             st.subheader("Dados Financeiros Brutos (R$ Mil)")
             dados_brutos = df_filtrado[[
                 "Receita de Venda de Bens e/ou Serviços",
@@ -700,78 +871,355 @@ elif modo_analise == "📈 Visão por Empresa":
 elif modo_analise == "🏭 Análise Setorial":
     st.header(f"🏭 Análise Setorial - {setor_selecionado} ({ano_selecionado})")
     
-    if not df_filtrado.empty:
-        # KPIs do Setor
+    if resumo_setor is not None:
+        # KPIs do Setor (lidos do cubo setorial)
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            empresas_setor = df_filtrado["Ticker"].nunique()
+            empresas_setor = int(resumo_setor["Empresas"])
             st.metric("Empresas no Setor", empresas_setor)
         
         with col2:
-            receita_setor = df_filtrado["Receita de Venda de Bens e/ou Serviços"].sum() / 1e9
+            receita_setor = resumo_setor[cubo.coluna("Receita de Venda de Bens e/ou Serviços", "soma")] / 1e9
             st.metric("Receita Total (R$ Bi)", f"R$ {receita_setor:.2f}")
         
         with col3:
-            lucro_setor = df_filtrado["Lucro/Prejuízo Consolidado do Período"].sum() / 1e9
+            lucro_setor = resumo_setor[cubo.coluna("Lucro/Prejuízo Consolidado do Período", "soma")] / 1e9
             st.metric("Lucro Total (R$ Bi)", f"R$ {lucro_setor:.2f}")
         
         with col4:
-            pl_setor = df_filtrado["Patrimônio Líquido Consolidado"].sum() / 1e9
+            pl_setor = resumo_setor[cubo.coluna("Patrimônio Líquido Consolidado", "soma")] / 1e9
             st.metric("Patrimônio Líquido (R$ Bi)", f"R$ {pl_setor:.2f}")
         
         st.divider()
         
-        # Top empresas do setor por ROE
-        st.subheader("Top 10 Empresas do Setor por ROE")
-        top_roe_setor = df_filtrado[df_filtrado["ROE"].notna()].nlargest(10, "ROE")[["Ticker", "ROE"]]
+        aba_setor = secao_ativa(["🏢 Empresas do Setor", "🏅 Score no Setor", "🌐 Entre Setores", "📅 Evolução do Setor"], "aba_setor")
         
-        if not top_roe_setor.empty:
-            fig_roe = px.bar(top_roe_setor, x="Ticker", y="ROE", 
-                           title="ROE por Empresa no Setor")
-            st.plotly_chart(fig_roe, use_container_width=True)
-        else:
-            st.warning("Não há dados de ROE disponíveis para este setor")
-        
-        # Comparativo de estrutura de capital no setor
-        st.subheader("Estrutura de Capital no Setor")
-        estrutura_setor = df_filtrado[df_filtrado["Percentual Capital Próprio"].notna()].nlargest(15, "Patrimônio Líquido Consolidado")
-        
-        if not estrutura_setor.empty:
-            fig_estrutura = px.bar(estrutura_setor, 
-                                 x="Ticker", 
-                                 y=["Percentual Capital Terceiros", "Percentual Capital Próprio"],
-                                 title="Estrutura de Capital das Principais Empresas do Setor",
-                                 barmode='stack')
-            st.plotly_chart(fig_estrutura, use_container_width=True)
-        else:
-            st.warning("Não há dados de estrutura de capital disponíveis para este setor")
+        if aba_setor == "🏢 Empresas do Setor":
+            # Top empresas do setor por ROE
+            st.subheader("Top 10 Empresas do Setor por ROE")
+            top_roe_setor = ranking.top(ano_selecionado, "ROE", 10, ["Ticker", "ROE"], setor=setor_selecionado)
         
-        # Ranking de rentabilidade no setor
-        st.subheader("Ranking de Rentabilidade no Setor")
-        rentabilidade_setor = df_filtrado[
-            df_filtrado["ROE"].notna() & 
-            df_filtrado["ROA"].notna() & 
-            df_filtrado["ROI"].notna()
-        ].nlargest(15, "ROE")[["Ticker", "ROE", "ROA", "ROI", "Margem Líquida"]]
+            if not top_roe_setor.empty:
+                fig_roe = grafico("fig_roe", lambda: px.bar(top_roe_setor, x="Ticker", y="ROE", 
+                                                          title="ROE por Empresa no Setor"))
+                st.plotly_chart(fig_roe, use_container_width=True)
+            else:
+                st.warning("Não há dados de ROE disponíveis para este setor")
         
-        if not rentabilidade_setor.empty:
-            format_dict = {
-                'ROE': '{:.2%}',
-                'ROA': '{:.2%}', 
-                'ROI': '{:.2%}',
-                'Margem Líquida': '{:.2%}'
-            }
-            st.dataframe(
-                rentabilidade_setor.style.format(format_dict),
-                use_container_width=True
+            # Comparativo de estrutura de capital no setor
+            st.subheader("Estrutura de Capital no Setor")
+            estrutura_setor = ranking.top(ano_selecionado, "Estrutura Capital", 15, setor=setor_selecionado)
+        
+            if not estrutura_setor.empty:
+                fig_estrutura = grafico("fig_estrutura", lambda: px.bar(estrutura_setor, 
+                                                                      x="Ticker", 
+                                                                      y=["Percentual Capital Terceiros", "Percentual Capital Próprio"],
+                                                                      title="Estrutura de Capital das Principais Empresas do Setor",
+                                                                      barmode='stack'))
+                st.plotly_chart(fig_estrutura, use_container_width=True)
+            else:
+                st.warning("Não há dados de estrutura de capital disponíveis para este setor")
+        
+            # Ranking de rentabilidade no setor
+            st.subheader("Ranking de Rentabilidade no Setor")
+            rentabilidade_setor = ranking.top(
+                ano_selecionado, "Rentabilidade", 15,
+                ["Ticker", "ROE", "ROA", "ROI", "Margem Líquida"], setor=setor_selecionado
             )
-        else:
-            st.warning("Não há dados de rentabilidade suficientes para exibir o ranking")
+        
+            if not rentabilidade_setor.empty:
+                format_dict = {
+                    'ROE': '{:.2%}',
+                    'ROA': '{:.2%}', 
+                    'ROI': '{:.2%}',
+                    'Margem Líquida': '{:.2%}'
+                }
+                with instrumentacao.secao("tabela/rentabilidade_setor"):
+                    st.dataframe(
+                        rentabilidade_setor.style.format(format_dict),
+                        use_container_width=True
+                    )
+            else:
+                st.warning("Não há dados de rentabilidade suficientes para exibir o ranking")
+        
+        elif aba_setor == "🏅 Score no Setor":
+            st.subheader("Ranking por Score Composto no Setor")
+            indice_pontuacao = load_pontuacao(diretorio_dados)
+            top_score_setor = indice_pontuacao.top(ano_selecionado, "Score setor", 15, setor=setor_selecionado)
+            
+            if not top_score_setor.empty:
+                fig_score_setor = grafico("fig_score_setor", lambda: px.bar(top_score_setor, x="Ticker", y="Score setor",
+                                                                           title="Score Composto (percentil médio no setor, 0-100)"))
+                st.plotly_chart(fig_score_setor, use_container_width=True)
+                
+                medida_score = st.radio("Medida por indicador:", list(MEDIDAS_PONTUACAO), horizontal=True,
+                                        key="medida_score_setor")
+                with instrumentacao.secao("tabela/score_setor"):
+                    st.dataframe(
+                        tabela_pontuacao(top_score_setor, "setor", MEDIDAS_PONTUACAO[medida_score]),
+                        use_container_width=True, hide_index=True
+                    )
+                st.caption(f"Comparação com as {int(top_score_setor['Empresas setor'].iloc[0])} empresas do setor no ano. "
+                           "Orientado para maior = melhor: ki, ke, wacc e Percentual Capital Terceiros contam com o sinal trocado.")
+            else:
+                st.warning("Não há dados suficientes para calcular o score neste setor")
+        
+        elif aba_setor == "🌐 Entre Setores":
+            col1, col2 = st.columns(2)
+            with col1:
+                indicador_setor = st.selectbox("Indicador:", INDICADORES_SETOR, key="indicador_entre_setores")
+            with col2:
+                estatistica_setor = st.selectbox("Estatística:", ESTATISTICAS_SETOR, key="estatistica_entre_setores")
+            coluna_cubo = cubo.coluna(indicador_setor, estatistica_setor)
+            
+            comparativo = (
+                cubo.entre_setores(cubo_setorial, ano_selecionado, ["Empresas", coluna_cubo])
+                .dropna(subset=[coluna_cubo])
+                .sort_values(coluna_cubo, ascending=False)
+                .reset_index()
+            )
+            comparativo["Setor"] = np.where(comparativo["SETOR_ATIV"] == setor_selecionado, "Selecionado", "Demais")
+            
+            st.subheader(f"{indicador_setor} ({estatistica_setor}) por Setor")
+            fig_entre_setores = grafico(f"fig_entre_setores_{coluna_cubo}", lambda: px.bar(
+                comparativo, x="SETOR_ATIV", y=coluna_cubo, color="Setor", hover_data=["Empresas"],
+                color_discrete_map={"Selecionado": "#d62728", "Demais": "#1f77b4"},
+                labels={"SETOR_ATIV": "Setor", coluna_cubo: indicador_setor}
+            ))
+            st.plotly_chart(fig_entre_setores, use_container_width=True)
+        
+        elif aba_setor == "📅 Evolução do Setor":
+            indicador_setor = st.selectbox("Indicador:", INDICADORES_SETOR, key="indicador_evolucao_setor")
+            colunas_evolucao = [cubo.coluna(indicador_setor, e) for e in ("p25", "mediana", "p75", "média ponderada")]
+            evolucao_setor = cubo.evolucao(cubo_setorial, setor_selecionado, colunas_evolucao)
+            
+            st.subheader(f"{indicador_setor} no Setor ao Longo dos Anos")
+            fig_evolucao = grafico(f"fig_evolucao_{indicador_setor}", lambda: px.line(
+                evolucao_setor, markers=True, labels={"value": indicador_setor, "variable": "Estatística"}
+            ))
+            st.plotly_chart(fig_evolucao, use_container_width=True)
+            with instrumentacao.secao("tabela/evolucao_setor"):
+                st.dataframe(
+                    evolucao_setor.style.format('{:.2%}', na_rep="N/A"),
+                    use_container_width=True
+                )
     
     else:
         st.warning(f"Não há dados disponíveis para o setor {setor_selecionado} no ano {ano_selecionado}")
 
+# ==============================
+# TELA - COMPARAÇÃO DE EMPRESAS
+# ==============================
+elif modo_analise == "📉 Comparação de Empresas":
+    st.header(f"📉 Comparação de Empresas ({ano_inicial}–{ano_final})")
+
+    if not painel_comparado.empty:
+        aba_comparacao = secao_ativa(["📈 Tendências", "📋 Painel do Ano"], "aba_comparacao")
+
+        if aba_comparacao == "📈 Tendências":
+            col1, col2 = st.columns(2)
+            for i, indicador in enumerate(comparacao.INDICADORES_TENDENCIA):
+                curvas = comparacao.serie(painel_comparado, indicador)
+                with (col1 if i % 2 == 0 else col2):
+                    st.subheader(indicador)
+                    if curvas.notna().any().any():
+                        fig = grafico(f"fig_tendencia_{indicador}", lambda: px.line(
+                            curvas, markers=True, labels={"value": indicador, "Ano": "Ano"}
+                        ))
+                        st.plotly_chart(fig, use_container_width=True)
+                    else:
+                        st.info(f"Sem dados de {indicador} no período")
+
+        elif aba_comparacao == "📋 Painel do Ano":
+            st.subheader(f"Indicadores lado a lado ({ano_selecionado})")
+            tabela = comparacao.tabela_ano(painel_comparado, ano_selecionado)
+            if not tabela.empty:
+                colunas_valor = ["Investimento Médio", "Lucro Econômico 1", "Lucro Econômico 2", "Lucro Econômico EBITDA"]
+                format_dict = {
+                    c: ('{:,.0f}' if c in colunas_valor else '{:.2%}')
+                    for c in tabela.columns if c != "Alavancagem Eficaz"
+                }
+                with instrumentacao.secao("tabela/painel_comparacao"):
+                    st.dataframe(tabela.style.format(format_dict, na_rep="N/A"), use_container_width=True)
+            else:
+                st.warning(f"Nenhuma das empresas selecionadas tem dados em {ano_selecionado}")
+
+            st.subheader("Painel completo (Ano × indicador × empresa)")
+            st.dataframe(comparacao.largo(painel_comparado), use_container_width=True)
+
+    else:
+        st.warning("Selecione ao menos uma empresa com dados no período")
+
+# ==============================
+# TELA - CENÁRIOS DE WACC
+# ==============================
+elif modo_analise == "🧪 Cenários de WACC":
+    st.header(f"🧪 Cenários de WACC e Lucro Econômico ({ano_selecionado})")
+    st.caption(
+        "ki' = (ki + Δki + spread) × (1 − alíquota) · ke' = ke + Δke + spread · "
+        "wacc' = ki' × % Capital Terceiros + ke' × % Capital Próprio. Tudo zerado = valores do snapshot."
+    )
+
+    # Premissas do cenário (sliders em %, parâmetros em fração)
+    colunas_parametros = st.columns(len(PARAMETROS_CENARIO))
+    parametros_cenario = {}
+    for coluna_parametro, (nome, (rotulo, minimo, maximo)) in zip(colunas_parametros, PARAMETROS_CENARIO.items()):
+        with coluna_parametro:
+            parametros_cenario[nome] = st.slider(rotulo, minimo, maximo, 0.0, 0.5, key=f"cenario_{nome}") / 100
+
+    recorte_cenario = base_cenarios.linhas(setor=None if setor_cenario == "Todos" else setor_cenario)
+    aba_cenario = secao_ativa(["📊 Cenário", "🗺️ Sensibilidade"], "aba_cenario")
+
+    if aba_cenario == "📊 Cenário":
+        # Universo inteiro, todos os anos: base e cenário lado a lado
+        with instrumentacao.secao("cenarios/avaliar"):
+            cenario = base_cenarios.avaliar(**parametros_cenario)
+            base = base_cenarios.avaliar()
+        comparativo = base[["Ticker", "Ano", "SETOR_ATIV"]].assign(**{
+            "wacc base": base["wacc"], "wacc cenário": cenario["wacc"],
+            "LE base": base["Lucro Econômico 1"], "LE cenário": cenario["Lucro Econômico 1"],
+        })[recorte_cenario & base_cenarios.validas]
+        do_ano = comparativo[comparativo["Ano"] == ano_selecionado]
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Lucro Econômico 1 total (R$ Bi)", f"{do_ano['LE cenário'].sum() / 1e9:,.2f}",
+                      delta=f"{(do_ano['LE cenário'].sum() - do_ano['LE base'].sum()) / 1e9:+,.2f}")
+        with col2:
+            criando_valor = int((do_ano["LE cenário"] > 0).sum())
+            st.metric("Empresas criando valor", f"{criando_valor} de {len(do_ano)}",
+                      delta=criando_valor - int((do_ano["LE base"] > 0).sum()))
+        with col3:
+            if len(do_ano):
+                st.metric("wacc mediano", f"{do_ano['wacc cenário'].median():.2%}",
+                          delta=f"{(do_ano['wacc cenário'].median() - do_ano['wacc base'].median()) * 100:+.2f} p.p.")
+            else:
+                st.metric("wacc mediano", "N/A")
+
+        st.subheader("Lucro Econômico 1 total por ano (R$ Bi)")
+        por_ano = comparativo.groupby("Ano")[["LE base", "LE cenário"]].sum() / 1e9
+        chave_cenario = tuple(parametros_cenario.values())
+        fig_cenario_anos = grafico(f"fig_cenario_anos_{chave_cenario}", lambda: px.line(
+            por_ano, markers=True, labels={"value": "R$ Bi", "variable": "Série"}
+        ))
+        st.plotly_chart(fig_cenario_anos, use_container_width=True)
+
+        st.subheader(f"Empresas em {ano_selecionado} (maior Lucro Econômico no cenário)")
+        with instrumentacao.secao("tabela/cenario"):
+            st.dataframe(
+                do_ano.assign(**{"Δ LE": do_ano["LE cenário"] - do_ano["LE base"]})
+                .sort_values("LE cenário", ascending=False)
+                .drop(columns="Ano").head(50)
+                .style.format({
+                    "wacc base": "{:.2%}", "wacc cenário": "{:.2%}",
+                    "LE base": "{:,.0f}", "LE cenário": "{:,.0f}", "Δ LE": "{:+,.0f}",
+                }, na_rep="N/A"),
+                use_container_width=True, hide_index=True
+            )
+
+    elif aba_cenario == "🗺️ Sensibilidade":
+        # Grade de combinações avaliada de uma vez; os demais parâmetros ficam nos sliders acima
+        col1, col2, col3, col4 = st.columns(4)
+        nomes_parametros = list(PARAMETROS_CENARIO)
+        with col1:
+            eixo_x = st.selectbox("Eixo X:", nomes_parametros, key="varredura_x",
+                                  format_func=lambda n: PARAMETROS_CENARIO[n][0])
+        with col2:
+            eixo_y = st.selectbox("Eixo Y:", [n for n in nomes_parametros if n != eixo_x], key="varredura_y",
+                                  format_func=lambda n: PARAMETROS_CENARIO[n][0])
+        with col3:
+            medida_varredura = st.selectbox("Medida:", list(MEDIDAS_VARREDURA), key="varredura_medida")
+        with col4:
+            pontos_varredura = st.select_slider("Pontos por eixo:", [11, 21, 41, 61, 101], value=41, key="varredura_pontos")
+
+        grade_varredura = {
+            **parametros_cenario,
+            eixo_x: np.linspace(PARAMETROS_CENARIO[eixo_x][1], PARAMETROS_CENARIO[eixo_x][2], pontos_varredura) / 100,
+            eixo_y: np.linspace(PARAMETROS_CENARIO[eixo_y][1], PARAMETROS_CENARIO[eixo_y][2], pontos_varredura) / 100,
+        }
+        with instrumentacao.secao("cenarios/varrer"):
+            varredura = base_cenarios.varrer(
+                grade_varredura, recorte_cenario & base_cenarios.linhas(ano=ano_selecionado)
+            )
+        if not varredura["Empresas"].iloc[0]:
+            st.info("Nenhuma empresa com wacc e Lucro Econômico calculáveis no recorte")
+        else:
+            coluna_medida, escala_medida = MEDIDAS_VARREDURA[medida_varredura]
+            mapa = varredura.pivot(index=eixo_y, columns=eixo_x, values=coluna_medida) * escala_medida
+            mapa.index, mapa.columns = mapa.index * 100, mapa.columns * 100
+
+            st.subheader(f"{medida_varredura}: {len(varredura):,} combinações")
+            chave_varredura = (eixo_x, eixo_y, medida_varredura, pontos_varredura, tuple(parametros_cenario.values()))
+            fig_varredura = grafico(f"fig_varredura_{chave_varredura}", lambda: px.imshow(
+                mapa, origin="lower", aspect="auto", color_continuous_scale="RdBu",
+                labels={"x": PARAMETROS_CENARIO[eixo_x][0], "y": PARAMETROS_CENARIO[eixo_y][0], "color": medida_varredura},
+            ))
+            st.plotly_chart(fig_varredura, use_container_width=True)
+            st.caption(f"{int(varredura['Empresas'].iloc[0])} empresas com wacc e Lucro Econômico calculáveis no recorte.")
+
+# ==============================
+# TELA - QUALIDADE DOS DADOS
+# ==============================
+elif modo_analise == "🩺 Qualidade dos Dados":
+    st.header("🩺 Qualidade dos Dados")
+    st.caption("Regras verificadas na base inteira a cada atualização do snapshot; cada linha abaixo é uma ocorrência.")
+
+    resumo_problemas = qualidade.resumo_qualidade(problemas)
+    problemas_ano = problemas[problemas["Ano"] == ano_selecionado]
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Ocorrências", f"{len(problemas):,}", help="Todas as regras, todos os anos")
+    with col2:
+        st.metric("Erros", f"{int((problemas['Severidade'] == 'erro').sum()):,}")
+    with col3:
+        st.metric("Avisos", f"{int((problemas['Severidade'] == 'aviso').sum()):,}")
+    with col4:
+        st.metric(f"Empresas afetadas em {ano_selecionado}", f"{problemas_ano['Ticker'].nunique()}")
+
+    st.subheader("Regras")
+    st.dataframe(resumo_problemas, use_container_width=True, hide_index=True)
+
+    if problemas.empty:
+        st.success("✅ Nenhuma ocorrência nas regras de qualidade")
+    else:
+        st.subheader("Ocorrências por Ano")
+        por_ano_regra = problemas.groupby(["Ano", "Regra"], observed=True).size().rename("Ocorrências").reset_index()
+        fig_qualidade = grafico("fig_qualidade_anos", lambda: px.bar(
+            por_ano_regra, x="Ano", y="Ocorrências", color="Regra"
+        ))
+        st.plotly_chart(fig_qualidade, use_container_width=True)
+
+        st.subheader("Ocorrências")
+        col1, col2, col3 = st.columns([2, 1, 1])
+        with col1:
+            regras_com_ocorrencia = resumo_problemas.loc[resumo_problemas["Ocorrências"] > 0, "Regra"].tolist()
+            regras_filtro = st.multiselect("Regras:", regras_com_ocorrencia, default=regras_com_ocorrencia,
+                                           key="qualidade_regras")
+        with col2:
+            busca_qualidade = st.text_input("Ticker contém:", key="qualidade_busca")
+        with col3:
+            so_ano = st.checkbox(f"Só {ano_selecionado}", key="qualidade_so_ano")
+        detalhe = problemas_ano if so_ano else problemas
+        detalhe = detalhe[detalhe["Regra"].isin(regras_filtro)]
+        if busca_qualidade.strip():
+            detalhe = detalhe[detalhe["Ticker"].astype(str).str.contains(busca_qualidade.strip().upper(), regex=False)]
+        limite_linhas = 1000
+        with instrumentacao.secao("tabela/qualidade"):
+            st.dataframe(
+                detalhe.head(limite_linhas).style.format({"Valor": "{:,.2f}"}, na_rep="N/A"),
+                use_container_width=True, hide_index=True
+            )
+        if len(detalhe) > limite_linhas:
+            st.caption(f"Mostrando {limite_linhas:,} de {len(detalhe):,} ocorrências; o CSV traz todas as filtradas.")
+        st.download_button(
+            "⬇️ Baixar ocorrências (CSV)",
+            data=lambda: detalhe.to_csv(index=False).encode("utf-8"),
+            file_name="cvm_qualidade.csv",
+            mime="text/csv",
+            key="baixar_qualidade",
+        )
+
 # ==============================
 # SEÇÃO DE FÓRMULAS DOS INDICADORES
 # ==============================
@@ -822,10 +1270,93 @@ st.sidebar.info(
     "calculados conforme metodologia da aba 'Indicadores' do Excel original. "
     "Os dados são provenientes das demonstrações financeiras consolidadas."
 )
+# Exportação do recorte atual, lida do snapshot (nada é recalculado). O download_button
+# guarda o arquivo inteiro em memória no servidor (bytes da resposta), então o app só
+# exporta o recorte da tela; a base completa sai pela CLI, escrita em disco lote a lote
+with st.sidebar.expander("⬇️ Exportar Dados"):
+    formato_exportacao = st.selectbox("Formato:", list(exportacao.FORMATOS), key="formato_exportacao")
+    colunas_exportacao = st.multiselect(
+        "Colunas (vazio = todas):", opcoes["colunas"], key="colunas_exportacao"
+    )
+    if modo_analise == "📈 Visão por Empresa":
+        recorte_exportacao = {"anos": ano_selecionado, "tickers": ticker_selecionado}
+    elif modo_analise == "🏭 Análise Setorial":
+        recorte_exportacao = {"anos": ano_selecionado, "setores": setor_selecionado}
+    elif modo_analise == "📉 Comparação de Empresas":
+        recorte_exportacao = {"anos": list(range(ano_inicial, ano_final + 1)), "tickers": list(tickers_comparados)}
+    else:
+        recorte_exportacao = {"anos": ano_selecionado}
+    extensao_exportacao, mime_exportacao = exportacao.FORMATOS[formato_exportacao]
+    # data como função: o arquivo só é gerado quando o botão é clicado
+    st.download_button(
+        "⬇️ Baixar recorte atual",
+        data=lambda: exportacao.exportar(
+            diretorio_dados, formato_exportacao, colunas=colunas_exportacao or None, **recorte_exportacao
+        ),
+        file_name=f"cvm_indicadores.{extensao_exportacao}",
+        mime=mime_exportacao,
+        key="baixar_exportacao",
+    )
+    st.caption("Base completa: `python -m cvm_indicators export --out indicadores.parquet`")
+
+# Versão dos dados servida (troca em segundo plano quando a planilha muda)
+if st.session_state.get("versao_dados") not in (None, versao_dados["id"]):
+    st.toast("🔄 Dados atualizados para uma nova versão da planilha")
+st.session_state["versao_dados"] = versao_dados["id"]
+st.sidebar.caption(
+    f"🔄 Versão dos dados: {versao_dados['id']} "
+    f"(ativa desde {time.strftime('%d/%m %H:%M', time.localtime(versao_dados['ativada_em']))})"
+)
+if versao_dados["manifesto"].get("linhas_sem_chave"):
+    st.sidebar.caption(f"⚠️ {versao_dados['manifesto']['linhas_sem_chave']} linha(s) da planilha sem Ticker ou Ano ignorada(s)")
+if atualizador.erro:
+    st.sidebar.warning(
+        f"Última atualização falhou ({atualizador.erro['mensagem']}); servindo a versão anterior"
+    )
+
+stats_figuras = load_cache_figuras().estatisticas()
+st.sidebar.caption(
+    f"🖼️ Cache de gráficos: {stats_figuras['acertos']} acertos / {stats_figuras['faltas']} faltas "
+    f"({stats_figuras['itens']}/{stats_figuras['max_itens']} figuras)"
+)
+
+# Painel de depuração: medições deste rerun + export (log JSON / Prometheus)
+if medicao is not None:
+    medicao.finalizar()
+    metricas = load_metricas()
+    metricas.acumular(medicao)
+    instrumentacao.configurar_log()
+    medicao.registrar_log(modo=modo_analise, ano=ano_selecionado, filtro=filtro_selecionado)
+    if os.environ.get("CVM_METRICAS_ARQUIVO"):
+        metricas.gravar_prometheus(os.environ["CVM_METRICAS_ARQUIVO"])
+
+    with st.sidebar.expander("🩺 Desempenho deste rerun", expanded=True):
+        st.caption(f"Total: {medicao.total * 1e3:.1f} ms")
+        secoes_df = pd.DataFrame(medicao.resumo())
+        if not secoes_df.empty:
+            secoes_df["ms"] = secoes_df["segundos"] * 1e3
+            secoes_df["max ms"] = secoes_df["max_segundos"] * 1e3
+            colunas_secoes = ["secao", "execucoes", "ms", "max ms"]
+            if medicao.memoria:
+                secoes_df["pico MiB"] = pd.to_numeric(secoes_df["pico_bytes"]) / 2**20
+                colunas_secoes.append("pico MiB")
+            st.dataframe(secoes_df[colunas_secoes].round(2), hide_index=True, use_container_width=True)
+        if medicao.chamadas_cache:
+            cache_df = (
+                pd.DataFrame(medicao.chamadas_cache)
+                .groupby(["funcao", "resultado"], as_index=False)
+                .agg(chamadas=("segundos", "size"), ms=("segundos", "sum"))
+            )
+            cache_df["ms"] = (cache_df["ms"] * 1e3).round(2)
+            st.dataframe(cache_df, hide_index=True, use_container_width=True)
+        st.download_button(
+            "⬇️ Métricas (Prometheus)", metricas.texto_prometheus(),
+            file_name="cvm_dashboard.prom", mime="text/plain"
+        )
 
 # Rodapé
 st.divider()
-st.caption(f"📊 Dashboard CVM - Indicadores Financeiros | Dados atualizados para {ano_selecionado} | Total de empresas na base: {df['Ticker'].nunique()}")
+st.caption(f"📊 Dashboard CVM - Indicadores Financeiros | Dados atualizados para {ano_selecionado} | Total de empresas na base: {len(opcoes['tickers'])}")
 
 # Adicionar informações sobre os cálculos
 with st.sidebar.expander("💡 Metodologia CPFE3 - VERSÃO FINAL CORRIGIDA"):
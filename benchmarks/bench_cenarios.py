@@ -0,0 +1,71 @@
+# ==============================================================
+# ⏱️ BENCHMARK - varredura de cenários de WACC vs laço de cenários
+# ==============================================================
+# Uso: python benchmarks/bench_cenarios.py [--tickers 3000] [--pontos 21 101]
+# Rodar o motor de indicadores inteiro por cenário é só estimado (tempo de
+# uma derivação × cenários). O laço refaz em pandas só o bloco de custo de
+# capital a cada combinação; a varredura avalia a grade inteira de uma vez
+# sobre os arrays base.
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.sintetico import gerar  # noqa: E402
+from cvm_indicators.cenarios import BaseCenarios  # noqa: E402
+from cvm_indicators.indicadores import calcular_indicadores  # noqa: E402
+
+
+def laco_de_cenarios(df, grade):
+    validas = df[["ki", "ke", "Percentual Capital Terceiros", "Percentual Capital Próprio",
+                  "ROI", "Investimento Médio"]].notna().all(axis=1)
+    base = df[validas]
+    resultados = []
+    for delta_ki in grade["delta_ki"]:
+        for delta_ke in grade["delta_ke"]:
+            ki = base["ki"] + delta_ki
+            ke = base["ke"] + delta_ke
+            wacc = ki * base["Percentual Capital Terceiros"] + ke * base["Percentual Capital Próprio"]
+            lucro = (base["ROI"] - wacc) * base["Investimento Médio"]
+            resultados.append((lucro.sum(), (lucro > 0).mean()))
+    return np.array(resultados)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickers", type=int, default=3000)
+    parser.add_argument("--anos", type=int, default=15)
+    parser.add_argument("--pontos", type=int, nargs="+", default=[21, 101], help="Valores por parâmetro (grade pontos²)")
+    args = parser.parse_args(argv)
+
+    bruto = gerar(n_tickers=args.tickers, n_anos=args.anos)
+    inicio = time.perf_counter()
+    df = calcular_indicadores(bruto)
+    t_motor = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    cenarios = BaseCenarios(df)
+    print(f"Frame sintético: {len(df):,} linhas | motor completo: {t_motor * 1e3:.1f} ms por cenário"
+          f" | arrays base: {(time.perf_counter() - inicio) * 1e3:.1f} ms (uma vez)")
+
+    for pontos in args.pontos:
+        grade = {"delta_ki": np.linspace(-0.05, 0.05, pontos), "delta_ke": np.linspace(-0.05, 0.05, pontos)}
+
+        inicio = time.perf_counter()
+        varredura = cenarios.varrer(grade)
+        t_varredura = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        laco = laco_de_cenarios(df, grade)
+        t_laco = time.perf_counter() - inicio
+
+        np.testing.assert_allclose(varredura[["Lucro Econômico 1", "Criando valor"]].to_numpy(), laco, rtol=1e-9)
+        print(f"{pontos ** 2:>6,} cenários | motor por cenário: ~{t_motor * pontos ** 2:.1f} s"
+              f" | laço: {t_laco * 1e3:9.1f} ms | varredura: {t_varredura * 1e3:7.1f} ms | {t_laco / t_varredura:6.1f}×")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# ==============================================================
+# ⏱️ BENCHMARK - painel de comparação vetorizado vs laço por ticker
+# ==============================================================
+# Uso: python benchmarks/bench_comparacao.py [--universo 3000] [--tickers 500] [--anos 20]
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.sintetico import gerar  # noqa: E402
+from cvm_indicators import comparacao  # noqa: E402
+from cvm_indicators.indicadores import calcular_indicadores  # noqa: E402
+
+INDICADORES = ["ROE", "ROA", "ROI", "ROI EBITDA", "Margem Líquida", "ki", "ke", "wacc",
+               "Investimento Médio", "Lucro Econômico 1", "Lucro Econômico 2"]
+
+
+def laco_por_ticker(df, tickers, anos):
+    # Padrão da Visão por Empresa estendido a N empresas: um filtro escalar por ticker/ano
+    linhas = []
+    for ticker in tickers:
+        for ano in range(anos[0], anos[1] + 1):
+            recorte = df[(df["Ticker"] == ticker) & (df["Ano"] == ano)]
+            if recorte.empty:
+                continue
+            linhas.append({"Ticker": ticker, "Ano": ano, **{c: recorte[c].iloc[0] for c in INDICADORES}})
+    return pd.DataFrame(linhas).set_index(["Ticker", "Ano"]).sort_index()
+
+
+def vetorizado(df, tickers, anos):
+    return comparacao.painel(df, tickers, anos, INDICADORES)
+
+
+def cronometrar(func, repeticoes, *args):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = func(*args)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--universo", type=int, default=3000, help="Tickers na base")
+    parser.add_argument("--tickers", type=int, default=500, help="Tickers comparados")
+    parser.add_argument("--anos", type=int, default=20)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    df = calcular_indicadores(gerar(n_tickers=args.universo, n_anos=args.anos), INDICADORES)
+    tickers = sorted(df["Ticker"].unique())[: args.tickers]
+    anos = (int(df["Ano"].min()), int(df["Ano"].max()))
+    print(f"Base: {len(df):,} linhas | comparando {len(tickers)} tickers × {args.anos} anos")
+
+    t_laco, r_laco = cronometrar(laco_por_ticker, 1, df, tickers, anos)
+    t_vet, r_vet = cronometrar(vetorizado, args.repeticoes, df, tickers, anos)
+    pd.testing.assert_frame_equal(r_vet, r_laco, check_dtype=False)
+    t_largo, _ = cronometrar(comparacao.largo, args.repeticoes, r_vet)
+    print(f"Laço por ticker/ano: {t_laco * 1e3:10.1f} ms")
+    print(f"Painel vetorizado:   {t_vet * 1e3:10.1f} ms | {t_laco / t_vet:6.0f}×")
+    print(f"Pivot Ano × (indicador, Ticker): {t_largo * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# ==============================================================
+# ⏱️ BENCHMARK - cópia por sessão (cache_data) vs dataset compartilhado
+# ==============================================================
+# Uso: python benchmarks/bench_compartilhado.py [--tickers 3000] [--anos 15] [--sessoes 50]
+# Simula N sessões pedindo o recorte de um ano e mantendo-o vivo (como o
+# frame de uma sessão aberta): memória alocada e tempo por sessão.
+import argparse
+import os
+import pickle
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_tipos import COLUNAS_DASHBOARD, INDICADORES_DASHBOARD  # noqa: E402
+from benchmarks.sintetico import gerar  # noqa: E402
+from cvm_indicators.compartilhado import DatasetCompartilhado  # noqa: E402
+from cvm_indicators.indicadores import calcular_indicadores  # noqa: E402
+from cvm_indicators.tipos import compactar  # noqa: E402
+
+
+def medir(entregar, sessoes):
+    # Bytes alocados e ainda vivos depois de N sessões
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    vivos = [entregar() for _ in range(sessoes)]
+    tempo = time.perf_counter() - inicio
+    atual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del vivos
+    return atual, tempo
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickers", type=int, default=3000)
+    parser.add_argument("--anos", type=int, default=15)
+    parser.add_argument("--sessoes", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    derivado = calcular_indicadores(gerar(n_tickers=args.tickers, n_anos=args.anos))
+    frame = compactar(derivado[COLUNAS_DASHBOARD + INDICADORES_DASHBOARD])
+    ano = int(frame["Ano"].max())
+    print(f"Base: {len(frame):,} linhas | {args.sessoes} sessões pedindo o ano {ano}")
+
+    # cache_data: guarda o recorte serializado e devolve uma cópia desserializada por chamada
+    serializado = pickle.dumps(frame[frame["Ano"] == ano].reset_index(drop=True), protocol=pickle.HIGHEST_PROTOCOL)
+    m_copia, t_copia = medir(lambda: pickle.loads(serializado), args.sessoes)
+
+    base = DatasetCompartilhado(frame)
+    m_view, t_view = medir(lambda: base.recorte(ano), args.sessoes)
+
+    print(f"Cópia por sessão:     {m_copia / 2**20:8.2f} MiB | {t_copia / args.sessoes * 1e3:.3f} ms/sessão")
+    print(f"Dataset compartilhado: {m_view / 2**20:8.2f} MiB | {t_view / args.sessoes * 1e3:.3f} ms/sessão")
+    print(f"(instância compartilhada, uma por processo: {base.df.memory_usage(deep=True).sum() / 2**20:.2f} MiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# ==============================================================
+# ⏱️ BENCHMARK - defasagens em passagem única vs groupby().shift()
+# ==============================================================
+# Uso: python benchmarks/bench_defasagens.py [--tickers 5000] [--anos 20]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.sintetico import gerar  # noqa: E402
+from cvm_indicators.defasagens import IndiceGrupos  # noqa: E402
+
+COLUNAS = [
+    "Ativo Total",
+    "Patrimônio Líquido Consolidado",
+    "Empréstimos e Financiamentos - Circulante",
+    "Empréstimos e Financiamentos - Não Circulante",
+]
+
+
+def groupby_repetido(df):
+    # Mesmo padrão do load_data() original: um groupby por coluna, Empréstimos duas vezes
+    g = {}
+    g["Ativo Total"] = df.groupby("Ticker")["Ativo Total"].shift(1)
+    g["Patrimônio Líquido Consolidado"] = df.groupby("Ticker")["Patrimônio Líquido Consolidado"].shift(1)
+    for _ in range(2):
+        g["Empréstimos e Financiamentos - Circulante"] = df.groupby("Ticker")["Empréstimos e Financiamentos - Circulante"].shift(1)
+        g["Empréstimos e Financiamentos - Não Circulante"] = df.groupby("Ticker")["Empréstimos e Financiamentos - Não Circulante"].shift(1)
+    g["Patrimônio Líquido Consolidado"] = df.groupby("Ticker")["Patrimônio Líquido Consolidado"].shift(1)
+    return np.column_stack([g[c].to_numpy() for c in COLUNAS])
+
+
+def passagem_unica(df):
+    return IndiceGrupos(df["Ticker"]).defasar(df[COLUNAS].to_numpy())
+
+
+def medias_groupby(df):
+    return [
+        df.groupby("Ticker")[COLUNAS].rolling(janela).mean().reset_index(level=0, drop=True).sort_index().to_numpy()
+        for janela in (3, 5)
+    ]
+
+
+def medias_passagem_unica(df):
+    indice = IndiceGrupos(df["Ticker"])
+    bloco = df[COLUNAS].to_numpy()
+    return [indice.media_movel(bloco, janela) for janela in (3, 5)]
+
+
+def cronometrar(func, df, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = func(df)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickers", type=int, default=5000)
+    parser.add_argument("--anos", type=int, default=20)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    df = gerar(n_tickers=args.tickers, n_anos=args.anos)
+    df = df.sort_values(["Ticker", "Ano"]).reset_index(drop=True)
+    print(f"Frame sintético: {args.tickers} tickers × {args.anos} anos = {len(df):,} linhas")
+
+    for titulo, antigo, novo in [
+        ("Defasagens t-1", groupby_repetido, passagem_unica),
+        ("Médias móveis 3a/5a", medias_groupby, medias_passagem_unica),
+    ]:
+        t_antigo, r_antigo = cronometrar(antigo, df, args.repeticoes)
+        t_novo, r_novo = cronometrar(novo, df, args.repeticoes)
+        np.testing.assert_allclose(np.asarray(r_novo), np.asarray(r_antigo), rtol=1e-9, equal_nan=True)
+        print(f"{titulo:<22} groupby: {t_antigo * 1e3:8.2f} ms | passagem única: {t_novo * 1e3:8.2f} ms "
+              f"| {t_antigo / t_novo:5.1f}×")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# ==============================================================
+# ⏱️ BENCHMARK - janelas plurianuais na grade vs laço por Ticker
+# ==============================================================
+# Uso: python benchmarks/bench_janelas.py [--tickers 1000] [--anos 20] [--lacunas 0.05]
+# O laço ingênuo reindexa cada Ticker nos anos do calendário e calcula
+# rolling/shift/polyfit série a série; a grade faz todas as janelas de
+# todas as colunas de uma vez. Uma fração das linhas é removida para
+# exercitar anos ausentes no meio das séries.
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.sintetico import gerar  # noqa: E402
+from cvm_indicators.indicadores import calcular_indicadores  # noqa: E402
+from cvm_indicators.janelas import ANOS_JANELA, CRESCIMENTO, MEDIAS, TENDENCIA, calcular_janelas, coluna  # noqa: E402
+
+
+def _inclinacao(valores):
+    # Reta de mínimos quadrados sobre os anos presentes da janela (todos exigidos)
+    if np.isnan(valores).any():
+        return np.nan
+    return np.polyfit(np.arange(len(valores), dtype=np.float64), valores, 1)[0]
+
+
+def laco_por_ticker(df):
+    anos = np.arange(df["Ano"].min(), df["Ano"].max() + 1)
+    partes = []
+    for ticker, grupo in df.groupby("Ticker", sort=False):
+        serie = grupo.set_index("Ano").reindex(anos)
+        saida = pd.DataFrame(index=anos)
+        for n in ANOS_JANELA:
+            for c in MEDIAS:
+                saida[coluna(c, "média móvel", n)] = serie[c].rolling(n).mean()
+            for rotulo, c in CRESCIMENTO.items():
+                inicio, fim = serie[c].shift(n), serie[c]
+                saida[coluna(rotulo, "CAGR", n)] = ((fim / inicio) ** (1 / n) - 1).where((inicio > 0) & (fim > 0))
+            for c in TENDENCIA:
+                saida[coluna(c, "tendência", n)] = serie[c].rolling(n).apply(_inclinacao, raw=True)
+        saida = saida.loc[grupo["Ano"].to_numpy()]
+        saida.index = grupo.index
+        partes.append(saida)
+    return pd.concat(partes).loc[df.index]
+
+
+def grade(df):
+    return calcular_janelas(df).drop(columns=["Ticker", "Ano", "SETOR_ATIV"])
+
+
+def cronometrar(func, df, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = func(df)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickers", type=int, default=1000)
+    parser.add_argument("--anos", type=int, default=20)
+    parser.add_argument("--lacunas", type=float, default=0.05, help="Fração de linhas removidas")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    df = calcular_indicadores(gerar(n_tickers=args.tickers, n_anos=args.anos))
+    rng = np.random.default_rng(1)
+    df = df[rng.random(len(df)) >= args.lacunas].reset_index(drop=True)
+    print(f"Frame sintético: {args.tickers} tickers × {args.anos} anos, {args.lacunas:.0%} de anos ausentes"
+          f" = {len(df):,} linhas")
+
+    t_laco, r_laco = cronometrar(laco_por_ticker, df, 1)
+    t_grade, r_grade = cronometrar(grade, df, args.repeticoes)
+    np.testing.assert_allclose(
+        r_grade.to_numpy(), r_laco[r_grade.columns].to_numpy(dtype=np.float64), rtol=1e-6, atol=1e-9, equal_nan=True
+    )
+    print(f"{r_grade.shape[1]} colunas | laço por Ticker: {t_laco * 1e3:9.1f} ms | grade: {t_grade * 1e3:7.1f} ms "
+          f"| {t_laco / t_grade:6.1f}×")
+
+
+if __name__ == "__main__":
+    main()
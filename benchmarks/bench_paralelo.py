@@ -0,0 +1,43 @@
+# ==============================================================
+# ⏱️ BENCHMARK - escalabilidade do cálculo paralelo por shards
+# ==============================================================
+# Uso: python benchmarks/bench_paralelo.py [--tickers 20000] [--anos 20] [--workers 1 2 4 8]
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.sintetico import gerar  # noqa: E402
+from cvm_indicators import calcular_indicadores  # noqa: E402
+from cvm_indicators.paralelo import calcular_indicadores_paralelo  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickers", type=int, default=20000)
+    parser.add_argument("--anos", type=int, default=20)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8])
+    args = parser.parse_args(argv)
+
+    df = gerar(n_tickers=args.tickers, n_anos=args.anos)
+    print(f"Frame sintético: {len(df):,} linhas | CPUs disponíveis: {os.cpu_count()}")
+
+    inicio = time.perf_counter()
+    serial = calcular_indicadores(df)
+    t_serial = time.perf_counter() - inicio
+    print(f"{'serial':>10}: {t_serial:7.2f} s")
+
+    for workers in args.workers:
+        inicio = time.perf_counter()
+        paralelo = calcular_indicadores_paralelo(df, workers=workers)
+        t = time.perf_counter() - inicio
+        pd.testing.assert_frame_equal(paralelo, serial)
+        print(f"{workers:>3} workers: {t:7.2f} s | {t_serial / t:4.1f}× (saída idêntica)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# ==============================================================
+# ⏱️ BENCHMARK - screener paginado vs tabela inteira estilizada
+# ==============================================================
+# Uso: python benchmarks/bench_screener.py [--universos 300 3000 30000] [--tamanho 25]
+# Para cada universo (empresas num ano): tempo de ordenar + formatar e
+# tamanho do que seria enviado (Arrow IPC dos dados + HTML do Styler) ao
+# mandar o frame todo vs só a página visível.
+import argparse
+import os
+import sys
+import time
+
+import pyarrow as pa
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_tipos import COLUNAS_DASHBOARD, INDICADORES_DASHBOARD  # noqa: E402
+from benchmarks.sintetico import gerar  # noqa: E402
+from cvm_indicators.indicadores import calcular_indicadores  # noqa: E402
+from cvm_indicators.paginacao import Paginador  # noqa: E402
+from cvm_indicators.tipos import RAZOES, compactar  # noqa: E402
+
+FORMATOS = {c: "{:.2%}" for c in RAZOES}
+
+
+def enviar(df):
+    # Bytes dos dados (Arrow) + da formatação (Styler): o que a tabela serializa
+    inicio = time.perf_counter()
+    html = df.style.format(FORMATOS, na_rep="N/A").to_html()
+    sink = pa.BufferOutputStream()
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.ipc.new_stream(sink, tabela.schema) as writer:
+        writer.write_table(tabela)
+    return time.perf_counter() - inicio, len(html) + sink.getvalue().size
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--universos", type=int, nargs="+", default=[300, 3000, 30000])
+    parser.add_argument("--tamanho", type=int, default=25, help="Linhas por página")
+    args = parser.parse_args(argv)
+
+    for universo in args.universos:
+        derivado = calcular_indicadores(gerar(n_tickers=universo, n_anos=2))
+        ano = derivado[derivado["Ano"] == derivado["Ano"].max()]
+        df = compactar(ano[COLUNAS_DASHBOARD + INDICADORES_DASHBOARD]).reset_index(drop=True)
+
+        inicio = time.perf_counter()
+        inteiro = df.sort_values("ROE", ascending=False)
+        t_ordem = time.perf_counter() - inicio
+        t_inteiro, b_inteiro = enviar(inteiro)
+
+        paginador = Paginador(df)
+        paginador.ordem("ROE")  # montada uma vez por ano, fora do rerun
+        inicio = time.perf_counter()
+        janela = paginador.janela(paginador.selecao("ROE"), 2, args.tamanho)
+        t_pagina = time.perf_counter() - inicio
+        t_janela, b_janela = enviar(janela)
+
+        print(f"{len(df):>7,} empresas | inteiro: {(t_ordem + t_inteiro) * 1e3:9.1f} ms {b_inteiro / 2**10:9.0f} KiB"
+              f" | página: {(t_pagina + t_janela) * 1e3:6.1f} ms {b_janela / 2**10:6.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
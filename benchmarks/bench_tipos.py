@@ -0,0 +1,74 @@
+# ==============================================================
+# ⏱️ BENCHMARK - memória do frame em cache antes/depois dos tipos compactos
+# ==============================================================
+# Uso: python benchmarks/bench_tipos.py [--tickers 297] [--anos 15] [--float32]
+# Mede o frame completo de indicadores e o recorte de um ano com as colunas
+# do dashboard: bytes em memória, bytes serializados (o que o st.cache_data
+# guarda e copia por sessão) e o tempo de cópia via pickle.
+import argparse
+import os
+import pickle
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.sintetico import gerar  # noqa: E402
+from cvm_indicators.indicadores import calcular_indicadores  # noqa: E402
+from cvm_indicators.tipos import compactar, relatorio_memoria  # noqa: E402
+
+COLUNAS_DASHBOARD = [
+    "Ticker", "Ano", "SETOR_ATIV", "Ativo Total",
+    "Empréstimos e Financiamentos - Circulante", "Empréstimos e Financiamentos - Não Circulante",
+    "Patrimônio Líquido Consolidado", "Receita de Venda de Bens e/ou Serviços", "Resultado Bruto",
+    "Resultado Antes do Resultado Financeiro e dos Tributos", "Despesas Financeiras",
+    "Lucro/Prejuízo Consolidado do Período", "Pagamento de Dividendos",
+]
+INDICADORES_DASHBOARD = [
+    "ROE", "ROA", "ROI", "Margem Líquida", "wacc", "ROI EBITDA", "Margem Bruta", "Margem Operacional",
+    "Percentual Capital Terceiros", "Percentual Capital Próprio", "ki", "ke", "Investimento Médio",
+    "Lucro Econômico 1", "Lucro Econômico 2", "Lucro Econômico EBITDA", "Alavancagem Eficaz",
+]
+
+
+def copia_por_pickle(df, repeticoes=5):
+    # Custo de entregar uma cópia à sessão (serializar + desserializar, como o cache_data)
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        pickle.loads(pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL))
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def comparar(titulo, antes, depois):
+    por_coluna, totais = relatorio_memoria(antes, depois)
+    print(f"\n{titulo}: {len(antes):,} linhas")
+    print(f"  memória:     {totais['memoria_bytes_antes'] / 2**20:8.2f} MiB -> "
+          f"{totais['memoria_bytes_depois'] / 2**20:8.2f} MiB ({totais['reducao_memoria']:.0%} menor)")
+    print(f"  serializado: {totais['pickle_bytes_antes'] / 2**20:8.2f} MiB -> "
+          f"{totais['pickle_bytes_depois'] / 2**20:8.2f} MiB ({totais['reducao_pickle']:.0%} menor)")
+    print(f"  cópia por sessão: {copia_por_pickle(antes) * 1e3:.2f} ms -> {copia_por_pickle(depois) * 1e3:.2f} ms")
+    print(por_coluna.head(8).to_string())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickers", type=int, default=297)
+    parser.add_argument("--anos", type=int, default=15)
+    parser.add_argument("--float32", action="store_true", help="Razões em float32")
+    args = parser.parse_args(argv)
+
+    derivado = calcular_indicadores(gerar(n_tickers=args.tickers, n_anos=args.anos))
+    comparar("Frame completo", derivado, compactar(derivado, float32=args.float32))
+
+    ano = derivado[derivado["Ano"] == derivado["Ano"].max()]
+    comparar(
+        "Recorte de um ano (o antigo load_data: todas as colunas)",
+        ano,
+        compactar(ano[COLUNAS_DASHBOARD + INDICADORES_DASHBOARD], float32=args.float32),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# ==============================================================
+# 🧪 DADOS SINTÉTICOS NO ESQUEMA DO data_frame.xlsx
+# ==============================================================
+import numpy as np
+import pandas as pd
+
+from cvm_indicators.ingestao import COLUNAS_CONTAS as CONTAS
+
+
+
+def gerar(n_tickers=300, n_anos=15, n_setores=40, ano_inicial=2010, fracao_nula=0.03, seed=0):
+    """Frame sintético (n_tickers × n_anos linhas) com as colunas da planilha original."""
+    rng = np.random.default_rng(seed)
+    n = n_tickers * n_anos
+    tickers = np.array([f"T{i:05d}3" for i in range(n_tickers)])
+    setores = np.array([f"Setor {i:02d}" for i in range(n_setores)])
+    setor_ticker = setores[rng.integers(0, n_setores, n_tickers)]
+
+    df = pd.DataFrame({
+        "Ticker": np.repeat(tickers, n_anos),
+        "Ano": np.tile(np.arange(ano_inicial, ano_inicial + n_anos), n_tickers),
+        "CD_CVM": np.repeat(np.arange(10000, 10000 + n_tickers), n_anos),
+        "DENOM_CIA": np.repeat(np.char.add("EMPRESA ", tickers), n_anos),
+        "CNPJ_CIA": np.repeat([f"{i:08d}/0001-00" for i in range(n_tickers)], n_anos),
+        "SETOR_ATIV": np.repeat(setor_ticker, n_anos),
+        "Numero_Acoes": np.nan,
+        "Tipo_Acao": "Ordinárias",
+        "Versao": "DFP",
+    })
+
+    # Balanço coerente: Ativo = Passivo Circulante + Não Circulante + PL
+    escala = np.repeat(rng.lognormal(14, 1.5, n_tickers), n_anos) * rng.lognormal(0, 0.15, n)
+    ativo = escala
+    pc = ativo * rng.uniform(0.1, 0.4, n)
+    pnc = ativo * rng.uniform(0.1, 0.4, n)
+    pl = ativo - pc - pnc
+    receita = ativo * rng.uniform(0.2, 1.5, n)
+    custo = -receita * rng.uniform(0.4, 0.9, n)
+    ebit = (receita + custo) * rng.uniform(-0.2, 0.6, n)
+    rec_fin = ativo * rng.uniform(0, 0.05, n)
+    desp_fin = -ativo * rng.uniform(0, 0.08, n)
+    lair = ebit + rec_fin + desp_fin
+    lucro = lair * rng.uniform(0.6, 0.8, n)
+
+    contas = {
+        "Ativo Total": ativo,
+        "Ativo Circulante": ativo * rng.uniform(0.2, 0.6, n),
+        "Passivo Total": ativo,
+        "Passivo Circulante": pc,
+        "Empréstimos e Financiamentos - Circulante": pc * rng.uniform(0, 0.5, n),
+        "Passivo Não Circulante": pnc,
+        "Empréstimos e Financiamentos - Não Circulante": pnc * rng.uniform(0, 0.7, n),
+        "Patrimônio Líquido Consolidado": pl,
+        "Receita de Venda de Bens e/ou Serviços": receita,
+        "Custo dos Bens e/ou Serviços Vendidos": custo,
+        "Resultado Bruto": receita + custo,
+        "Resultado Antes do Resultado Financeiro e dos Tributos": ebit,
+        "Resultado Financeiro": rec_fin + desp_fin,
+        "Receitas Financeiras": rec_fin,
+        "Despesas Financeiras": desp_fin,
+        "Resultado Antes dos Tributos sobre o Lucro": lair,
+        "Lucro/Prejuízo Consolidado do Período": lucro,
+        "Caixa Líquido Atividades Operacionais": ebit * rng.uniform(0.5, 1.3, n),
+        "Pagamento de Dividendos": -np.maximum(lucro, 0) * rng.uniform(0, 0.6, n),
+        "Pagamento de Dividendos à Controladora": np.nan,
+        "Pagamento de Dividendos a Acionistas Não Controladores": np.nan,
+        "Pagamento de Juros sobre Capital Próprio": np.nan,
+    }
+    for nome in CONTAS:
+        valores = np.round(np.broadcast_to(contas[nome], n).astype(np.float64))
+        if fracao_nula:
+            valores = np.where(rng.random(n) < fracao_nula, np.nan, valores)
+        df[nome] = valores
+    return df
@@ -0,0 +1,266 @@
+# ==============================================================
+# ⏱️ SUÍTE DE BENCHMARKS - leitura, derivação, filtros e gráficos
+# ==============================================================
+# Mede cada estágio do dashboard sobre dados sintéticos no esquema do
+# data_frame.xlsx, do tamanho atual (297 tickers × 15 anos) até 100×.
+# Resultados em JSON para comparar execuções e pegar regressões:
+#
+#   python benchmarks/suite.py --escalas 1 10 100 --saida bench.json
+#   python benchmarks/suite.py --saida novo.json --comparar bench.json
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from benchmarks.sintetico import gerar  # noqa: E402
+from cvm_indicators import particoes, snapshot  # noqa: E402
+from cvm_indicators.cenarios import BaseCenarios  # noqa: E402
+from cvm_indicators.compartilhado import DatasetCompartilhado  # noqa: E402
+from cvm_indicators.fonte import ler_planilha  # noqa: E402
+from cvm_indicators.indicadores import calcular_indicadores  # noqa: E402
+from cvm_indicators.janelas import calcular_janelas  # noqa: E402
+from cvm_indicators.pontuacao import calcular_pontuacao  # noqa: E402
+from cvm_indicators.qualidade import verificar_qualidade  # noqa: E402
+from cvm_indicators.ranking import IndiceRanking  # noqa: E402
+from cvm_indicators.tipos import compactar  # noqa: E402
+
+TICKERS_BASE = 297
+ANOS_BASE = 15
+
+# Grupos de indicadores (mesmas seções de indicadores.py); cada medição inclui as dependências
+GRUPOS = {
+    "medias": ["Ativo Médio", "PL Médio", "Passivo Oneroso Médio", "Investimento Médio"],
+    "rentabilidade": ["ROA", "ROI", "ROE"],
+    "margens": ["Margem Bruta", "Margem Operacional", "Margem Líquida"],
+    "estrutura_capital": ["Total Passivo", "Percentual Capital Terceiros", "Percentual Capital Próprio"],
+    "custo_capital": ["ki", "ke", "wacc"],
+    "lucro_economico": ["EBITDA", "ROI EBITDA", "Lucro Econômico 1", "Lucro Econômico 2",
+                        "Diferença Lucro Econômico", "Lucro Econômico EBITDA"],
+    "alavancagem": ["Alavancagem Eficaz"],
+}
+
+# Mesmos rankings do app.py
+RANKINGS = {
+    "ROE": ("ROE", []),
+    "ROA": ("ROA", []),
+    "ROI": ("ROI", []),
+    "Margem Líquida": ("Margem Líquida", []),
+    "wacc": ("wacc", []),
+    "Lucro": ("Lucro/Prejuízo Consolidado do Período", []),
+    "Receita": ("Receita de Venda de Bens e/ou Serviços", []),
+    "PL": ("Patrimônio Líquido Consolidado", []),
+    "Rentabilidade": ("ROE", ["ROA", "ROI"]),
+    "Estrutura Capital": ("Patrimônio Líquido Consolidado", ["Percentual Capital Próprio"]),
+}
+
+
+def cronometrar(func, repeticoes):
+    """Menor tempo entre as repetições (segundos) e o último resultado."""
+    tempos = []
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = func()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+
+def _rankings_por_mascara(df, ano):
+    # Caminho antigo: filtro do ano + notna + nlargest/nsmallest por widget
+    f = df[df["Ano"] == ano]
+    saida = [f[f[c].notna()].nlargest(15, c) for c in ("ROE", "ROA", "ROI", "Margem Líquida")]
+    saida.append(f[f["wacc"].notna()].nsmallest(15, "wacc"))
+    saida += [f.nlargest(15, c) for c in ("Lucro/Prejuízo Consolidado do Período",
+                                          "Receita de Venda de Bens e/ou Serviços",
+                                          "Patrimônio Líquido Consolidado")]
+    saida.append(f[f["ROE"].notna() & f["ROA"].notna() & f["ROI"].notna()].nlargest(20, "ROE"))
+    return saida
+
+
+def _rankings_por_indice(indice, ano):
+    saida = [indice.top(ano, n, 15) for n in ("ROE", "ROA", "ROI", "Margem Líquida", "Lucro", "Receita", "PL")]
+    saida.append(indice.top(ano, "wacc", 15, ascendente=True))
+    saida.append(indice.top(ano, "Rentabilidade", 20))
+    return saida
+
+
+def medir_escala(escala, repeticoes, max_linhas_excel, diretorio):
+    bruto = gerar(n_tickers=TICKERS_BASE * escala, n_anos=ANOS_BASE)
+    linhas = len(bruto)
+    resultados = []
+
+    def registrar(estagio, segundos, **extra):
+        resultados.append({"escala": escala, "linhas": linhas, "estagio": estagio,
+                           "segundos": segundos, **extra})
+        print(f"  {estagio:<32} {segundos * 1e3:10.2f} ms")
+
+    print(f"Escala {escala}× ({linhas:,} linhas)")
+
+    # --- Leitura ---
+    xlsx = os.path.join(diretorio, f"sintetico_{escala}.xlsx")
+    if linhas <= max_linhas_excel:
+        bruto.to_excel(xlsx, index=False)
+        t, _ = cronometrar(lambda: ler_planilha(xlsx), max(1, repeticoes // 2))
+        registrar("leitura/excel", t)
+    else:
+        resultados.append({"escala": escala, "linhas": linhas, "estagio": "leitura/excel", "pulado": True})
+        print(f"  {'leitura/excel':<32} (pulado: acima de --max-linhas-excel)")
+
+    fonte = os.path.join(diretorio, f"sintetico_{escala}.parquet")
+    bruto.to_parquet(fonte, index=False)
+    cache = os.path.join(diretorio, f"cache_{escala}")
+    t, _ = cronometrar(lambda: snapshot.construir_snapshot(fonte, cache, incremental=False), 1)
+    registrar("snapshot/construir", t)
+    t, df = cronometrar(lambda: snapshot.carregar(fonte, cache), repeticoes)
+    registrar("snapshot/ler_arrow", t)
+    destino = snapshot.diretorio_particoes(fonte, cache)
+    ano = int(df["Ano"].max())
+    t, _ = cronometrar(lambda: particoes.ler_particoes(destino, ano=ano), repeticoes)
+    registrar("particoes/ler_ano", t)
+
+    # --- Derivação ---
+    t, _ = cronometrar(lambda: calcular_indicadores(bruto), repeticoes)
+    registrar("derivacao/total", t)
+    for grupo, indicadores in GRUPOS.items():
+        t, _ = cronometrar(lambda: calcular_indicadores(bruto, indicadores), repeticoes)
+        registrar(f"derivacao/{grupo}", t)
+
+    t, _ = cronometrar(lambda: calcular_pontuacao(df), repeticoes)
+    registrar("pontuacao/calcular", t)
+
+    t, _ = cronometrar(lambda: calcular_janelas(df), repeticoes)
+    registrar("janelas/calcular", t)
+
+    t, _ = cronometrar(lambda: verificar_qualidade(df), repeticoes)
+    registrar("qualidade/verificar", t)
+
+    cenarios = BaseCenarios(df)
+    grade = {"delta_ki": np.linspace(-0.05, 0.05, 41), "delta_ke": np.linspace(-0.05, 0.05, 41)}
+    t, _ = cronometrar(lambda: cenarios.avaliar(delta_ki=0.01, aliquota=0.34), repeticoes)
+    registrar("cenarios/avaliar", t)
+    t, _ = cronometrar(lambda: cenarios.varrer(grade), repeticoes)
+    registrar("cenarios/varrer_1681", t)
+
+    # --- Filtros e rankings por modo ---
+    ticker = df["Ticker"].iloc[len(df) // 2]
+    setor = df["SETOR_ATIV"].dropna().iloc[0]
+    t, _ = cronometrar(lambda: df[df["Ano"] == ano], repeticoes)
+    registrar("filtro/ranking_mascara", t)
+    t, _ = cronometrar(lambda: df[(df["Ticker"] == ticker) & (df["Ano"] == ano)], repeticoes)
+    registrar("filtro/empresa_mascara", t)
+    t, _ = cronometrar(lambda: df[(df["SETOR_ATIV"] == setor) & (df["Ano"] == ano)], repeticoes)
+    registrar("filtro/setor_mascara", t)
+    t, _ = cronometrar(lambda: {
+        "anos": sorted(df["Ano"].unique()), "setores": sorted(df["SETOR_ATIV"].dropna().unique()),
+        "tickers": sorted(df["Ticker"].dropna().unique()),
+    }, repeticoes)
+    registrar("filtro/opcoes_unique", t)
+    t, base = cronometrar(lambda: DatasetCompartilhado(compactar(df)), max(1, repeticoes // 2))
+    registrar("filtro/indice_construir", t)
+    t, _ = cronometrar(lambda: base.recorte(ano), repeticoes)
+    registrar("filtro/ranking_indice", t)
+    t, _ = cronometrar(lambda: base.recorte(ano, ticker=ticker), repeticoes)
+    registrar("filtro/empresa_indice", t)
+    t, _ = cronometrar(lambda: base.recorte(ano, setor=setor), repeticoes)
+    registrar("filtro/setor_indice", t)
+    t, _ = cronometrar(lambda: _rankings_por_mascara(df, ano), repeticoes)
+    registrar("ranking/nlargest_por_widget", t)
+    t, indice = cronometrar(lambda: IndiceRanking(df, RANKINGS, por_setor=True), repeticoes)
+    registrar("ranking/indice_construir", t)
+    t, _ = cronometrar(lambda: _rankings_por_indice(indice, ano), repeticoes)
+    registrar("ranking/indice_top_n", t)
+
+    # --- Gráficos (Plotly importado só aqui; o pacote não depende dele) ---
+    import plotly.express as px
+
+    top = indice.top(ano, "ROE", 15, ["Ticker", "SETOR_ATIV", "ROE"])
+    t, fig = cronometrar(lambda: px.bar(top, x="Ticker", y="ROE", color="SETOR_ATIV", title="ROE"), repeticoes)
+    registrar("grafico/px_bar", t)
+    t, _ = cronometrar(fig.to_json, repeticoes)
+    registrar("grafico/to_json", t)
+
+    return resultados
+
+
+def _commit_atual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(atual, anterior, limite):
+    """Imprime estágios que ficaram mais de `limite` (fração) mais lentos. Retorna quantos."""
+    base = {(r["escala"], r["estagio"]): r["segundos"] for r in anterior["resultados"] if "segundos" in r}
+    regressoes = 0
+    for r in atual["resultados"]:
+        antes = base.get((r["escala"], r["estagio"]))
+        if antes is None or "segundos" not in r:
+            continue
+        variacao = r["segundos"] / antes - 1
+        if variacao > limite:
+            regressoes += 1
+            print(f"REGRESSÃO {r['estagio']} ({r['escala']}×): "
+                  f"{antes * 1e3:.2f} → {r['segundos'] * 1e3:.2f} ms (+{variacao:.0%})")
+    return regressoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--escalas", type=int, nargs="+", default=[1, 10, 100],
+                        help="Múltiplos do tamanho atual da planilha (297 tickers × 15 anos)")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--max-linhas-excel", type=int, default=50_000,
+                        help="Acima disso a leitura do Excel é pulada (gerar o .xlsx é lento)")
+    parser.add_argument("--saida", default="bench_output.json")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior")
+    parser.add_argument("--limite", type=float, default=0.2, help="Tolerância para regressão (0.2 = +20%)")
+    args = parser.parse_args(argv)
+
+    import numpy
+    import plotly
+    import pyarrow
+
+    relatorio = {
+        "meta": {
+            "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _commit_atual(),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "cpus": os.cpu_count(),
+            "pandas": pd.__version__,
+            "numpy": numpy.__version__,
+            "pyarrow": pyarrow.__version__,
+            "plotly": plotly.__version__,
+            "repeticoes": args.repeticoes,
+        },
+        "resultados": [],
+    }
+    with tempfile.TemporaryDirectory() as diretorio:
+        for escala in args.escalas:
+            relatorio["resultados"] += medir_escala(escala, args.repeticoes, args.max_linhas_excel, diretorio)
+
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2)
+    print(f"Resultados gravados em {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            regressoes = comparar(relatorio, json.load(f), args.limite)
+        return 1 if regressoes else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
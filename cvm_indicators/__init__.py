@@ -0,0 +1,123 @@
+# ==============================================================
+# 📊 CVM INDICATORS - leitura, cálculo e cache dos indicadores
+# ==============================================================
+# Pacote sem dependência de Streamlit/Plotly (não importar nenhum dos dois
+# aqui): usado pelo app.py e pela CLI em lote, por exemplo
+#   python -m cvm_indicators compute --in data_frame.xlsx --out indicadores.parquet
+#   python -m cvm_indicators export --out bancos.csv --setores Bancos --anos 2023 2024
+from .atualizacao import Atualizador, validar_derivado
+from .cache_figuras import CacheFiguras
+from .cenarios import BaseCenarios
+from .compartilhado import DatasetCompartilhado, FrameSomenteLeitura, somente_leitura
+from .comparacao import INDICADORES_TENDENCIA, painel
+from .cubo import construir_cubo
+from .exportacao import csv_em_blocos, exportar
+from .fonte import CAMINHOS_POSSIVEIS, gravar_frame, localizar_planilha, ler_planilha
+from .defasagens import IndiceGrupos
+from .indicadores import (
+    INDICADORES,
+    anterior,
+    calcular_indicadores,
+    colunas_necessarias,
+    indicador,
+    indicadores_publicos,
+    media_anos,
+    ordem_calculo,
+    profundidade_defasagem,
+)
+from .incremental import recalcular_incremental
+from .ingestao import ingerir, ingerir_arquivos, ler_contas
+from .instrumentacao import Instrumentacao, Metricas
+from .janelas import ANOS_JANELA, calcular_janelas
+from .paralelo import calcular_indicadores_paralelo
+from .paginacao import Paginador, total_paginas
+from .particoes import (
+    anos_disponiveis,
+    escrever_particoes,
+    ler_particoes,
+    lotes_particoes,
+    setores_disponiveis,
+)
+from .pontuacao import INDICADORES_PONTUACAO, calcular_pontuacao
+from .qualidade import REGRAS, resumo_qualidade, verificar_qualidade
+from .ranking import IndiceRanking
+from .snapshot import (
+    carregar,
+    construir_snapshot,
+    diretorio_particoes,
+    garantir_snapshot,
+    ler_cubo,
+    ler_indicadores,
+    ler_janelas,
+    ler_pontuacao,
+    ler_qualidade,
+    lotes_indicadores,
+    remover_artefatos,
+    snapshot_valido,
+)
+from .tipos import compactar, relatorio_memoria
+
+__all__ = [
+    "Atualizador",
+    "validar_derivado",
+    "CacheFiguras",
+    "BaseCenarios",
+    "DatasetCompartilhado",
+    "FrameSomenteLeitura",
+    "somente_leitura",
+    "INDICADORES_TENDENCIA",
+    "painel",
+    "construir_cubo",
+    "csv_em_blocos",
+    "exportar",
+    "CAMINHOS_POSSIVEIS",
+    "gravar_frame",
+    "localizar_planilha",
+    "ler_planilha",
+    "IndiceGrupos",
+    "INDICADORES",
+    "anterior",
+    "calcular_indicadores",
+    "colunas_necessarias",
+    "indicador",
+    "indicadores_publicos",
+    "media_anos",
+    "ordem_calculo",
+    "profundidade_defasagem",
+    "recalcular_incremental",
+    "ingerir",
+    "ingerir_arquivos",
+    "ler_contas",
+    "Instrumentacao",
+    "Metricas",
+    "ANOS_JANELA",
+    "calcular_janelas",
+    "calcular_indicadores_paralelo",
+    "Paginador",
+    "total_paginas",
+    "anos_disponiveis",
+    "escrever_particoes",
+    "ler_particoes",
+    "lotes_particoes",
+    "setores_disponiveis",
+    "INDICADORES_PONTUACAO",
+    "calcular_pontuacao",
+    "REGRAS",
+    "resumo_qualidade",
+    "verificar_qualidade",
+    "IndiceRanking",
+    "carregar",
+    "construir_snapshot",
+    "diretorio_particoes",
+    "garantir_snapshot",
+    "ler_cubo",
+    "ler_indicadores",
+    "ler_janelas",
+    "ler_pontuacao",
+    "ler_qualidade",
+    "lotes_indicadores",
+    "remover_artefatos",
+    "snapshot_valido",
+    "compactar",
+    "relatorio_memoria",
+]
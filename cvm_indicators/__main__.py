@@ -0,0 +1,138 @@
+# ==============================================================
+# 🖥️ CLI - python -m cvm_indicators <comando>
+# ==============================================================
+import argparse
+import sys
+import time
+
+from . import exportacao, ingestao, snapshot
+from .fonte import CAMINHOS_POSSIVEIS, gravar_frame, ler_planilha, localizar_planilha
+from .indicadores import INDICADORES
+from .paralelo import calcular_indicadores_paralelo
+
+
+def _resolver_planilha(caminho):
+    data_path = caminho or localizar_planilha()
+    if data_path is None:
+        sys.exit(
+            "Arquivo 'data_frame.xlsx' não encontrado. Caminhos verificados:\n- "
+            + "\n- ".join(CAMINHOS_POSSIVEIS)
+        )
+    return data_path
+
+
+def cmd_snapshot(args):
+    data_path = _resolver_planilha(args.entrada)
+    inicio = time.perf_counter()
+    if not args.force and snapshot.snapshot_valido(data_path, args.cache_dir):
+        print(f"Snapshot já atualizado para {data_path}")
+        return 0
+    _, derivado = snapshot.construir_snapshot(
+        data_path, args.cache_dir, incremental=not args.completo, workers=args.workers,
+        remover_anterior=args.limpar,
+    )
+    manifesto = snapshot.snapshot_valido(data_path, args.cache_dir)
+    estatisticas = manifesto["ultima_atualizacao"]
+    print(
+        f"Snapshot gerado em {snapshot.diretorio_cache(data_path, args.cache_dir)} "
+        f"({len(derivado)} linhas, {estatisticas['recalculadas']} recalculadas, "
+        f"{time.perf_counter() - inicio:.2f}s)"
+    )
+    if manifesto.get("linhas_sem_chave"):
+        print(f"  {manifesto['linhas_sem_chave']} linha(s) sem Ticker ou Ano descartada(s)")
+    for regra, ocorrencias in manifesto.get("resumo_qualidade", {}).items():
+        if ocorrencias:
+            print(f"  qualidade: {regra}: {ocorrencias}")
+    return 0
+
+
+def cmd_compute(args):
+    data_path = _resolver_planilha(args.entrada)
+    desconhecidos = [i for i in args.indicadores or [] if i not in INDICADORES]
+    if desconhecidos:
+        sys.exit("Indicadores desconhecidos: " + ", ".join(desconhecidos))
+
+    inicio = time.perf_counter()
+    derivado = calcular_indicadores_paralelo(ler_planilha(data_path), args.indicadores, workers=args.workers)
+    gravar_frame(derivado, args.saida)
+    print(f"{len(derivado)} linhas gravadas em {args.saida} ({time.perf_counter() - inicio:.2f}s)")
+    return 0
+
+
+def cmd_export(args):
+    data_path = _resolver_planilha(args.entrada)
+    try:
+        formato = args.formato or exportacao.formato_por_extensao(args.saida)
+    except ValueError as erro:
+        sys.exit(str(erro))
+
+    inicio = time.perf_counter()
+    # Reaproveita o snapshot (gera só se a planilha mudou); nada é recalculado aqui
+    destino = snapshot.diretorio_particoes(data_path, args.cache_dir)
+    linhas = exportacao.exportar(
+        destino, formato, args.saida, colunas=args.colunas, anos=args.anos, setores=args.setores,
+        tickers=args.tickers, delimitador=args.delimitador, tamanho_lote=args.chunksize,
+    )
+    print(f"{linhas} linhas exportadas para {args.saida} ({time.perf_counter() - inicio:.2f}s)")
+    return 0
+
+
+def cmd_ingest(args):
+    inicio = time.perf_counter()
+    total = ingestao.ingerir(
+        args.arquivos, args.saida, tickers=args.tickers, cadastro=args.cadastro, tamanho_bloco=args.chunksize
+    )
+    print(f"{total} linhas gravadas em {args.saida} ({time.perf_counter() - inicio:.2f}s)")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m cvm_indicators")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("snapshot", help="Gera o snapshot Arrow da planilha (antes do deploy)")
+    p.add_argument("--in", dest="entrada", help="Planilha de origem (padrão: busca automática)")
+    p.add_argument("--cache-dir", help="Diretório do snapshot (padrão: .cvm_cache/ ao lado da planilha)")
+    p.add_argument("--force", action="store_true", help="Reconstrói mesmo se o snapshot estiver válido")
+    p.add_argument("--completo", action="store_true",
+                   help="Recalcula todas as linhas em vez de só as novas/alteradas")
+    p.add_argument("--workers", type=int, default=1,
+                   help="Processos para o recálculo completo (shards por Ticker)")
+    p.add_argument("--limpar", action="store_true",
+                   help="Apaga os arquivos da versão anterior (não usar com o app servindo este cache)")
+    p.set_defaults(func=cmd_snapshot)
+
+    p = sub.add_parser("compute", help="Calcula os indicadores em lote e grava o resultado")
+    p.add_argument("--in", dest="entrada", help="Planilha de origem (.xlsx/.parquet/.arrow; padrão: busca automática)")
+    p.add_argument("--out", dest="saida", required=True, help="Arquivo de saída (.parquet, .arrow, .feather ou .csv)")
+    p.add_argument("--indicadores", nargs="+", help="Só estes indicadores (padrão: todos os públicos)")
+    p.add_argument("--workers", type=int, default=1, help="Processos (shards por Ticker)")
+    p.set_defaults(func=cmd_compute)
+
+    p = sub.add_parser("export", help="Exporta indicadores do snapshot (recorte e colunas opcionais)")
+    p.add_argument("--in", dest="entrada", help="Planilha de origem (padrão: busca automática)")
+    p.add_argument("--cache-dir", help="Diretório do snapshot (padrão: .cvm_cache/ ao lado da planilha)")
+    p.add_argument("--out", dest="saida", required=True, help="Arquivo de saída (.parquet, .arrow/.feather ou .csv)")
+    p.add_argument("--formato", choices=sorted(exportacao.FORMATOS), help="Padrão: pela extensão de --out")
+    p.add_argument("--colunas", nargs="+", help="Só estas colunas (Ticker e Ano sempre entram)")
+    p.add_argument("--anos", type=int, nargs="+", help="Só estes anos")
+    p.add_argument("--setores", nargs="+", help="Só estes setores (SETOR_ATIV)")
+    p.add_argument("--tickers", nargs="+", help="Só estes tickers")
+    p.add_argument("--delimitador", default=",", help="Separador do CSV")
+    p.add_argument("--chunksize", type=int, default=65_536, help="Linhas por lote escrito")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("ingest", help="Ingere zips DFP/ITR da CVM para o Parquet bruto (esquema da planilha)")
+    p.add_argument("arquivos", nargs="+", help="Zips dfp_cia_aberta_AAAA.zip / itr_cia_aberta_AAAA.zip")
+    p.add_argument("--out", dest="saida", required=True, help="Parquet de saída (usar depois como --in)")
+    p.add_argument("--tickers", help="CSV CD_CVM;Ticker[;Tipo_Acao] (padrão: Ticker = CD_CVM)")
+    p.add_argument("--cadastro", help="cad_cia_aberta.csv da CVM, para o SETOR_ATIV")
+    p.add_argument("--chunksize", type=int, default=200_000, help="Linhas por bloco de leitura dos CSVs")
+    p.set_defaults(func=cmd_ingest)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
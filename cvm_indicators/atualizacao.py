@@ -0,0 +1,151 @@
+# ==============================================================
+# 🔄 ATUALIZAÇÃO EM SEGUNDO PLANO COM TROCA ATÔMICA DE VERSÃO
+# ==============================================================
+# Uma thread vigia a planilha (polling de mtime/tamanho, sem dependência
+# de watchdog) e, quando ela muda, reconstrói o snapshot fora do caminho
+# das requisições: leitura, derivação e validação acontecem antes da
+# troca. A versão servida só muda depois que o novo snapshot está
+# completo e validado, e é identificada pelo hash da planilha: os caches
+# do app usam o diretório das partições (que contém o hash) como chave,
+# então uma versão nova nunca se mistura com entradas da anterior.
+# Também adota snapshots gerados por outro processo (CLI snapshot/watch).
+import logging
+import os
+import threading
+import time
+
+from . import snapshot
+from .indicadores import indicadores_publicos
+
+logger = logging.getLogger(__name__)
+
+COLUNAS_OBRIGATORIAS = ["Ticker", "Ano", "SETOR_ATIV"]
+
+
+def validar_derivado(bruto, derivado):
+    """Checagens estruturais antes de servir um snapshot novo (ValueError se falhar).
+
+    Linhas sem Ticker ou Ano já foram descartadas (snapshot.descartar_sem_chave).
+    """
+    if derivado.empty:
+        raise ValueError("Frame derivado vazio")
+    if len(derivado) != len(bruto):
+        raise ValueError(f"Frame derivado com {len(derivado)} linhas para {len(bruto)} da planilha")
+    faltando = [c for c in COLUNAS_OBRIGATORIAS + indicadores_publicos() if c not in derivado.columns]
+    if faltando:
+        raise ValueError("Colunas ausentes no frame derivado: " + ", ".join(faltando))
+
+
+def _versao(diretorio, manifesto):
+    return {
+        "id": manifesto["sha256"][:16],
+        "particoes": os.path.join(diretorio, manifesto["particoes"]),
+        "manifesto": manifesto,
+        "ativada_em": time.time(),
+    }
+
+
+class Atualizador:
+    """Mantém a versão servida do snapshot e a troca quando a planilha muda.
+
+    versao() é barato (só lê um atributo) e pode ser chamado a cada rerun.
+    A versão anterior fica em disco até a próxima troca: reruns que
+    começaram nela terminam sem perder arquivos.
+    """
+
+    def __init__(self, data_path, diretorio=None, intervalo=30.0, validar=validar_derivado):
+        self.data_path = data_path
+        self.diretorio = snapshot.diretorio_cache(data_path, diretorio)
+        self.intervalo = intervalo
+        self.validar = validar
+        self.erro = None
+        self.atualizacoes = 0
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._thread = None
+        self._anterior = None
+        self._assinatura = None
+        self._assinatura_falha = None
+
+        # Primeira versão: síncrona (sem snapshot não há o que servir)
+        manifesto = snapshot.snapshot_valido(data_path, self.diretorio)
+        if manifesto is None:
+            snapshot.construir_snapshot(data_path, self.diretorio, validar=validar)
+            manifesto = snapshot.snapshot_valido(data_path, self.diretorio)
+        self._atual = _versao(self.diretorio, manifesto)
+        self._assinatura = self._assinatura_planilha()
+
+    def versao(self):
+        """{"id", "particoes", "manifesto", "ativada_em"} da versão servida agora."""
+        return self._atual
+
+    def _assinatura_planilha(self):
+        try:
+            stat = os.stat(self.data_path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _trocar(self, manifesto):
+        with self._lock:
+            if manifesto["sha256"] == self._atual["manifesto"]["sha256"]:
+                self._atual = {**self._atual, "manifesto": manifesto}
+                return False
+            # Arquivos de duas versões atrás já não têm leitores
+            if self._anterior is not None:
+                snapshot.remover_artefatos(self.diretorio, self._anterior, manter=manifesto)
+            self._anterior = self._atual["manifesto"]
+            self._atual = _versao(self.diretorio, manifesto)
+            self.atualizacoes += 1
+        logger.info("Versão dos dados trocada para %s", self._atual["id"])
+        return True
+
+    def verificar(self, aguardar_estavel=False):
+        """Uma rodada: adota um snapshot válido mais novo ou reconstrói se a planilha mudou.
+
+        aguardar_estavel=True adia a reconstrução se mtime/tamanho mudaram desde
+        a rodada anterior (planilha ainda sendo copiada). Retorna True se a versão
+        servida mudou. Erros ficam em self.erro e a versão servida continua a anterior.
+        """
+        assinatura = self._assinatura_planilha()
+        if assinatura is None or assinatura == self._assinatura_falha:
+            # Planilha ausente, ou a mesma que já falhou: não reconstrói de novo
+            return False
+        if assinatura != self._assinatura:
+            self._assinatura = assinatura
+            if aguardar_estavel:
+                return False
+
+        try:
+            manifesto = snapshot.snapshot_valido(self.data_path, self.diretorio)
+            if manifesto is None:
+                inicio = time.perf_counter()
+                # A versão anterior fica em disco até a próxima troca (ver _trocar)
+                snapshot.construir_snapshot(self.data_path, self.diretorio, validar=self.validar)
+                manifesto = snapshot.snapshot_valido(self.data_path, self.diretorio)
+                logger.info("Snapshot reconstruído em %.2fs", time.perf_counter() - inicio)
+            self.erro = None
+            self._assinatura_falha = None
+            return self._trocar(manifesto)
+        except Exception as erro:  # noqa: BLE001 - a thread não pode morrer; o erro fica visível no app
+            self.erro = {"mensagem": f"{type(erro).__name__}: {erro}", "quando": time.time()}
+            self._assinatura_falha = assinatura
+            logger.exception("Falha ao atualizar o snapshot; mantendo a versão %s", self._atual["id"])
+            return False
+
+    def _rodar(self):
+        while not self._parar.wait(self.intervalo):
+            self.verificar(aguardar_estavel=True)
+
+    def iniciar(self):
+        """Inicia a thread de verificação periódica (daemon); idempotente."""
+        if self._thread is None and self.intervalo > 0:
+            self._thread = threading.Thread(target=self._rodar, name="cvm-atualizador", daemon=True)
+            self._thread.start()
+        return self
+
+    def parar(self):
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
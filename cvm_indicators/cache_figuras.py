@@ -0,0 +1,66 @@
+# ==============================================================
+# 🖼️ CACHE LRU DE FIGURAS (compartilhado entre sessões)
+# ==============================================================
+# Chave: (modo, ano, ticker/setor, id do gráfico, versão dos dados).
+# Cada entrada guarda o JSON serializado da figura e a própria figura já
+# montada: um acerto evita refazer o px.bar/px.pie a cada rerun. Não
+# importa plotly: `construir` só precisa devolver algo com .to_json().
+import threading
+from collections import OrderedDict
+
+
+class CacheFiguras:
+    """Cache LRU limitado por número de entradas, seguro para várias threads."""
+
+    def __init__(self, max_itens=256):
+        self.max_itens = max_itens
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+        self.descartes = 0
+
+    def _entrada(self, chave, construir):
+        with self._lock:
+            entrada = self._itens.get(chave)
+            if entrada is not None:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return entrada
+            self.faltas += 1
+
+        # Construção fora do lock: duas sessões podem montar a mesma figura, sem bloquear as demais
+        figura = construir()
+        entrada = (figura.to_json(), figura)
+        with self._lock:
+            self._itens[chave] = entrada
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+                self.descartes += 1
+        return entrada
+
+    def obter(self, chave, construir):
+        """Figura da chave, construída com `construir()` só na primeira vez."""
+        return self._entrada(chave, construir)[1]
+
+    def obter_json(self, chave, construir):
+        """JSON serializado da figura da chave."""
+        return self._entrada(chave, construir)[0]
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+
+    def estatisticas(self):
+        with self._lock:
+            total = self.acertos + self.faltas
+            return {
+                "itens": len(self._itens),
+                "max_itens": self.max_itens,
+                "acertos": self.acertos,
+                "faltas": self.faltas,
+                "descartes": self.descartes,
+                "taxa_acerto": self.acertos / total if total else 0.0,
+                "bytes_json": sum(len(j) for j, _ in self._itens.values()),
+            }
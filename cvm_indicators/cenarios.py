@@ -0,0 +1,141 @@
+# ==============================================================
+# 🧪 CENÁRIOS DE WACC / LUCRO ECONÔMICO (what-if em lote)
+# ==============================================================
+# O bloco de custo de capital (ki, ke, wacc, Lucro Econômico 1/2/EBITDA)
+# é recalculado com premissas alteradas sem passar de novo pelo motor de
+# indicadores: os arrays base (ki, ke, pesos de capital, ROI, Investimento
+# Médio...) são extraídos uma vez por versão dos dados e cada cenário é
+# uma expressão NumPy sobre o universo inteiro, todos os anos.
+#   ki' = (ki + Δki + spread) × (1 - alíquota)
+#   ke' = ke + Δke + spread
+#   wacc' = ki' × % Capital Terceiros + ke' × % Capital Próprio
+# Com todos os parâmetros zerados o resultado é o do snapshot. A varredura
+# avalia milhares de combinações de uma vez: as somas são lineares nos
+# parâmetros (saem de poucas somas pré-calculadas) e as contagens por
+# empresa rodam em blocos (combinações × linhas) como produto de matrizes.
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from .indicadores import RESULTADO_OPERACIONAL
+
+# Parâmetro -> valor neutro (reproduz o snapshot)
+PARAMETROS = {"delta_ki": 0.0, "delta_ke": 0.0, "spread": 0.0, "aliquota": 0.0}
+# Elementos (combinações × linhas) por bloco da varredura
+TAMANHO_BLOCO = 1 << 22
+# Colunas do frame de indicadores lidas por BaseCenarios
+COLUNAS_BASE = [
+    "Ticker", "Ano", "SETOR_ATIV", "ki", "ke", "Percentual Capital Terceiros", "Percentual Capital Próprio",
+    "ROI", "ROI EBITDA", "Investimento Médio", RESULTADO_OPERACIONAL,
+]
+
+
+def _parametros(valores):
+    desconhecidos = set(valores) - set(PARAMETROS)
+    if desconhecidos:
+        raise ValueError("Parâmetros desconhecidos: " + ", ".join(sorted(desconhecidos)))
+    return {**PARAMETROS, **valores}
+
+
+class BaseCenarios:
+    """Arrays base do bloco de custo de capital, montados uma vez a partir do frame de indicadores.
+
+    Precisa das colunas de COLUNAS_BASE.
+    """
+
+    def __init__(self, df):
+        def valores(coluna):
+            return df[coluna].to_numpy(dtype=np.float64, na_value=np.nan)
+
+        self.chaves = df[["Ticker", "Ano", "SETOR_ATIV"]].reset_index(drop=True)
+        self.anos = df["Ano"].to_numpy()
+        self.ki, self.ke = valores("ki"), valores("ke")
+        self.peso_terceiros = valores("Percentual Capital Terceiros")
+        self.peso_proprio = valores("Percentual Capital Próprio")
+        self.roi, self.roi_ebitda = valores("ROI"), valores("ROI EBITDA")
+        self.investimento = valores("Investimento Médio")
+        self.resultado_operacional = valores(RESULTADO_OPERACIONAL)
+        # Linhas com wacc e Lucro Econômico 1 calculáveis: não dependem dos parâmetros
+        self.validas = ~np.isnan(
+            self.ki + self.ke + self.peso_terceiros + self.peso_proprio + self.roi + self.investimento
+        )
+
+    def __len__(self):
+        return len(self.ki)
+
+    def avaliar(self, **parametros):
+        """Frame (Ticker, Ano, SETOR_ATIV) com ki, ke, wacc e Lucros Econômicos do cenário, todas as linhas."""
+        p = _parametros(parametros)
+        ki = (self.ki + p["delta_ki"] + p["spread"]) * (1 - p["aliquota"])
+        ke = self.ke + p["delta_ke"] + p["spread"]
+        wacc = ki * self.peso_terceiros + ke * self.peso_proprio
+        # Mesmas regras de ausência das fórmulas de indicadores.py (NaN propaga)
+        resultados = {
+            "ki": ki,
+            "ke": ke,
+            "wacc": wacc,
+            "Lucro Econômico 1": (self.roi - wacc) * self.investimento,
+            "Lucro Econômico 2": self.resultado_operacional - wacc * self.investimento,
+            "Lucro Econômico EBITDA": (self.roi_ebitda - wacc) * self.investimento,
+        }
+        return pd.concat([self.chaves, pd.DataFrame(resultados)], axis=1)
+
+    def linhas(self, ano=None, setor=None):
+        """Máscara das linhas de um recorte (ano e/ou setor; listas aceitas)."""
+        mascara = np.ones(len(self), dtype=bool)
+        if ano is not None:
+            mascara &= np.isin(self.anos, np.atleast_1d(ano))
+        if setor is not None:
+            mascara &= self.chaves["SETOR_ATIV"].isin(np.atleast_1d(setor)).to_numpy()
+        return mascara
+
+    def varrer(self, grade, linhas=None, tamanho_bloco=TAMANHO_BLOCO):
+        """Avalia o produto cartesiano de `grade` ({parâmetro: valores}) sobre as linhas do recorte.
+
+        Parâmetros fora da grade ficam no valor neutro (ou escalar dado na grade).
+        Uma linha por combinação: parâmetros, "Empresas" (linhas válidas),
+        "Lucro Econômico 1" (soma), "wacc médio" (ponderado pelo Investimento
+        Médio) e "Criando valor" (fração com Lucro Econômico 1 > 0).
+        """
+        p = _parametros({k: np.atleast_1d(np.asarray(v, dtype=np.float64)) for k, v in grade.items()})
+        combinacoes = pd.DataFrame(
+            list(itertools.product(*(np.atleast_1d(v) for v in p.values()))), columns=list(p), dtype=np.float64
+        )
+        mascara = self.validas if linhas is None else self.validas & np.asarray(linhas, dtype=bool)
+
+        ki, ke = self.ki[mascara], self.ke[mascara]
+        terceiros, proprio = self.peso_terceiros[mascara], self.peso_proprio[mascara]
+        roi, investimento = self.roi[mascara], self.investimento[mascara]
+
+        # Parte fixa e coeficientes de wacc' por linha: wacc' = f × (kt + d × t) + kp + e × p
+        kt, kp = ki * terceiros, ke * proprio
+        d = (combinacoes["delta_ki"] + combinacoes["spread"]).to_numpy()
+        e = (combinacoes["delta_ke"] + combinacoes["spread"]).to_numpy()
+        f = 1 - combinacoes["aliquota"].to_numpy()
+
+        # Somas: lineares nos parâmetros, O(1) por combinação
+        soma_wacc_inv = f * ((kt * investimento).sum() + d * (terceiros * investimento).sum()) \
+            + (kp * investimento).sum() + e * (proprio * investimento).sum()
+        soma_inv = investimento.sum()
+
+        # Contagens: precisam do sinal por linha. (ROI - wacc') × Inv > 0 com o sinal de Inv
+        # embutido vira a - C @ M > 0, C = (f, f × d, e) por combinação: um produto de matrizes por bloco
+        sinal = np.sign(investimento)
+        a = (roi - kp) * sinal
+        m = np.stack([kt * sinal, terceiros * sinal, proprio * sinal])
+        c = np.column_stack([f, f * d, e])
+        positivas = np.zeros(len(combinacoes))
+        if len(ki):
+            passo = max(1, tamanho_bloco // len(ki))
+            for inicio in range(0, len(combinacoes), passo):
+                b = slice(inicio, inicio + passo)
+                positivas[b] = (c[b] @ m < a).sum(axis=1)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return combinacoes.assign(**{
+                "Empresas": len(ki),
+                "Lucro Econômico 1": (roi * investimento).sum() - soma_wacc_inv,
+                "wacc médio": soma_wacc_inv / soma_inv if soma_inv else np.nan,
+                "Criando valor": positivas / len(ki) if len(ki) else np.nan,
+            })
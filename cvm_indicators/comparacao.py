@@ -0,0 +1,51 @@
+# ==============================================================
+# 📉 COMPARAÇÃO DE EMPRESAS (vários tickers × intervalo de anos)
+# ==============================================================
+# Um único recorte vetorizado (isin + between) em vez de filtrar um ticker
+# por vez: o painel fica indexado por (Ticker, Ano) e as visões de
+# tendência/ano são só unstack/xs sobre ele.
+import numpy as np
+
+from .indicadores import indicadores_publicos
+
+# Indicadores das curvas de tendência da tela de comparação
+INDICADORES_TENDENCIA = ["ROE", "ROA", "ROI", "wacc", "Lucro Econômico 1"]
+
+
+def painel(df, tickers=None, anos=None, indicadores=None):
+    """Painel (Ticker, Ano) × indicadores dos tickers pedidos no intervalo `anos` (inclusivo).
+
+    indicadores=None mantém todos os indicadores públicos presentes em `df`.
+    """
+    mascara = np.ones(len(df), dtype=bool)
+    if tickers is not None:
+        mascara &= df["Ticker"].isin(list(tickers)).to_numpy()
+    if anos is not None:
+        ano_inicial, ano_final = anos
+        mascara &= df["Ano"].between(ano_inicial, ano_final).to_numpy()
+
+    if indicadores is None:
+        publicos = set(indicadores_publicos())
+        indicadores = [c for c in df.columns if c in publicos]
+    return (
+        df.loc[mascara, ["Ticker", "Ano", *indicadores]]
+        .set_index(["Ticker", "Ano"])
+        .sort_index()
+    )
+
+
+def largo(painel_df):
+    """Ano × (indicador, Ticker): o painel inteiro pivotado num só frame."""
+    return painel_df.unstack("Ticker")
+
+
+def serie(painel_df, indicador):
+    """Ano × Ticker de um indicador (uma curva por empresa)."""
+    return painel_df[indicador].unstack("Ticker")
+
+
+def tabela_ano(painel_df, ano):
+    """Ticker × indicadores num ano (empresas lado a lado)."""
+    if ano not in painel_df.index.get_level_values("Ano"):
+        return painel_df.iloc[:0].droplevel("Ano")
+    return painel_df.xs(ano, level="Ano")
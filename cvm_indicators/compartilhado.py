@@ -0,0 +1,169 @@
+# ==============================================================
+# 🔒 DATASET COMPARTILHADO SOMENTE LEITURA
+# ==============================================================
+# Uma única instância do frame de indicadores por processo (no app, via
+# st.cache_resource), em vez de uma cópia desserializada por sessão como
+# no st.cache_data. O frame fica ordenado por Ano: o recorte de um ano é
+# uma fatia contígua, entregue como view sem cópia (copy-on-write do
+# pandas). Os arrays ficam read-only e os frames entregues recusam
+# alteração no lugar; derivados (filtros, seleção de colunas, assign) são
+# DataFrames comuns, livres para alterar.
+import numpy as np
+import pandas as pd
+
+MENSAGEM_SOMENTE_LEITURA = (
+    "Frame compartilhado entre sessões é somente leitura: "
+    "use .assign(...) ou .copy() para derivar um frame alterável"
+)
+
+
+def _recusar(*args, **kwargs):
+    raise ValueError(MENSAGEM_SOMENTE_LEITURA)
+
+
+class _IndexadorLeitura:
+    # loc/iloc/at/iat só para leitura
+    def __init__(self, indexador):
+        self._indexador = indexador
+
+    def __getitem__(self, chave):
+        return self._indexador[chave]
+
+    def __getattr__(self, nome):
+        return getattr(self._indexador, nome)
+
+    __setitem__ = _recusar
+
+
+class FrameSomenteLeitura(pd.DataFrame):
+    """DataFrame que recusa alteração no lugar (colunas, valores, inplace=True).
+
+    Operações que derivam um frame novo devolvem pd.DataFrame comum.
+    """
+
+    @property
+    def _constructor(self):
+        return pd.DataFrame
+
+    __setitem__ = __delitem__ = insert = pop = _recusar
+    _update_inplace = _set_value = _recusar
+
+    loc = property(lambda self: _IndexadorLeitura(pd.DataFrame.loc.fget(self)))
+    iloc = property(lambda self: _IndexadorLeitura(pd.DataFrame.iloc.fget(self)))
+    at = property(lambda self: _IndexadorLeitura(pd.DataFrame.at.fget(self)))
+    iat = property(lambda self: _IndexadorLeitura(pd.DataFrame.iat.fget(self)))
+
+
+def _travar(valores):
+    valores = np.array(valores, copy=True)
+    valores.flags.writeable = False
+    return valores
+
+
+def somente_leitura(df):
+    """Cópia de `df` com arrays numpy read-only (categorias: os códigos), como FrameSomenteLeitura.
+
+    Colunas Arrow já são imutáveis e passam sem cópia.
+    """
+    colunas = {}
+    for nome in df.columns:
+        serie = df[nome]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            colunas[nome] = pd.Categorical.from_codes(_travar(serie.cat.codes), dtype=serie.dtype)
+        elif isinstance(serie.dtype, np.dtype):
+            colunas[nome] = _travar(serie.to_numpy())
+        else:
+            colunas[nome] = serie.array
+    return FrameSomenteLeitura(pd.DataFrame(colunas, index=df.index, copy=False))
+
+
+def _lista(valor):
+    return list(valor) if isinstance(valor, (list, tuple, set, range)) else [valor]
+
+
+def _indice(df, chaves):
+    # chave -> posições (iloc) em ordem crescente; linhas com chave nula ficam de fora
+    return df.groupby(chaves, observed=True, sort=False).indices
+
+
+class DatasetCompartilhado:
+    """Frame de indicadores imutável, ordenado por (Ano, Ticker), com recortes sem cópia.
+
+    Os índices (Ticker, Ano) (chave composta ordenada, busca binária) e
+    (SETOR_ATIV, Ano) e as listas de opções da sidebar são montados uma vez
+    por versão dos dados: um recorte custa O(log n + linhas do recorte), não
+    uma varredura do frame.
+    """
+
+    def __init__(self, df):
+        rank, tickers = pd.factorize(df["Ticker"], sort=True)
+        rank = np.where(rank < 0, len(tickers), rank)  # Ticker nulo por último, como no sort_values
+        anos = df["Ano"].to_numpy(dtype=np.int64)
+        ordem = np.lexsort((rank, anos))
+
+        self.df = somente_leitura(df.take(ordem).reset_index(drop=True))
+        self._anos = anos[ordem]
+        self._rank_ticker = rank[ordem]
+        # (Ticker, Ano): chave composta crescente na ordem do frame -> busca binária
+        self._mapa_ticker = {ticker: i for i, ticker in enumerate(tickers)}
+        self._chave_ticker_ano = self._anos * (len(tickers) + 1) + self._rank_ticker
+        # (SETOR_ATIV, Ano): poucos grupos, posições guardadas por chave
+        self._por_setor_ano = _indice(self.df, ["SETOR_ATIV", "Ano"])
+        self.opcoes = {
+            "anos": sorted(np.unique(self._anos).tolist(), reverse=True),
+            "setores": sorted({setor for setor, _ in self._por_setor_ano}),
+            "tickers": list(tickers),
+        }
+
+    def __len__(self):
+        return len(self.df)
+
+    def anos(self):
+        return sorted(self.opcoes["anos"])
+
+    def _fatia_ano(self, ano):
+        return (np.searchsorted(self._anos, ano, side="left"), np.searchsorted(self._anos, ano, side="right"))
+
+    def _ticker_ano(self, ticker, ano):
+        rank = self._mapa_ticker.get(ticker)
+        if rank is None:
+            return None
+        # int(): um ano int16 (frame compactado) estouraria na chave composta
+        chave = int(ano) * (len(self._mapa_ticker) + 1) + rank
+        return np.arange(
+            np.searchsorted(self._chave_ticker_ano, chave, side="left"),
+            np.searchsorted(self._chave_ticker_ano, chave, side="right"),
+        )
+
+    def posicoes(self, ano=None, setor=None, ticker=None):
+        """Posições (iloc) do recorte, em ordem (Ano, Ticker), resolvidas pelos índices."""
+        anos = self.opcoes["anos"] if ano is None else _lista(ano)
+        if ticker is not None:
+            partes = [self._ticker_ano(t, a) for t in _lista(ticker) for a in anos]
+        elif setor is not None:
+            partes = [self._por_setor_ano.get((s, a)) for s in _lista(setor) for a in anos]
+        else:
+            partes = [np.arange(*self._fatia_ano(a)) for a in anos]
+        partes = [p for p in partes if p is not None and len(p)]
+        if not partes:
+            return np.array([], dtype=np.intp)
+        posicoes = np.sort(np.concatenate(partes))
+        if ticker is not None and setor is not None:
+            # Ticker e setor: o setor filtra só as linhas já encontradas pelo ticker
+            posicoes = posicoes[self.df["SETOR_ATIV"].iloc[posicoes].isin(_lista(setor)).to_numpy()]
+        return posicoes
+
+    def recorte(self, ano=None, setor=None, ticker=None):
+        """Linhas do recorte (mesmos filtros de ler_particoes), ordenadas por Ticker/Ano.
+
+        Um ano sem outros filtros é uma view das linhas compartilhadas; os
+        demais recortes copiam só as linhas encontradas nos índices.
+        """
+        if ano is not None and not isinstance(ano, (list, tuple, set, range)) and setor is None and ticker is None:
+            parte = self.df.iloc[slice(*self._fatia_ano(ano))]
+        else:
+            posicoes = self.posicoes(ano, setor, ticker)
+            # Base em (Ano, Ticker): reordena só as posições encontradas para (Ticker, Ano)
+            posicoes = posicoes[np.lexsort((self._anos[posicoes], self._rank_ticker[posicoes]))]
+            parte = self.df.iloc[posicoes]
+        return FrameSomenteLeitura(parte.reset_index(drop=True))
@@ -0,0 +1,112 @@
+# ==============================================================
+# 🧊 CUBO SETORIAL PRÉ-AGREGADO POR (SETOR_ATIV, Ano)
+# ==============================================================
+# Uma linha por setor e ano com contagem de empresas, somas das contas
+# principais e, para cada indicador: n, média, mediana, percentis e média
+# ponderada (razões) ou soma (valores em R$). Montado num único groupby
+# sobre o frame derivado e gravado junto do snapshot; a tela setorial e
+# as comparações entre setores/anos leem só o cubo.
+import numpy as np
+import pandas as pd
+
+from .indicadores import LUCRO_LIQUIDO, PL, RECEITA, indicadores_publicos
+
+CHAVES_CUBO = ["SETOR_ATIV", "Ano"]
+PERCENTIS = {"p10": 0.10, "p25": 0.25, "p75": 0.75, "p90": 0.90}
+SOMAS = [RECEITA, LUCRO_LIQUIDO, PL, "Ativo Total"]
+
+# Peso da média ponderada: o denominador natural de cada razão (só linhas com peso > 0)
+PESOS = {
+    "ROA": "Ativo Médio",
+    "ROI": "Investimento Médio",
+    "ROE": "PL Médio",
+    "ROI EBITDA": "Investimento Médio",
+    "Margem Bruta": RECEITA,
+    "Margem Operacional": RECEITA,
+    "Margem Líquida": RECEITA,
+    "Percentual Capital Terceiros": "Total Passivo",
+    "Percentual Capital Próprio": "Total Passivo",
+    "ki": "Passivo Oneroso Médio",
+    "ke": "PL Médio",
+    "wacc": "Investimento Médio",
+}
+
+
+def coluna(indicador, estatistica):
+    """Nome da coluna do cubo, ex.: coluna("ROE", "mediana") -> "ROE (mediana)"."""
+    return f"{indicador} ({estatistica})"
+
+
+def estatisticas(indicador):
+    """Estatísticas presentes no cubo para o indicador."""
+    extra = ["média ponderada"] if indicador in PESOS else ["soma"]
+    return ["n", "média", "mediana", *PERCENTIS, *extra]
+
+
+def construir_cubo(df, indicadores=None):
+    """Cubo (SETOR_ATIV, Ano) a partir do frame de indicadores; linhas sem setor ficam de fora."""
+    if indicadores is None:
+        indicadores = indicadores_publicos()
+    indicadores = [c for c in indicadores if c in df.columns]
+    somas = [c for c in SOMAS if c in df.columns]
+    base = df[df["SETOR_ATIV"].notna()]
+
+    # Booleanos (Alavancagem Eficaz) entram como fração de verdadeiros
+    valores = base[indicadores].astype(np.float64)
+    ponderados = [c for c in indicadores if PESOS.get(c) in base.columns]
+    absolutos = [c for c in indicadores if c not in PESOS]
+    auxiliares = {}
+    for c in ponderados:
+        peso = base[PESOS[c]].to_numpy(dtype=np.float64)
+        peso = np.where((peso > 0) & valores[c].notna().to_numpy(), peso, np.nan)
+        auxiliares[f"{c} (x·w)"] = valores[c].to_numpy() * peso
+        auxiliares[f"{c} (w)"] = peso
+
+    frame = pd.concat(
+        [base[CHAVES_CUBO + ["Ticker"]], valores, base[somas].add_suffix(" (conta)"),
+         pd.DataFrame(auxiliares, index=base.index)],
+        axis=1,
+    )
+    grupos = frame.groupby(CHAVES_CUBO, sort=True)
+
+    partes = [grupos["Ticker"].nunique().rename("Empresas")]
+    # Soma sem min_count: setor sem a conta preenchida soma 0, como os KPIs da tela setorial
+    partes.append(grupos[[f"{c} (conta)" for c in somas]].sum()
+                  .set_axis([coluna(c, "soma") for c in somas], axis=1))
+
+    n = grupos[indicadores].count()
+    media = grupos[indicadores].mean()
+    mediana = grupos[indicadores].median()
+    quantis = grupos[indicadores].quantile(list(PERCENTIS.values()))
+    soma_abs = grupos[absolutos].sum(min_count=1) if absolutos else None
+    soma_aux = grupos[list(auxiliares)].sum(min_count=1) if auxiliares else None
+
+    for c in indicadores:
+        bloco = {coluna(c, "n"): n[c], coluna(c, "média"): media[c], coluna(c, "mediana"): mediana[c]}
+        for nome, q in PERCENTIS.items():
+            bloco[coluna(c, nome)] = quantis[c].xs(q, level=-1)
+        if c in ponderados:
+            bloco[coluna(c, "média ponderada")] = soma_aux[f"{c} (x·w)"] / soma_aux[f"{c} (w)"]
+        elif c in absolutos:
+            bloco[coluna(c, "soma")] = soma_abs[c]
+        partes.append(pd.DataFrame(bloco))
+
+    cubo = pd.concat(partes, axis=1).reset_index()
+    cubo["Empresas"] = cubo["Empresas"].astype(np.int64)
+    return cubo
+
+
+def linha(cubo, setor, ano):
+    """Linha do cubo para (setor, ano) como Series, ou None se o setor não tem dados no ano."""
+    selecao = cubo[(cubo["SETOR_ATIV"] == setor) & (cubo["Ano"] == ano)]
+    return None if selecao.empty else selecao.iloc[0]
+
+
+def entre_setores(cubo, ano, colunas):
+    """Setores × colunas num ano (comparação entre setores)."""
+    return cubo.loc[cubo["Ano"] == ano, ["SETOR_ATIV", *colunas]].set_index("SETOR_ATIV")
+
+
+def evolucao(cubo, setor, colunas):
+    """Anos × colunas de um setor (comparação entre anos)."""
+    return cubo.loc[cubo["SETOR_ATIV"] == setor, ["Ano", *colunas]].set_index("Ano")
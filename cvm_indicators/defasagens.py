@@ -0,0 +1,97 @@
+# ==============================================================
+# ⏪ DEFASAGENS E MÉDIAS MÓVEIS POR TICKER (passagem única)
+# ==============================================================
+# Em vez de um groupby("Ticker").shift(1) por coluna (cada um refatora a
+# chave), o índice de grupos é montado uma vez e todas as colunas são
+# defasadas juntas sobre um bloco NumPy contíguo (linhas × colunas).
+import numpy as np
+import pandas as pd
+
+
+class IndiceGrupos:
+    """Índice de grupos montado uma única vez a partir da chave (ex.: Ticker).
+
+    Preserva a semântica de groupby(...).shift/rolling: dentro de cada grupo
+    vale a ordem original das linhas; chaves nulas formam grupos sem valores.
+    """
+
+    def __init__(self, chaves):
+        if not isinstance(chaves, (pd.Series, pd.Index)):
+            chaves = np.asarray(chaves)
+        codigos, unicos = pd.factorize(chaves, use_na_sentinel=True)
+        self.n = len(codigos)
+
+        # Frame já ordenado pela chave (caso do calcular_indicadores): sem permutação
+        mudanca = np.flatnonzero(codigos[1:] != codigos[:-1]) + 1
+        n_grupos = len(unicos) + bool((codigos < 0).any())
+        if n_grupos == len(mudanca) + (self.n > 0):
+            self.ordem = None
+            codigos_ord = codigos
+        else:
+            self.ordem = np.argsort(codigos, kind="stable")
+            codigos_ord = codigos[self.ordem]
+            mudanca = np.flatnonzero(codigos_ord[1:] != codigos_ord[:-1]) + 1
+
+        inicios = np.concatenate(([0], mudanca)) if self.n else np.array([], dtype=np.intp)
+        tamanhos = np.diff(np.concatenate((inicios, [self.n])))
+        # Posição de cada linha dentro do seu grupo (0 = primeiro período)
+        self.posicao = np.arange(self.n) - np.repeat(inicios, tamanhos)
+        # Linhas com chave nula nunca recebem valor (como no groupby)
+        self.nulo = codigos_ord < 0
+
+    def _bloco(self, valores):
+        bloco = np.asarray(valores, dtype=np.float64)
+        if bloco.ndim == 1:
+            bloco = bloco[:, None]
+        if self.ordem is not None:
+            bloco = bloco[self.ordem]
+        return np.ascontiguousarray(bloco)
+
+    def _restaurar(self, saida):
+        if self.ordem is None:
+            return saida
+        restaurado = np.empty_like(saida)
+        restaurado[self.ordem] = saida
+        return restaurado
+
+    def defasar(self, valores, periodos=1):
+        """Valores de `periodos` linhas antes no mesmo grupo (NaN quando não existe)."""
+        bloco = self._bloco(valores)
+        saida = np.full_like(bloco, np.nan)
+        linhas = np.flatnonzero((self.posicao >= periodos) & ~self.nulo)
+        saida[linhas] = bloco[linhas - periodos]
+        return self._restaurar(saida)
+
+    def media_movel(self, valores, janela, min_periodos=None):
+        """Média móvel de `janela` períodos dentro do grupo (padrão: janela completa, como rolling)."""
+        min_periodos = janela if min_periodos is None else min_periodos
+        bloco = self._bloco(valores)
+        validos = ~np.isnan(bloco)
+
+        # Somas e contagens acumuladas com linha zero à frente: soma(i-j+1..i) = S[i+1] - S[i+1-j]
+        somas = np.zeros((self.n + 1, bloco.shape[1]))
+        np.cumsum(np.where(validos, bloco, 0.0), axis=0, out=somas[1:])
+        contagens = np.zeros((self.n + 1, bloco.shape[1]), dtype=np.int64)
+        np.cumsum(validos, axis=0, out=contagens[1:])
+
+        fim = np.arange(1, self.n + 1)
+        inicio = fim - np.minimum(janela, self.posicao + 1)
+        n_validos = contagens[fim] - contagens[inicio]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            media = (somas[fim] - somas[inicio]) / n_validos
+        media[(n_validos < max(min_periodos, 1)) | self.nulo[:, None]] = np.nan
+        return self._restaurar(media)
+
+
+def defasar(df, colunas, chave="Ticker", periodos=1):
+    """Atalho: DataFrame com as colunas defasadas em `periodos` dentro de cada `chave`."""
+    indice = IndiceGrupos(df[chave])
+    return pd.DataFrame(indice.defasar(df[colunas], periodos), index=df.index, columns=colunas)
+
+
+def media_movel(df, colunas, janela, chave="Ticker", min_periodos=None):
+    """Atalho: DataFrame com a média móvel de `janela` períodos dentro de cada `chave`."""
+    indice = IndiceGrupos(df[chave])
+    return pd.DataFrame(
+        indice.media_movel(df[colunas], janela, min_periodos), index=df.index, columns=colunas
+    )
@@ -0,0 +1,118 @@
+# ==============================================================
+# ⬇️ EXPORTAÇÃO EM LOTE (Parquet, Arrow IPC, CSV em blocos)
+# ==============================================================
+# Lê direto do snapshot (nada é recalculado), com projeção de colunas e
+# filtros de Ano/Setor/Ticker empurrados para o dataset Arrow. Os
+# três formatos são escritos lote a lote: o CSV sai de um gerador de
+# blocos de bytes, então exportar a base inteira para um arquivo (CLI)
+# não monta o arquivo todo em memória. Sem arquivo de saída (botão de
+# download do app) o resultado inteiro é devolvido em bytes.
+import io
+import os
+
+import pyarrow as pa
+import pyarrow.csv as pcsv
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from .snapshot import lotes_indicadores
+
+FORMATOS = {
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+    "arrow": ("arrow", "application/vnd.apache.arrow.file"),
+    "csv": ("csv", "text/csv"),
+}
+EXTENSOES = {".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow", ".csv": "csv"}
+
+
+def formato_por_extensao(caminho):
+    for extensao, formato in EXTENSOES.items():
+        if caminho.lower().endswith(extensao):
+            return formato
+    raise ValueError(f"Extensão de exportação não suportada: {caminho} (use .parquet, .arrow ou .csv)")
+
+
+def csv_em_blocos(esquema, lotes, delimitador=","):
+    """Gerador de blocos de bytes do CSV (UTF-8): cabeçalho no primeiro, um bloco por lote."""
+    cabecalho = True
+    for lote in lotes:
+        buffer = io.BytesIO()
+        pcsv.write_csv(lote, buffer, pcsv.WriteOptions(include_header=cabecalho, delimiter=delimitador))
+        cabecalho = False
+        yield buffer.getvalue()
+    if cabecalho:
+        # Recorte vazio: só o cabeçalho
+        buffer = io.BytesIO()
+        pcsv.write_csv(esquema.empty_table(), buffer, pcsv.WriteOptions(delimiter=delimitador))
+        yield buffer.getvalue()
+
+
+def _reagrupar(esquema, lotes, tamanho_lote):
+    # Uma partição (Ano, Setor) rende lotes pequenos: junta até tamanho_lote linhas
+    # para não gerar centenas de row groups/blocos minúsculos
+    pendentes, linhas = [], 0
+    for lote in lotes:
+        pendentes.append(lote)
+        linhas += lote.num_rows
+        if linhas >= tamanho_lote:
+            yield pa.Table.from_batches(pendentes, esquema).combine_chunks().to_batches()[0]
+            pendentes, linhas = [], 0
+    if pendentes:
+        yield pa.Table.from_batches(pendentes, esquema).combine_chunks().to_batches()[0]
+
+
+def _contar(lotes, contador):
+    for lote in lotes:
+        contador[0] += lote.num_rows
+        yield lote
+
+
+def _escrever(formato, esquema, lotes, sink, delimitador):
+    # Escreve lote a lote no sink; retorna o número de linhas
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato desconhecido: {formato} (use {', '.join(FORMATOS)})")
+    contador = [0]
+    lotes = _contar(lotes, contador)
+    if formato == "csv":
+        for bloco in csv_em_blocos(esquema, lotes, delimitador):
+            sink.write(bloco)
+    elif formato == "parquet":
+        with pq.ParquetWriter(sink, esquema) as writer:
+            for lote in lotes:
+                writer.write_batch(lote)
+    else:
+        with ipc.new_file(sink, esquema) as writer:
+            for lote in lotes:
+                writer.write_batch(lote)
+    return contador[0]
+
+
+def exportar(destino_particoes, formato, saida=None, colunas=None, anos=None, setores=None,
+             tickers=None, delimitador=",", tamanho_lote=65_536):
+    """Exporta o recorte do snapshot das partições em `formato` (parquet, arrow ou csv).
+
+    saida: caminho de arquivo (retorna o número de linhas) ou None (retorna os bytes,
+    para botões de download: o arquivo inteiro fica em memória, use só com recortes).
+    colunas: projeção (Ticker e Ano sempre entram).
+    anos, setores e tickers: um valor ou uma lista.
+    """
+    esquema, lotes = lotes_indicadores(
+        destino_particoes, ano=anos, setor=setores, ticker=tickers,
+        colunas_lidas=colunas, tamanho_lote=tamanho_lote,
+    )
+    lotes = _reagrupar(esquema, lotes, tamanho_lote)
+    if saida is None:
+        sink = pa.BufferOutputStream()
+        _escrever(formato, esquema, lotes, sink, delimitador)
+        return sink.getvalue().to_pybytes()
+
+    # Troca só no fim: uma exportação interrompida não deixa arquivo pela metade
+    tmp = f"{saida}.tmp-{os.getpid()}"
+    try:
+        with pa.OSFile(tmp, "wb") as sink:
+            linhas = _escrever(formato, esquema, lotes, sink, delimitador)
+        os.replace(tmp, saida)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return linhas
@@ -0,0 +1,47 @@
+# ==============================================================
+# 📂 FONTE DE DADOS - localização e leitura da planilha
+# ==============================================================
+import os
+
+import pandas as pd
+
+# Procurar automaticamente o arquivo em locais possíveis
+CAMINHOS_POSSIVEIS = [
+    "/content/data_frame.xlsx",   # Google Colab
+    "data_frame.xlsx",            # mesma pasta do app
+    "./data/data_frame.xlsx"      # subpasta data/
+]
+
+
+def localizar_planilha(caminhos=CAMINHOS_POSSIVEIS):
+    """Retorna o primeiro caminho existente, ou None se nenhum for encontrado."""
+    for path in caminhos:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def ler_planilha(data_path):
+    """Lê a planilha bruta (Excel, ou Parquet/Arrow gerado pela ingestão) e normaliza os nomes das colunas."""
+    extensao = os.path.splitext(data_path)[1].lower()
+    if extensao == ".parquet":
+        df = pd.read_parquet(data_path)
+    elif extensao in (".arrow", ".feather"):
+        df = pd.read_feather(data_path)
+    else:
+        df = pd.read_excel(data_path)
+    df.columns = [c.strip() for c in df.columns]
+    return df
+
+
+def gravar_frame(df, destino):
+    """Grava um frame no formato indicado pela extensão (.parquet, .arrow/.feather ou .csv)."""
+    extensao = os.path.splitext(destino)[1].lower()
+    if extensao == ".parquet":
+        df.to_parquet(destino, index=False)
+    elif extensao in (".arrow", ".feather"):
+        df.reset_index(drop=True).to_feather(destino)
+    elif extensao == ".csv":
+        df.to_csv(destino, index=False)
+    else:
+        raise ValueError(f"Formato de saída não suportado: '{extensao}' (use .parquet, .arrow, .feather ou .csv)")
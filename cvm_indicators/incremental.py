@@ -0,0 +1,108 @@
+# ==============================================================
+# ♻️ RECÁLCULO INCREMENTAL (novo Ano / linhas alteradas)
+# ==============================================================
+# Compara a planilha nova com a do snapshot anterior por (Ticker, Ano) e
+# recalcula só as linhas novas ou alteradas, mais os anos seguintes que
+# dependem delas pelas defasagens (t-1, médias). O resto do frame
+# derivado anterior é reaproveitado.
+import numpy as np
+import pandas as pd
+
+from .defasagens import IndiceGrupos
+from .indicadores import calcular_indicadores, indicadores_publicos, profundidade_defasagem
+
+CHAVE = ["Ticker", "Ano"]
+
+
+def _ordenar(df):
+    return df.sort_values(CHAVE).reset_index(drop=True)
+
+
+def _ano_anterior(df, indice):
+    # Ano da linha anterior do mesmo Ticker (-1 no primeiro período)
+    anos = indice.defasar(df["Ano"].to_numpy(dtype=np.float64))[:, 0]
+    return np.nan_to_num(anos, nan=-1)
+
+
+def linhas_alteradas(anterior, novo):
+    """Máscara sobre `novo` (ordenado por Ticker/Ano) das linhas novas, alteradas
+    ou cujo período anterior mudou (ano inserido/removido no meio da série)."""
+    chaves_ant = pd.MultiIndex.from_frame(anterior[CHAVE])
+    pos = chaves_ant.get_indexer(pd.MultiIndex.from_frame(novo[CHAVE]))
+    existe = pos >= 0
+
+    hash_ant = pd.util.hash_pandas_object(anterior, index=False).to_numpy()
+    hash_novo = pd.util.hash_pandas_object(novo, index=False).to_numpy()
+    alteradas = ~existe
+    alteradas[existe] = hash_ant[pos[existe]] != hash_novo[existe]
+
+    prev_ant = _ano_anterior(anterior, IndiceGrupos(anterior["Ticker"]))
+    prev_novo = _ano_anterior(novo, IndiceGrupos(novo["Ticker"]))
+    alteradas[existe] |= prev_ant[pos[existe]] != prev_novo[existe]
+    return alteradas
+
+
+def _expandir(mascara, posicao, passos, para_frente):
+    # Propaga a máscara `passos` linhas para frente (dependentes) ou para trás (contexto)
+    resultado = mascara.copy()
+    for s in range(1, passos + 1):
+        if s >= len(mascara):
+            break
+        mesmo_grupo = posicao[s:] >= s
+        if para_frente:
+            resultado[s:] |= mascara[:-s] & mesmo_grupo
+        else:
+            resultado[:-s] |= mascara[s:] & mesmo_grupo
+    return resultado
+
+
+def recalcular_incremental(bruto_anterior, derivado_anterior, bruto_novo, indicadores=None):
+    """Frame derivado para `bruto_novo` reaproveitando o derivado anterior.
+
+    Retorna (derivado, estatisticas). Cai para o recálculo completo quando o
+    esquema mudou ou há (Ticker, Ano) duplicados.
+    """
+    alvos = indicadores_publicos() if indicadores is None else list(indicadores)
+    novo = _ordenar(bruto_novo)
+    anterior = _ordenar(bruto_anterior)
+    colunas_saida = list(novo.columns) + alvos
+
+    completo = (
+        list(anterior.columns) != list(novo.columns)
+        or list(derivado_anterior.columns) != colunas_saida
+        or novo.duplicated(CHAVE).any()
+        or anterior.duplicated(CHAVE).any()
+    )
+    if completo:
+        derivado = calcular_indicadores(novo, alvos)
+        return derivado, {"linhas": len(novo), "alteradas": len(novo), "recalculadas": len(novo), "completo": True}
+
+    profundidade = profundidade_defasagem(alvos)
+    posicao = IndiceGrupos(novo["Ticker"]).posicao
+    alteradas = linhas_alteradas(anterior, novo)
+    afetadas = _expandir(alteradas, posicao, profundidade, para_frente=True)
+    contexto = _expandir(afetadas, posicao, profundidade, para_frente=False)
+
+    # Linhas não afetadas vêm do derivado anterior (já ordenado por Ticker/Ano)
+    derivado_anterior = _ordenar(derivado_anterior)
+    pos_ant = pd.MultiIndex.from_frame(derivado_anterior[CHAVE]).get_indexer(
+        pd.MultiIndex.from_frame(novo.loc[~afetadas, CHAVE])
+    )
+    mantidas = derivado_anterior.iloc[pos_ant]
+
+    partes = [mantidas]
+    posicoes = [np.flatnonzero(~afetadas)]
+    if afetadas.any():
+        recalculo = calcular_indicadores(novo[contexto], alvos)
+        # calcular_indicadores reordena por Ticker/Ano; novo[contexto] já está nessa ordem
+        partes.append(recalculo[afetadas[contexto]])
+        posicoes.append(np.flatnonzero(afetadas))
+
+    derivado = pd.concat(partes, ignore_index=True)
+    derivado = derivado.iloc[np.argsort(np.concatenate(posicoes), kind="stable")].reset_index(drop=True)
+    return derivado, {
+        "linhas": len(novo),
+        "alteradas": int(alteradas.sum()),
+        "recalculadas": int(afetadas.sum()),
+        "completo": False,
+    }
@@ -0,0 +1,390 @@
+# ==============================================================
+# 📐 INDICADORES FINANCEIROS - cálculo sem dependência de UI
+# ==============================================================
+# Cada indicador é registrado com as colunas de entrada e a fórmula.
+# O motor (calcular_indicadores) ordena o grafo de dependências
+# topologicamente e calcula apenas o subgrafo pedido pela visão.
+import numpy as np
+import pandas as pd
+
+from .defasagens import IndiceGrupos
+
+# nome -> (entradas, fórmula, interno)
+INDICADORES = {}
+# Nós de janela temporal por Ticker: nome -> (coluna, tipo, períodos)
+JANELAS = {}
+
+RECEITA = "Receita de Venda de Bens e/ou Serviços"
+RESULTADO_OPERACIONAL = "Resultado Antes do Resultado Financeiro e dos Tributos"
+LUCRO_LIQUIDO = "Lucro/Prejuízo Consolidado do Período"
+PL = "Patrimônio Líquido Consolidado"
+EMPRESTIMOS_CP = "Empréstimos e Financiamentos - Circulante"
+EMPRESTIMOS_LP = "Empréstimos e Financiamentos - Não Circulante"
+
+
+def indicador(nome, *entradas, interno=False):
+    """Decorador que registra a fórmula de um indicador e suas colunas de entrada.
+
+    Indicadores internos são calculados quando necessários, mas não entram
+    no frame de saída por padrão.
+    """
+    def registrar(formula):
+        INDICADORES[nome] = (entradas, formula, interno)
+        return formula
+    return registrar
+
+
+def _janela(nome, coluna, tipo, periodos):
+    if nome not in INDICADORES:
+        INDICADORES[nome] = ((coluna,), None, True)
+        JANELAS[nome] = (coluna, tipo, periodos)
+    return nome
+
+
+def anterior(coluna, periodos=1):
+    """Nome do nó com o valor de `periodos` anos antes do mesmo Ticker (registrado sob demanda)."""
+    return _janela(f"{coluna} (t-{periodos})", coluna, "defasagem", periodos)
+
+
+def media_anos(coluna, anos):
+    """Nome do nó com a média móvel de `anos` anos do mesmo Ticker (ex.: médias de 3 e 5 anos)."""
+    return _janela(f"{coluna} (média {anos}a)", coluna, "media", anos)
+
+
+# =============================================================
+# CÁLCULOS DE MÉDIAS - CORRIGIDOS
+# =============================================================
+
+# 1. Ativo Médio ✅ CORRETO
+@indicador("Ativo Médio", "Ativo Total", anterior("Ativo Total"))
+def _ativo_medio(ativo, ativo_ant):
+    return (ativo + ativo_ant) / 2
+
+
+# 2. PL Médio ✅ CORRETO
+@indicador("PL Médio", PL, anterior(PL))
+def _pl_medio(pl, pl_ant):
+    return (pl + pl_ant) / 2
+
+
+# 3. Passivo Oneroso Médio ✅ CORRIGIDO
+@indicador("Passivo Oneroso Atual", EMPRESTIMOS_CP, EMPRESTIMOS_LP)
+def _passivo_oneroso_atual(emp_cp, emp_lp):
+    return emp_cp.fillna(0) + emp_lp.fillna(0)
+
+
+@indicador("Passivo Oneroso Anterior", anterior(EMPRESTIMOS_CP), anterior(EMPRESTIMOS_LP))
+def _passivo_oneroso_anterior(emp_cp_ant, emp_lp_ant):
+    return emp_cp_ant.fillna(0) + emp_lp_ant.fillna(0)
+
+
+@indicador("Passivo Oneroso Médio", "Passivo Oneroso Atual", "Passivo Oneroso Anterior")
+def _passivo_oneroso_medio(atual, ant):
+    return (atual + ant) / 2
+
+
+# 4. Investimento Médio ✅ CORRIGIDO
+@indicador("Investimento Atual", EMPRESTIMOS_CP, EMPRESTIMOS_LP, PL)
+def _investimento_atual(emp_cp, emp_lp, pl):
+    return emp_cp.fillna(0) + emp_lp.fillna(0) + pl
+
+
+@indicador("Investimento Anterior", anterior(EMPRESTIMOS_CP), anterior(EMPRESTIMOS_LP), anterior(PL))
+def _investimento_anterior(emp_cp_ant, emp_lp_ant, pl_ant):
+    return emp_cp_ant.fillna(0) + emp_lp_ant.fillna(0) + pl_ant.fillna(0)
+
+
+@indicador("Investimento Médio", "Investimento Atual", "Investimento Anterior")
+def _investimento_medio(atual, ant):
+    return (atual + ant) / 2
+
+
+# =============================================================
+# INDICADORES DE RENTABILIDADE - CORRIGIDOS
+# =============================================================
+
+# ROA = Resultado Antes do Resultado Financeiro e dos Tributos / Ativo Médio
+@indicador("ROA", RESULTADO_OPERACIONAL, "Ativo Médio")
+def _roa(resultado_op, ativo_medio):
+    return np.where(ativo_medio > 0, resultado_op / ativo_medio, np.nan)
+
+
+# ROI = Resultado Antes do Resultado Financeiro e dos Tributos / Investimento Médio
+@indicador("ROI", RESULTADO_OPERACIONAL, "Investimento Médio")
+def _roi(resultado_op, investimento_medio):
+    return np.where(investimento_medio > 0, resultado_op / investimento_medio, np.nan)
+
+
+# ROE = Lucro Líquido / PL Médio
+@indicador("ROE", LUCRO_LIQUIDO, "PL Médio")
+def _roe(lucro, pl_medio):
+    return np.where(pl_medio > 0, lucro / pl_medio, np.nan)
+
+
+# =============================================================
+# MARGENS - ✅ TODOS CORRETOS
+# =============================================================
+
+# Margem Bruta = Resultado Bruto / Receita
+@indicador("Margem Bruta", RECEITA, "Resultado Bruto")
+def _margem_bruta(receita, resultado_bruto):
+    return np.where(receita > 0, resultado_bruto / receita, np.nan)
+
+
+# Margem Operacional = Resultado Operacional / Receita
+@indicador("Margem Operacional", RECEITA, RESULTADO_OPERACIONAL)
+def _margem_operacional(receita, resultado_op):
+    return np.where(receita > 0, resultado_op / receita, np.nan)
+
+
+# Margem Líquida = Lucro Líquido / Receita
+@indicador("Margem Líquida", RECEITA, LUCRO_LIQUIDO)
+def _margem_liquida(receita, lucro):
+    return np.where(receita > 0, lucro / receita, np.nan)
+
+
+# =============================================================
+# ESTRUTURA DE CAPITAL - ✅ TODOS CORRETOS
+# =============================================================
+
+# Total do Passivo = Passivo Circulante + Passivo Não Circulante + Patrimônio Líquido
+@indicador("Total Passivo", "Passivo Circulante", "Passivo Não Circulante", PL)
+def _total_passivo(pc, pnc, pl):
+    return pc.fillna(0) + pnc.fillna(0) + pl.fillna(0)
+
+
+# Percentual Capital Terceiros = (Passivo Circulante + Passivo Não Circulante) / Total Passivo
+@indicador("Percentual Capital Terceiros", "Passivo Circulante", "Passivo Não Circulante", "Total Passivo")
+def _percentual_capital_terceiros(pc, pnc, total_passivo):
+    return np.where(total_passivo > 0, (pc.fillna(0) + pnc.fillna(0)) / total_passivo, np.nan)
+
+
+# Percentual Capital Próprio = Patrimônio Líquido / Total Passivo
+@indicador("Percentual Capital Próprio", PL, "Total Passivo")
+def _percentual_capital_proprio(pl, total_passivo):
+    return np.where(total_passivo > 0, pl / total_passivo, np.nan)
+
+
+# =============================================================
+# CUSTO DE CAPITAL - ✅ TODOS CORRETOS
+# =============================================================
+
+# ki (Custo da Dívida) = Despesas Financeiras / Passivo Oneroso Médio
+@indicador("ki", "Despesas Financeiras", "Passivo Oneroso Médio")
+def _ki(despesas_fin, passivo_oneroso_medio):
+    return np.where(
+        (passivo_oneroso_medio > 0) & (despesas_fin.notna()),
+        despesas_fin.abs() / passivo_oneroso_medio,
+        np.nan
+    )
+
+
+# ke (Custo do Capital Próprio) = Dividendos Pagos / PL Médio
+@indicador("ke", "Pagamento de Dividendos", "PL Médio")
+def _ke(dividendos, pl_medio):
+    return np.where(
+        (pl_medio > 0) & (dividendos.notna()),
+        dividendos.abs() / pl_medio,
+        np.nan
+    )
+
+
+# WACC = (ki × % Capital Terceiros) + (ke × % Capital Próprio)
+@indicador("wacc", "ki", "ke", "Percentual Capital Terceiros", "Percentual Capital Próprio")
+def _wacc(ki, ke, pct_terceiros, pct_proprio):
+    return np.where(
+        (ki.notna()) & (ke.notna()) & (pct_terceiros.notna()) & (pct_proprio.notna()),
+        (ki * pct_terceiros) + (ke * pct_proprio),
+        np.nan
+    )
+
+
+# =============================================================
+# EBITDA E LUCRO ECONÔMICO - CORRIGIDOS PARA GARANTIR IGUALDADE
+# =============================================================
+
+# EBITDA = Resultado Antes dos Tributos + Despesas Financeiras (APROXIMAÇÃO)
+@indicador("EBITDA", "Resultado Antes dos Tributos sobre o Lucro", "Despesas Financeiras")
+def _ebitda(resultado_antes_tributos, despesas_fin):
+    return np.where(
+        (resultado_antes_tributos.notna()) & (despesas_fin.notna()),
+        resultado_antes_tributos + despesas_fin.abs(),
+        np.nan
+    )
+
+
+# ROI EBITDA = EBITDA / Investimento Médio
+@indicador("ROI EBITDA", "EBITDA", "Investimento Médio")
+def _roi_ebitda(ebitda, investimento_medio):
+    return np.where(
+        (ebitda.notna()) & (investimento_medio > 0),
+        ebitda / investimento_medio,
+        np.nan
+    )
+
+
+# LUCRO ECONÔMICO 1 = (ROI - WACC) × Investimento Médio
+@indicador("Lucro Econômico 1", "ROI", "wacc", "Investimento Médio")
+def _lucro_economico_1(roi, wacc, investimento_medio):
+    return np.where(
+        (roi.notna()) & (wacc.notna()) & (investimento_medio.notna()),
+        (roi - wacc) * investimento_medio,
+        np.nan
+    )
+
+
+# LUCRO ECONÔMICO 2 = Resultado Operacional - (WACC × Investimento Médio) ✅ CORRIGIDO
+@indicador("Lucro Econômico 2", RESULTADO_OPERACIONAL, "wacc", "Investimento Médio")
+def _lucro_economico_2(resultado_op, wacc, investimento_medio):
+    return np.where(
+        (resultado_op.notna()) & (wacc.notna()) & (investimento_medio.notna()),
+        resultado_op - (wacc * investimento_medio),
+        np.nan
+    )
+
+
+# VERIFICAÇÃO DE CONSISTÊNCIA
+@indicador("Diferença Lucro Econômico", "Lucro Econômico 1", "Lucro Econômico 2")
+def _diferenca_lucro_economico(le1, le2):
+    return abs(le1 - le2)
+
+
+# LUCRO ECONÔMICO EBITDA = (ROI EBITDA - WACC) × Investimento Médio
+@indicador("Lucro Econômico EBITDA", "ROI EBITDA", "wacc", "Investimento Médio")
+def _lucro_economico_ebitda(roi_ebitda, wacc, investimento_medio):
+    return np.where(
+        (roi_ebitda.notna()) & (wacc.notna()) & (investimento_medio.notna()),
+        (roi_ebitda - wacc) * investimento_medio,
+        np.nan
+    )
+
+
+# =============================================================
+# ANÁLISE DE ALAVANCAGEM - ✅ CORRETO
+# =============================================================
+
+# Verifica se a alavancagem é eficaz (ROE > ROA e ROE > ROI)
+@indicador("Alavancagem Eficaz", "ROE", "ROA", "ROI")
+def _alavancagem_eficaz(roe, roa, roi):
+    return np.where(
+        (roe.notna()) & (roa.notna()) & (roi.notna()),
+        (roe > roa) & (roe > roi),
+        False
+    )
+
+
+# =============================================================
+# MOTOR DE CÁLCULO
+# =============================================================
+
+def indicadores_publicos():
+    """Indicadores que entram no frame de saída por padrão, na ordem de registro."""
+    return [nome for nome, (_, _, interno) in INDICADORES.items() if not interno]
+
+
+def ordem_calculo(alvos):
+    """Ordem topológica do subgrafo necessário para calcular os alvos.
+
+    Entradas que não são indicadores registrados são tratadas como colunas da
+    planilha. Levanta KeyError para alvo desconhecido e ValueError para ciclo.
+    """
+    ordem = []
+    estado = {}  # nome -> "visitando" | "feito"
+
+    def visitar(nome):
+        if estado.get(nome) == "feito":
+            return
+        if estado.get(nome) == "visitando":
+            raise ValueError(f"Dependência circular envolvendo o indicador '{nome}'")
+        estado[nome] = "visitando"
+        for entrada in INDICADORES[nome][0]:
+            if entrada in INDICADORES:
+                visitar(entrada)
+        estado[nome] = "feito"
+        ordem.append(nome)
+
+    for alvo in alvos:
+        if alvo not in INDICADORES:
+            raise KeyError(f"Indicador desconhecido: '{alvo}'")
+        visitar(alvo)
+    return ordem
+
+
+def profundidade_defasagem(alvos):
+    """Quantos anos anteriores do mesmo Ticker influenciam o valor dos alvos numa linha."""
+    profundidade = {}
+    for nome in ordem_calculo(alvos):
+        entradas = INDICADORES[nome][0]
+        herdada = max((profundidade.get(e, 0) for e in entradas), default=0)
+        if nome in JANELAS:
+            _, tipo, periodos = JANELAS[nome]
+            herdada += periodos if tipo == "defasagem" else periodos - 1
+        profundidade[nome] = herdada
+    return max((profundidade[a] for a in alvos), default=0)
+
+
+def colunas_necessarias(alvos):
+    """Colunas da planilha bruta lidas pelo subgrafo dos alvos."""
+    colunas = {"Ticker", "Ano"}
+    for nome in ordem_calculo(alvos):
+        colunas.update(e for e in INDICADORES[nome][0] if e not in INDICADORES)
+    return colunas
+
+
+def _calcular_janelas(indice, nomes, coluna, index):
+    # Agrupa por (tipo, períodos) e calcula cada grupo sobre um bloco único de colunas
+    grupos = {}
+    for nome in nomes:
+        origem, tipo, periodos = JANELAS[nome]
+        grupos.setdefault((tipo, periodos), []).append((nome, origem))
+
+    valores = {}
+    for (tipo, periodos), itens in grupos.items():
+        bloco = np.column_stack([coluna(origem).to_numpy(dtype=np.float64) for _, origem in itens])
+        if tipo == "defasagem":
+            resultado = indice.defasar(bloco, periodos)
+        else:
+            resultado = indice.media_movel(bloco, periodos)
+        for j, (nome, _) in enumerate(itens):
+            valores[nome] = pd.Series(resultado[:, j], index=index, name=nome)
+    return valores
+
+
+def calcular_indicadores(df, indicadores=None):
+    """Calcula os indicadores pedidos (padrão: todos os públicos) a partir da planilha bruta.
+
+    Retorna a planilha ordenada por Ticker/Ano com uma coluna por indicador
+    pedido; intermediários do grafo não pedidos são descartados.
+    """
+    # Ordenar por Ticker e Ano para garantir que shift() funcione corretamente
+    df = df.sort_values(['Ticker', 'Ano']).reset_index(drop=True)
+
+    alvos = indicadores_publicos() if indicadores is None else list(indicadores)
+    ordem = ordem_calculo(alvos)
+    valores = {}
+    indice = None
+
+    def coluna(nome):
+        return valores[nome] if nome in valores else df[nome]
+
+    for nome in ordem:
+        if nome in valores:
+            continue
+        if nome in JANELAS:
+            # Estágio de janelas: o índice de Ticker é montado uma vez e todas as
+            # janelas pendentes com entrada disponível saem numa passagem só
+            if indice is None:
+                indice = IndiceGrupos(df["Ticker"])
+            lote = [
+                n for n in ordem
+                if n in JANELAS and n not in valores
+                and (JANELAS[n][0] in valores or JANELAS[n][0] not in INDICADORES)
+            ]
+            valores.update(_calcular_janelas(indice, lote, coluna, df.index))
+            continue
+        entradas, formula, _ = INDICADORES[nome]
+        args = [coluna(e) for e in entradas]
+        valores[nome] = pd.Series(formula(*args), index=df.index, name=nome)
+
+    saida = pd.DataFrame({nome: valores[nome] for nome in alvos}, index=df.index)
+    return pd.concat([df, saida], axis=1)
@@ -0,0 +1,262 @@
+# ==============================================================
+# 📥 INGESTÃO DOS ARQUIVOS ABERTOS DA CVM (DFP / ITR)
+# ==============================================================
+# Lê os zips de dados abertos (dfp_cia_aberta_AAAA.zip, itr_cia_aberta_AAAA.zip)
+# em blocos, com geradores: cada CSV é filtrado para as contas consolidadas
+# usadas pelos indicadores e só então acumulado. Cada zip é pivotado no
+# mesmo esquema largo do data_frame.xlsx e gravado como um row group do
+# Parquet de saída, então o pico de memória é o de um ano, não do histórico.
+# Contas de resultado (DRE, DFC) só entram com exercício de 12 meses: o ITR
+# traz o trimestre e o acumulado do ano (até 9 meses), que não são anuais.
+import logging
+import os
+import re
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+# Coluna do esquema largo -> código da conta (CD_CONTA) por demonstração
+CONTAS_POR_CODIGO = {
+    "BPA": {
+        "1": "Ativo Total",
+        "1.01": "Ativo Circulante",
+    },
+    "BPP": {
+        "2": "Passivo Total",
+        "2.01": "Passivo Circulante",
+        "2.01.04": "Empréstimos e Financiamentos - Circulante",
+        "2.02": "Passivo Não Circulante",
+        "2.02.01": "Empréstimos e Financiamentos - Não Circulante",
+        "2.03": "Patrimônio Líquido Consolidado",
+    },
+    "DRE": {
+        "3.01": "Receita de Venda de Bens e/ou Serviços",
+        "3.02": "Custo dos Bens e/ou Serviços Vendidos",
+        "3.03": "Resultado Bruto",
+        "3.05": "Resultado Antes do Resultado Financeiro e dos Tributos",
+        "3.06": "Resultado Financeiro",
+        "3.06.01": "Receitas Financeiras",
+        "3.06.02": "Despesas Financeiras",
+        "3.07": "Resultado Antes dos Tributos sobre o Lucro",
+        "3.11": "Lucro/Prejuízo Consolidado do Período",
+    },
+    "DFC": {
+        "6.01": "Caixa Líquido Atividades Operacionais",
+    },
+}
+
+# Contas sem código fixo no plano da CVM: casadas pela descrição dentro do prefixo
+CONTAS_POR_DESCRICAO = {
+    "DFC": ("6.03", {
+        "pagamento de dividendos": "Pagamento de Dividendos",
+        "pagamento de dividendos à controladora": "Pagamento de Dividendos à Controladora",
+        "pagamento de dividendos a acionistas não controladores": "Pagamento de Dividendos a Acionistas Não Controladores",
+        "pagamento de juros sobre capital próprio": "Pagamento de Juros sobre Capital Próprio",
+    }),
+}
+
+COLUNAS_CADASTRO = ["Ticker", "Ano", "CD_CVM", "DENOM_CIA", "CNPJ_CIA", "SETOR_ATIV", "Numero_Acoes", "Tipo_Acao", "Versao"]
+COLUNAS_CONTAS = [
+    "Ativo Total",
+    "Ativo Circulante",
+    "Passivo Total",
+    "Passivo Circulante",
+    "Empréstimos e Financiamentos - Circulante",
+    "Passivo Não Circulante",
+    "Empréstimos e Financiamentos - Não Circulante",
+    "Patrimônio Líquido Consolidado",
+    "Receita de Venda de Bens e/ou Serviços",
+    "Custo dos Bens e/ou Serviços Vendidos",
+    "Resultado Bruto",
+    "Resultado Antes do Resultado Financeiro e dos Tributos",
+    "Resultado Financeiro",
+    "Receitas Financeiras",
+    "Despesas Financeiras",
+    "Resultado Antes dos Tributos sobre o Lucro",
+    "Lucro/Prejuízo Consolidado do Período",
+    "Caixa Líquido Atividades Operacionais",
+    "Pagamento de Dividendos",
+    "Pagamento de Dividendos à Controladora",
+    "Pagamento de Dividendos a Acionistas Não Controladores",
+    "Pagamento de Juros sobre Capital Próprio",
+]
+
+ESQUEMA_BRUTO = pa.schema(
+    [
+        ("Ticker", pa.string()),
+        ("Ano", pa.int64()),
+        ("CD_CVM", pa.int64()),
+        ("DENOM_CIA", pa.string()),
+        ("CNPJ_CIA", pa.string()),
+        ("SETOR_ATIV", pa.string()),
+        ("Numero_Acoes", pa.float64()),
+        ("Tipo_Acao", pa.string()),
+        ("Versao", pa.string()),
+    ]
+    + [(c, pa.float64()) for c in COLUNAS_CONTAS]
+)
+
+COLUNAS_CSV = ["CNPJ_CIA", "DT_REFER", "VERSAO", "DENOM_CIA", "CD_CVM", "ESCALA_MOEDA",
+               "ORDEM_EXERC", "DT_INI_EXERC", "DT_FIM_EXERC", "CD_CONTA", "DS_CONTA", "VL_CONTA"]
+# BPA/BPP são posições numa data: não têm DT_INI_EXERC
+COLUNAS_CSV_OPCIONAIS = {"DT_INI_EXERC"}
+# Exercício mínimo (DT_FIM_EXERC - DT_INI_EXERC, em dias) para uma conta de resultado ser anual
+DIAS_EXERCICIO_ANUAL = 360
+# Ex.: dfp_cia_aberta_BPA_con_2023.csv, itr_cia_aberta_DFC_MI_con_2023.csv
+PADRAO_MEMBRO = re.compile(r"^(dfp|itr)_cia_aberta_(BPA|BPP|DRE|DFC_MI|DFC_MD)_con_(\d{4})\.csv$", re.I)
+ENCODING_CVM = "latin-1"
+
+
+def _filtrar_bloco(bloco, demonstracao):
+    # Mantém só o exercício corrente e as contas mapeadas; devolve formato longo
+    bloco = bloco[bloco["ORDEM_EXERC"].str.upper().str.startswith("ÚLTIMO")]
+    if "DT_INI_EXERC" in bloco.columns:
+        # Contas de resultado: só o exercício de 12 meses (descarta trimestre e acumulado do ITR)
+        dias = (pd.to_datetime(bloco["DT_FIM_EXERC"]) - pd.to_datetime(bloco["DT_INI_EXERC"])).dt.days
+        bloco = bloco[dias >= DIAS_EXERCICIO_ANUAL]
+    codigo = bloco["CD_CONTA"].str.strip()
+    coluna = codigo.map(CONTAS_POR_CODIGO.get(demonstracao, {}))
+
+    if demonstracao in CONTAS_POR_DESCRICAO:
+        prefixo, descricoes = CONTAS_POR_DESCRICAO[demonstracao]
+        por_descricao = bloco["DS_CONTA"].str.strip().str.lower().map(descricoes)
+        coluna = coluna.where(coluna.notna() | ~codigo.str.startswith(prefixo), por_descricao)
+
+    bloco = bloco.assign(coluna=coluna)[coluna.notna()]
+    # Valores da planilha estão em R$ mil
+    escala = np.where(bloco["ESCALA_MOEDA"].str.upper() == "UNIDADE", 1e-3, 1.0)
+    return pd.DataFrame({
+        "CD_CVM": bloco["CD_CVM"].astype(np.int64),
+        "Ano": bloco["DT_REFER"].str[:4].astype(np.int64),
+        "DT_REFER": bloco["DT_REFER"],
+        "VERSAO": bloco["VERSAO"].astype(np.int64),
+        "DENOM_CIA": bloco["DENOM_CIA"],
+        "CNPJ_CIA": bloco["CNPJ_CIA"],
+        "coluna": bloco["coluna"],
+        "valor": bloco["VL_CONTA"].astype(np.float64) * escala,
+    })
+
+
+def ler_contas(caminho_zip, tamanho_bloco=200_000):
+    """Gerador de blocos longos (CD_CVM, Ano, coluna, valor, ...) das contas mapeadas de um zip."""
+    with zipfile.ZipFile(caminho_zip) as arquivo:
+        for membro in arquivo.namelist():
+            casamento = PADRAO_MEMBRO.match(os.path.basename(membro))
+            if not casamento:
+                continue
+            tipo = casamento.group(1).upper()
+            demonstracao = casamento.group(2).upper()[:3]
+            with arquivo.open(membro) as f:
+                leitor = pd.read_csv(
+                    f, sep=";", encoding=ENCODING_CVM, usecols=lambda c: c in COLUNAS_CSV,
+                    dtype={"CD_CONTA": str, "DS_CONTA": str, "CNPJ_CIA": str, "DT_REFER": str,
+                           "DT_INI_EXERC": str, "DT_FIM_EXERC": str},
+                    chunksize=tamanho_bloco,
+                )
+                for bloco in leitor:
+                    faltando = set(COLUNAS_CSV) - COLUNAS_CSV_OPCIONAIS - set(bloco.columns)
+                    if faltando:
+                        raise ValueError(f"{membro}: colunas ausentes: {', '.join(sorted(faltando))}")
+                    filtrado = _filtrar_bloco(bloco, demonstracao)
+                    if not filtrado.empty:
+                        yield filtrado.assign(Versao=tipo)
+
+
+def pivotar(longo):
+    """Formato longo de um período -> esquema largo (uma linha por CD_CVM/Ano)."""
+    # Última versão entregue de cada documento; DFP prevalece sobre ITR do mesmo ano
+    longo = longo[longo["VERSAO"] == longo.groupby(["CD_CVM", "Versao", "DT_REFER"])["VERSAO"].transform("max")]
+    longo = longo[longo["DT_REFER"] == longo.groupby(["CD_CVM", "Versao", "Ano"])["DT_REFER"].transform("max")]
+    if (longo["Versao"] == "DFP").any():
+        tem_dfp = longo[longo["Versao"] == "DFP"].groupby(["CD_CVM", "Ano"]).size()
+        chave = pd.MultiIndex.from_frame(longo[["CD_CVM", "Ano"]])
+        longo = longo[(longo["Versao"] == "DFP") | ~chave.isin(tem_dfp.index)]
+
+    chaves = ["CD_CVM", "Ano", "Versao"]
+    # Uma conta por documento. Repetida (ex.: duas linhas 6.03.xx com a mesma descrição),
+    # a célula fica vazia e é registrada no log: nunca somada, e sem parar as demais empresas
+    repetidas = longo.duplicated(chaves + ["coluna"], keep=False)
+    if repetidas.any():
+        celulas = longo.loc[repetidas, chaves + ["coluna"]].drop_duplicates()
+        logger.warning(
+            "%d conta(s) repetida(s) no mesmo documento ficaram vazias: %s", len(celulas),
+            "; ".join(", ".join(map(str, linha)) for linha in celulas.head(5).itertuples(index=False)),
+        )
+        longo = longo.assign(valor=longo["valor"].mask(repetidas)).drop_duplicates(chaves + ["coluna"])
+    largo = longo.pivot(index=chaves, columns="coluna", values="valor")
+    largo = largo.reindex(columns=COLUNAS_CONTAS)
+    cadastro = longo.groupby(chaves)[["DENOM_CIA", "CNPJ_CIA"]].first()
+    return cadastro.join(largo).reset_index()
+
+
+def _ler_csv_auxiliar(caminho):
+    # Cadastros da CVM vêm em latin-1; mapas feitos à mão, normalmente em UTF-8
+    try:
+        return pd.read_csv(caminho, sep=None, engine="python", encoding="utf-8", dtype=str)
+    except UnicodeDecodeError:
+        return pd.read_csv(caminho, sep=None, engine="python", encoding=ENCODING_CVM, dtype=str)
+
+
+def carregar_cadastros(tickers=None, cadastro=None):
+    """(mapa de tickers, setores) a partir dos CSVs auxiliares opcionais.
+
+    tickers: CSV com CD_CVM;Ticker[;Tipo_Acao] (uma linha por ticker).
+    cadastro: cad_cia_aberta.csv da CVM (CD_CVM;SETOR_ATIV;...).
+    """
+    mapa = None
+    if tickers:
+        mapa = _ler_csv_auxiliar(tickers)
+        mapa = mapa[[c for c in ("CD_CVM", "Ticker", "Tipo_Acao") if c in mapa.columns]]
+        mapa["CD_CVM"] = mapa["CD_CVM"].astype(np.int64)
+    setores = None
+    if cadastro:
+        setores = _ler_csv_auxiliar(cadastro)[["CD_CVM", "SETOR_ATIV"]].dropna(subset=["CD_CVM"])
+        setores["CD_CVM"] = setores["CD_CVM"].astype(np.int64)
+        setores = setores.drop_duplicates("CD_CVM", keep="last")
+    return mapa, setores
+
+
+def _completar_esquema(largo, mapa, setores):
+    if mapa is not None:
+        largo = largo.merge(mapa, on="CD_CVM", how="inner")
+    else:
+        largo = largo.assign(Ticker=largo["CD_CVM"].astype(str))
+    if setores is not None:
+        largo = largo.merge(setores, on="CD_CVM", how="left")
+    for coluna in COLUNAS_CADASTRO:
+        if coluna not in largo.columns:
+            largo[coluna] = np.nan if coluna == "Numero_Acoes" else None
+    return largo[COLUNAS_CADASTRO + COLUNAS_CONTAS]
+
+
+def ingerir_arquivos(caminhos_zip, tickers=None, cadastro=None, tamanho_bloco=200_000):
+    """Gerador de frames largos, um por zip, no esquema do data_frame.xlsx."""
+    mapa, setores = carregar_cadastros(tickers, cadastro)
+    for caminho in caminhos_zip:
+        blocos = list(ler_contas(caminho, tamanho_bloco))
+        if not blocos:
+            continue
+        largo = pivotar(pd.concat(blocos, ignore_index=True))
+        del blocos
+        yield _completar_esquema(largo, mapa, setores)
+
+
+def ingerir(caminhos_zip, destino, tickers=None, cadastro=None, tamanho_bloco=200_000):
+    """Grava o Parquet bruto (um row group por zip). Retorna o número de linhas escritas."""
+    tmp = f"{destino}.tmp-{os.getpid()}"
+    total = 0
+    try:
+        with pq.ParquetWriter(tmp, ESQUEMA_BRUTO) as writer:
+            for largo in ingerir_arquivos(sorted(caminhos_zip), tickers, cadastro, tamanho_bloco):
+                writer.write_table(pa.Table.from_pandas(largo, schema=ESQUEMA_BRUTO, preserve_index=False))
+                total += len(largo)
+        os.replace(tmp, destino)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return total
@@ -0,0 +1,345 @@
+# ==============================================================
+# 🩺 INSTRUMENTAÇÃO POR ESTÁGIO (tempo e pico de memória)
+# ==============================================================
+# Opt-in: com a instrumentação desligada, secao() devolve um contexto vazio
+# e as funções em cache são chamadas diretamente. Ligada, cada rerun guarda
+# tempo de parede e pico de alocações (tracemalloc: memória de Python/NumPy,
+# não os buffers do Arrow) por seção nomeada, e acerto/falta por chamada de
+# função em cache. A medição ativa fica num ContextVar: cada sessão do
+# Streamlit roda o script na sua thread, então não há mistura entre sessões.
+# O tracemalloc, por outro lado, é global ao processo: start/stop passam por
+# um contador protegido por lock, reservado só enquanto uma seção externa
+# está aberta (liberado no finally, mesmo quando o rerun é interrompido por
+# st.stop(), troca de widget ou exceção), e cada reset_peak incrementa uma
+# geração. Uma seção durante a
+# qual outra sessão zerou o pico fica sem pico_bytes em vez de reportar um
+# valor errado. Mesmo assim, o pico medido inclui alocações de outras
+# sessões que rodam ao mesmo tempo.
+#
+# Exportação: uma linha JSON por rerun no logger deste módulo e o acumulado
+# do processo em texto no formato Prometheus (textfile collector).
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+logger = logging.getLogger(__name__)
+
+_ATIVA = ContextVar("cvm_instrumentacao", default=None)
+
+# Estado compartilhado do tracemalloc (global ao processo)
+_LOCK_TRACEMALLOC = threading.Lock()
+_sessoes_tracemalloc = 0
+_ligado_aqui = False
+_geracao_pico = 0
+
+
+def _reservar_tracemalloc():
+    # A primeira sessão com memória liga o tracemalloc (se ninguém mais ligou)
+    global _sessoes_tracemalloc, _ligado_aqui
+    with _LOCK_TRACEMALLOC:
+        if _sessoes_tracemalloc == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _ligado_aqui = True
+        _sessoes_tracemalloc += 1
+
+
+def _liberar_tracemalloc():
+    # A última sessão desliga, e só se foi este módulo que ligou
+    global _sessoes_tracemalloc, _ligado_aqui
+    with _LOCK_TRACEMALLOC:
+        _sessoes_tracemalloc -= 1
+        if _sessoes_tracemalloc == 0 and _ligado_aqui:
+            tracemalloc.stop()
+            _ligado_aqui = False
+
+
+def _reiniciar_pico(geracao):
+    """(atual, pico, geração nova, pico válido): zera o pico; válido se ninguém zerou desde `geracao`."""
+    global _geracao_pico
+    with _LOCK_TRACEMALLOC:
+        atual, pico = tracemalloc.get_traced_memory()
+        valido = geracao == _geracao_pico
+        tracemalloc.reset_peak()
+        _geracao_pico += 1
+        return atual, pico, _geracao_pico, valido
+
+
+def _ler_pico(geracao):
+    """(pico, válido) desde o último reset; válido se ninguém zerou desde `geracao`."""
+    with _LOCK_TRACEMALLOC:
+        return tracemalloc.get_traced_memory()[1], geracao == _geracao_pico
+
+
+class Instrumentacao:
+    """Medições de um rerun: seções nomeadas e chamadas de funções em cache."""
+
+    def __init__(self, memoria=True):
+        self.memoria = memoria
+        self.secoes = []  # {"secao", "segundos", "pico_bytes", "nivel"}
+        self.chamadas_cache = []  # {"funcao", "resultado", "segundos"}
+        self.inicio = time.perf_counter()
+        self.total = None
+        self._pilha = []
+        self._execucoes = {}
+        self._geracao = None  # geração do último reset_peak feito por esta sessão
+
+    def _descartar_picos(self):
+        # Outra sessão zerou o pico: nenhuma seção aberta tem mais um pico confiável
+        for quadro in self._pilha:
+            quadro["valido"] = False
+
+    @contextmanager
+    def secao(self, nome):
+        """Mede o bloco: tempo de parede e pico de alocação acima do início."""
+        externa = not self._pilha
+        if self.memoria:
+            if externa:
+                _reservar_tracemalloc()
+            atual, pico, self._geracao, valido = _reiniciar_pico(self._geracao)
+            if not valido:
+                self._descartar_picos()
+            if self._pilha:
+                # O pico da seção externa precisa sobreviver ao reset feito aqui
+                self._pilha[-1]["pico"] = max(self._pilha[-1]["pico"], pico)
+        else:
+            atual = 0
+        quadro = {"base": atual, "pico": atual, "valido": True}
+        self._pilha.append(quadro)
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            segundos = time.perf_counter() - inicio
+            self._pilha.pop()
+            registro = {"secao": nome, "segundos": segundos, "nivel": len(self._pilha)}
+            if self.memoria:
+                try:
+                    pico, valido = _ler_pico(self._geracao)
+                    if not valido:
+                        quadro["valido"] = False
+                        self._descartar_picos()
+                    pico = max(quadro["pico"], pico)
+                    if quadro["valido"]:
+                        registro["pico_bytes"] = pico - quadro["base"]
+                    if self._pilha:
+                        self._pilha[-1]["pico"] = max(self._pilha[-1]["pico"], pico)
+                finally:
+                    if externa:
+                        _liberar_tracemalloc()
+            self.secoes.append(registro)
+
+    def registrar_execucao(self, funcao):
+        """Chamado de dentro do corpo da função em cache: só roda numa falta."""
+        self._execucoes[funcao] = self._execucoes.get(funcao, 0) + 1
+
+    @contextmanager
+    def chamada_cache(self, funcao):
+        """Seção da chamada; é falta se o corpo da função rodou dentro dela."""
+        antes = self._execucoes.get(funcao, 0)
+        inicio = time.perf_counter()
+        try:
+            with self.secao(f"cache/{funcao}"):
+                yield
+        finally:
+            self.registrar_cache(
+                funcao, self._execucoes.get(funcao, 0) > antes, time.perf_counter() - inicio
+            )
+
+    def registrar_cache(self, funcao, falta, segundos):
+        self.chamadas_cache.append(
+            {"funcao": funcao, "resultado": "falta" if falta else "acerto", "segundos": segundos}
+        )
+
+    def finalizar(self):
+        """Fecha o rerun (tempo total)."""
+        if self.total is None:
+            self.total = time.perf_counter() - self.inicio
+        return self
+
+    def resumo(self):
+        """Seções agregadas por nome: execuções, tempo total/máximo e maior pico (None se nenhum válido)."""
+        agregado = {}
+        for r in self.secoes:
+            a = agregado.setdefault(r["secao"], {
+                "secao": r["secao"], "execucoes": 0, "segundos": 0.0, "max_segundos": 0.0,
+                "pico_bytes": None, "nivel": r["nivel"],
+            })
+            a["execucoes"] += 1
+            a["segundos"] += r["segundos"]
+            a["max_segundos"] = max(a["max_segundos"], r["segundos"])
+            a["nivel"] = min(a["nivel"], r["nivel"])
+            if "pico_bytes" in r:
+                a["pico_bytes"] = max(a["pico_bytes"] or 0, r["pico_bytes"])
+        return sorted(agregado.values(), key=lambda a: -a["segundos"])
+
+    def como_dict(self, **contexto):
+        return {
+            "total_segundos": self.total,
+            **contexto,
+            "secoes": self.resumo(),
+            "cache": self.chamadas_cache,
+        }
+
+    def registrar_log(self, **contexto):
+        """Uma linha JSON por rerun (logger cvm_indicators.instrumentacao, nível INFO)."""
+        logger.info(json.dumps(self.como_dict(**contexto), ensure_ascii=False, default=str))
+
+
+def iniciar(ativo=True, memoria=True):
+    """Começa as medições do rerun atual (substitui as do anterior nesta thread).
+
+    Com ativo=False, secao()/em_cache() viram no-ops e devolve None.
+    """
+    instrumentacao = Instrumentacao(memoria) if ativo else None
+    _ATIVA.set(instrumentacao)
+    return instrumentacao
+
+
+def atual():
+    return _ATIVA.get()
+
+
+def secao(nome):
+    """Contexto que mede o bloco na instrumentação ativa (ou não faz nada)."""
+    instrumentacao = _ATIVA.get()
+    return instrumentacao.secao(nome) if instrumentacao is not None else nullcontext()
+
+
+def chamada_cache(funcao):
+    """Contexto de uma chamada a `funcao` em cache (acerto/falta), ou nada se desligado."""
+    instrumentacao = _ATIVA.get()
+    return instrumentacao.chamada_cache(funcao) if instrumentacao is not None else nullcontext()
+
+
+def registrar_execucao(funcao):
+    """Marca que o corpo de `funcao` rodou (falta de cache)."""
+    instrumentacao = _ATIVA.get()
+    if instrumentacao is not None:
+        instrumentacao.registrar_execucao(funcao)
+
+
+def em_cache(decorador_cache, nome=None):
+    """Aplica um decorador de cache (ex.: st.cache_data(...)) medindo acertos e faltas.
+
+        @em_cache(st.cache_data(max_entries=64))
+        def load_data(...): ...
+
+    O corpo marca a execução (só acontece numa falta) e a chamada externa vira
+    a seção "cache/<nome>". clear() continua disponível.
+    """
+    def aplicar(func):
+        funcao = nome or func.__name__
+
+        @functools.wraps(func)
+        def corpo(*args, **kwargs):
+            registrar_execucao(funcao)
+            return func(*args, **kwargs)
+
+        cacheada = decorador_cache(corpo)
+
+        @functools.wraps(func)
+        def chamada(*args, **kwargs):
+            with chamada_cache(funcao):
+                return cacheada(*args, **kwargs)
+
+        if hasattr(cacheada, "clear"):
+            chamada.clear = cacheada.clear
+        return chamada
+
+    return aplicar
+
+
+def configurar_log(nivel=logging.INFO):
+    """Garante que as linhas JSON saiam no stderr quando nada foi configurado."""
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+    logger.setLevel(nivel)
+
+
+# ==============================
+# MÉTRICAS ACUMULADAS (Prometheus)
+# ==============================
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metricas:
+    """Acumulado do processo (todas as sessões), exportado em texto Prometheus."""
+
+    def __init__(self, prefixo="cvm_dashboard"):
+        self.prefixo = prefixo
+        self._lock = threading.Lock()
+        self._reruns = 0
+        self._segundos_rerun = 0.0
+        self._secoes = {}  # nome -> [execucoes, segundos, max pico]
+        self._cache = {}  # (funcao, resultado) -> [chamadas, segundos]
+
+    def acumular(self, instrumentacao):
+        with self._lock:
+            self._reruns += 1
+            self._segundos_rerun += instrumentacao.total or 0.0
+            for r in instrumentacao.secoes:
+                s = self._secoes.setdefault(r["secao"], [0, 0.0, 0])
+                s[0] += 1
+                s[1] += r["segundos"]
+                s[2] = max(s[2], r.get("pico_bytes") or 0)
+            for c in instrumentacao.chamadas_cache:
+                k = self._cache.setdefault((c["funcao"], c["resultado"]), [0, 0.0])
+                k[0] += 1
+                k[1] += c["segundos"]
+
+    def texto_prometheus(self):
+        p = self.prefixo
+        with self._lock:
+            linhas = [
+                f"# HELP {p}_reruns_total Reruns instrumentados.",
+                f"# TYPE {p}_reruns_total counter",
+                f"{p}_reruns_total {self._reruns}",
+                f"# HELP {p}_rerun_seconds_total Tempo de parede somado dos reruns.",
+                f"# TYPE {p}_rerun_seconds_total counter",
+                f"{p}_rerun_seconds_total {self._segundos_rerun:.6f}",
+                f"# HELP {p}_section_seconds_total Tempo de parede por seção.",
+                f"# TYPE {p}_section_seconds_total counter",
+            ]
+            linhas += [f'{p}_section_seconds_total{{section="{_escapar(n)}"}} {s[1]:.6f}'
+                       for n, s in sorted(self._secoes.items())]
+            linhas += [
+                f"# HELP {p}_section_runs_total Execuções por seção.",
+                f"# TYPE {p}_section_runs_total counter",
+            ]
+            linhas += [f'{p}_section_runs_total{{section="{_escapar(n)}"}} {s[0]}'
+                       for n, s in sorted(self._secoes.items())]
+            linhas += [
+                f"# HELP {p}_section_peak_bytes Maior pico de alocação (tracemalloc) por seção.",
+                f"# TYPE {p}_section_peak_bytes gauge",
+            ]
+            linhas += [f'{p}_section_peak_bytes{{section="{_escapar(n)}"}} {s[2]}'
+                       for n, s in sorted(self._secoes.items())]
+            linhas += [
+                f"# HELP {p}_cache_calls_total Chamadas de funções em cache por resultado.",
+                f"# TYPE {p}_cache_calls_total counter",
+            ]
+            linhas += [f'{p}_cache_calls_total{{function="{_escapar(f)}",result="{r}"}} {c[0]}'
+                       for (f, r), c in sorted(self._cache.items())]
+            linhas += [
+                f"# HELP {p}_cache_seconds_total Tempo das chamadas em cache por resultado.",
+                f"# TYPE {p}_cache_seconds_total counter",
+            ]
+            linhas += [f'{p}_cache_seconds_total{{function="{_escapar(f)}",result="{r}"}} {c[1]:.6f}'
+                       for (f, r), c in sorted(self._cache.items())]
+        return "\n".join(linhas) + "\n"
+
+    def gravar_prometheus(self, caminho):
+        """Escreve o texto de forma atômica (lido pelo textfile collector do node_exporter)."""
+        tmp = f"{caminho}.tmp-{os.getpid()}-{threading.get_ident()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.texto_prometheus())
+        os.replace(tmp, caminho)
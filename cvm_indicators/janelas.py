@@ -0,0 +1,163 @@
+# ==============================================================
+# 📅 JANELAS PLURIANUAIS: MÉDIAS MÓVEIS, CAGR E TENDÊNCIA
+# ==============================================================
+# Indicadores de 3 e 5 anos por Ticker: média móvel de ROE/ROI/wacc,
+# CAGR de Receita e Lucro e tendência (inclinação da reta de mínimos
+# quadrados) do Lucro Econômico. As linhas são espalhadas uma vez numa
+# grade NumPy (ticker × ano do calendário × coluna): um ano ausente vira
+# NaN no seu lugar, então a janela de 3 anos cobre 3 anos de calendário,
+# não 3 linhas (diferente das defasagens por linha de defasagens.py).
+# Somas acumuladas ao longo do eixo dos anos dão todas as janelas de
+# todas as colunas de uma vez. Gravado junto do snapshot.
+import numpy as np
+import pandas as pd
+
+from .indicadores import LUCRO_LIQUIDO, RECEITA
+
+ANOS_JANELA = (3, 5)
+MEDIAS = ["ROE", "ROI", "wacc"]
+# Rótulo -> coluna da planilha
+CRESCIMENTO = {"Receita": RECEITA, "Lucro": LUCRO_LIQUIDO}
+TENDENCIA = ["Lucro Econômico 1"]
+
+
+def coluna(indicador, medida, anos):
+    """Nome da coluna, ex.: coluna("ROE", "média móvel", 3) -> "ROE (média móvel 3a)"."""
+    return f"{indicador} ({medida} {anos}a)"
+
+
+class GradeAnual:
+    """Posição de cada linha numa grade (ticker × ano), do primeiro ao último ano do frame.
+
+    Linhas sem Ticker ou Ano ficam fora da grade e recebem NaN. Com
+    (Ticker, Ano) duplicado, a última linha ocupa a célula.
+    """
+
+    def __init__(self, tickers, anos):
+        codigos, unicos = pd.factorize(tickers)
+        anos = pd.to_numeric(pd.Series(anos), errors="coerce").to_numpy(dtype=np.float64)
+        self.validas = (codigos >= 0) & ~np.isnan(anos)
+        self.ano_inicial = int(anos[self.validas].min()) if self.validas.any() else 0
+        n_anos = int(anos[self.validas].max()) - self.ano_inicial + 1 if self.validas.any() else 0
+        self.forma = (len(unicos), n_anos)
+        self._linha = codigos[self.validas]
+        self._coluna = anos[self.validas].astype(np.int64) - self.ano_inicial
+
+    def para_grade(self, valores):
+        """(linhas × colunas) -> (tickers × anos × colunas), NaN nas células sem linha."""
+        bloco = np.asarray(valores, dtype=np.float64)
+        if bloco.ndim == 1:
+            bloco = bloco[:, None]
+        grade = np.full(self.forma + (bloco.shape[1],), np.nan)
+        grade[self._linha, self._coluna] = bloco[self.validas]
+        return grade
+
+    def da_grade(self, grade):
+        """(tickers × anos × colunas) -> (linhas × colunas), na ordem original das linhas."""
+        saida = np.full((len(self.validas), grade.shape[2]), np.nan)
+        saida[self.validas] = grade[self._linha, self._coluna]
+        return saida
+
+
+def _acumulada(bloco):
+    # Soma acumulada no eixo dos anos com zero à frente: soma(j-n+1..j) = S[:, j+1] - S[:, j+1-n]
+    acumulada = np.zeros((bloco.shape[0], bloco.shape[1] + 1, bloco.shape[2]))
+    np.cumsum(bloco, axis=1, out=acumulada[:, 1:])
+    return acumulada
+
+
+def _janela(acumulada, anos):
+    # Soma dos últimos `anos` anos de calendário (janela truncada no início da grade)
+    fim = np.arange(1, acumulada.shape[1])
+    return acumulada[:, fim] - acumulada[:, np.maximum(fim - anos, 0)]
+
+
+class Acumulados:
+    """Somas acumuladas de uma grade (contagem, valores, ano, ano², ano × valor), montadas uma vez.
+
+    Qualquer janela de médias ou tendência sai de diferenças dessas somas,
+    sem nova passada pela grade.
+    """
+
+    def __init__(self, grade):
+        validos = ~np.isnan(grade)
+        # Ano relativo à grade (0, 1, 2...) como abscissa da tendência
+        t = np.where(validos, np.arange(grade.shape[1], dtype=np.float64)[None, :, None], 0.0)
+        y = np.where(validos, grade, 0.0)
+        self.n = _acumulada(validos.astype(np.float64))
+        self.y = _acumulada(y)
+        self.t = _acumulada(t)
+        self.tt = _acumulada(t * t)
+        self.ty = _acumulada(t * y)
+
+    def media(self, anos, min_anos=None):
+        """Média dos últimos `anos` anos; NaN com menos de `min_anos` (padrão: todos) presentes."""
+        min_anos = anos if min_anos is None else min_anos
+        n = _janela(self.n, anos)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            media = _janela(self.y, anos) / n
+        media[n < max(min_anos, 1)] = np.nan
+        return media
+
+    def tendencia(self, anos, min_anos=None):
+        """Inclinação (unidade por ano) da reta de mínimos quadrados sobre os últimos `anos` anos.
+
+        Usa só os anos presentes; NaN com menos de `min_anos` (padrão: todos, mínimo 2).
+        """
+        min_anos = anos if min_anos is None else min_anos
+        n = _janela(self.n, anos)
+        soma_t, soma_y = _janela(self.t, anos), _janela(self.y, anos)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            inclinacao = (n * _janela(self.ty, anos) - soma_t * soma_y) / (n * _janela(self.tt, anos) - soma_t ** 2)
+        inclinacao[n < max(min_anos, 2)] = np.nan
+        return inclinacao
+
+
+def cagr(grade, anos):
+    """(valor no ano / valor `anos` anos antes) ** (1/anos) - 1; NaN se uma ponta falta ou não é positiva."""
+    saida = np.full_like(grade, np.nan)
+    inicio, fim = grade[:, :-anos], grade[:, anos:]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        saida[:, anos:] = np.where((inicio > 0) & (fim > 0), (fim / inicio) ** (1 / anos) - 1, np.nan)
+    return saida
+
+
+def calcular_janelas(df, anos_janela=ANOS_JANELA, medias=None, crescimento=None, tendencia=None):
+    """Frame (Ticker, Ano, SETOR_ATIV) com médias móveis, CAGR e tendências por janela de anos.
+
+    Uma grade e um conjunto de somas acumuladas para todas as colunas de
+    entrada; cada janela sai de diferenças dessas somas. Médias e tendência
+    exigem todos os anos da janela presentes; o CAGR, as duas pontas
+    positivas. Valores infinitos são tratados como ausentes.
+    """
+    medias = [c for c in (MEDIAS if medias is None else medias) if c in df.columns]
+    crescimento = {r: c for r, c in (CRESCIMENTO if crescimento is None else crescimento).items() if c in df.columns}
+    tendencia = [c for c in (TENDENCIA if tendencia is None else tendencia) if c in df.columns]
+
+    entradas = list(dict.fromkeys(medias + list(crescimento.values()) + tendencia))
+    valores = df[entradas].astype(np.float64).replace([np.inf, -np.inf], np.nan)
+    grade_anual = GradeAnual(df["Ticker"], df["Ano"])
+    grade = grade_anual.para_grade(valores.to_numpy())
+    indice = {c: i for i, c in enumerate(entradas)}
+
+    acumulados = Acumulados(grade)
+
+    def fatia(bloco, colunas):
+        return bloco[:, :, [indice[c] for c in colunas]]
+
+    nomes, blocos = [], []
+    for anos in anos_janela:
+        blocos += [
+            fatia(acumulados.media(anos), medias),
+            cagr(fatia(grade, crescimento.values()), anos),
+            fatia(acumulados.tendencia(anos), tendencia),
+        ]
+        nomes += [coluna(c, "média móvel", anos) for c in medias]
+        nomes += [coluna(r, "CAGR", anos) for r in crescimento]
+        nomes += [coluna(c, "tendência", anos) for c in tendencia]
+
+    chaves = df[["Ticker", "Ano", "SETOR_ATIV"]].reset_index(drop=True)
+    if not blocos:
+        return chaves
+    saida = grade_anual.da_grade(np.concatenate(blocos, axis=2))
+    return pd.concat([chaves, pd.DataFrame(saida, columns=nomes)], axis=1)
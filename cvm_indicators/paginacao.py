@@ -0,0 +1,94 @@
+# ==============================================================
+# 📄 TABELA PAGINADA (screener) COM ORDENAÇÃO NO SERVIDOR
+# ==============================================================
+# O screener lista todas as empresas de um ano com todos os indicadores.
+# Em vez de estilizar e enviar o frame inteiro ao navegador, a ordenação
+# e os filtros rodam aqui sobre arrays numpy e só as linhas da página
+# visível são recortadas (e depois formatadas pelo app): o tamanho da
+# resposta fica constante com o universo. As ordens por coluna são
+# calculadas uma vez e reaproveitadas entre páginas, filtros e sessões.
+import math
+
+import numpy as np
+import pandas as pd
+
+
+def total_paginas(total_linhas, tamanho):
+    return max(1, math.ceil(total_linhas / tamanho))
+
+
+def _chave_ordenacao(serie):
+    # (valores comparáveis, válidos): categorias pelos códigos (categorias já ordenadas)
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos = serie.cat.codes.to_numpy()
+        return codigos, codigos >= 0
+    if pd.api.types.is_numeric_dtype(serie.dtype):
+        valores = serie.to_numpy(dtype=np.float64, na_value=np.nan)
+        return valores, ~np.isnan(valores)
+    codigos, _ = pd.factorize(serie, sort=True)
+    return codigos, codigos >= 0
+
+
+class Paginador:
+    """Screener sobre `df`: filtra e ordena no servidor e entrega só a página pedida.
+
+    Ordenação estável; vazios (NaN) sempre no fim, nas duas direções.
+    """
+
+    def __init__(self, df, colunas=None):
+        self.df = df
+        self.colunas = list(colunas) if colunas is not None else list(df.columns)
+        self._ordens = {}
+
+    def __len__(self):
+        return len(self.df)
+
+    def ordem(self, coluna, ascendente=False):
+        """Posições (iloc) de todas as linhas ordenadas por `coluna` (calculadas uma vez)."""
+        chave = (coluna, ascendente)
+        if chave not in self._ordens:
+            valores, validos = _chave_ordenacao(self.df[coluna])
+            linhas = np.flatnonzero(validos)
+            ordenadas = linhas[np.argsort(valores[linhas] if ascendente else -valores[linhas], kind="stable")]
+            self._ordens[chave] = np.concatenate([ordenadas, np.flatnonzero(~validos)])
+        return self._ordens[chave]
+
+    def filtro(self, setores=None, busca=None, faixas=None):
+        """Máscara booleana das linhas que passam nos filtros (None = todas).
+
+        setores: lista de SETOR_ATIV; busca: trecho do Ticker (sem diferenciar
+        maiúsculas); faixas: {coluna: (mínimo, máximo)}, None em cada ponta = aberta.
+        """
+        mascara = np.ones(len(self.df), dtype=bool)
+        if setores:
+            mascara &= self.df["SETOR_ATIV"].isin(list(setores)).to_numpy()
+        if busca and busca.strip():
+            tickers = self.df["Ticker"].astype(str).str.strip().str.upper()
+            mascara &= tickers.str.contains(busca.strip().upper(), regex=False).to_numpy()
+        for coluna, (minimo, maximo) in (faixas or {}).items():
+            valores = self.df[coluna].to_numpy(dtype=np.float64, na_value=np.nan)
+            if minimo is not None:
+                mascara &= valores >= minimo
+            if maximo is not None:
+                mascara &= valores <= maximo
+        return mascara
+
+    def selecao(self, ordenar_por, ascendente=False, setores=None, busca=None, faixas=None):
+        """Posições (iloc) das linhas filtradas, já ordenadas: len() dá o total da seleção."""
+        ordem = self.ordem(ordenar_por, ascendente)
+        return ordem[self.filtro(setores, busca, faixas)[ordem]]
+
+    def janela(self, posicoes, numero, tamanho):
+        """Linhas da página `numero` (a partir de 1, limitada ao intervalo válido) da seleção."""
+        numero = min(max(1, numero), total_paginas(len(posicoes), tamanho))
+        janela = self.df.iloc[posicoes[(numero - 1) * tamanho:numero * tamanho]][self.colunas]
+        # O dicionário de uma category vai junto na serialização: só as categorias da página
+        for coluna in janela.columns:
+            if isinstance(janela[coluna].dtype, pd.CategoricalDtype):
+                janela[coluna] = janela[coluna].cat.remove_unused_categories()
+        return janela
+
+    def pagina(self, numero, tamanho, ordenar_por, ascendente=False, setores=None, busca=None, faixas=None):
+        """(janela, total de linhas filtradas) numa chamada só."""
+        posicoes = self.selecao(ordenar_por, ascendente, setores, busca, faixas)
+        return self.janela(posicoes, numero, tamanho), len(posicoes)
@@ -0,0 +1,103 @@
+# ==============================================================
+# 🧵 CÁLCULO PARALELO POR SHARDS DE TICKER (ProcessPoolExecutor)
+# ==============================================================
+# Todo indicador depende só das linhas do próprio Ticker (inclusive as
+# defasagens), então o frame é dividido por hash do Ticker. As colunas
+# numéricas de entrada vão para um bloco de memória compartilhada e cada
+# worker escreve seus resultados num bloco de saída também compartilhado:
+# só nomes de blocos e intervalos de linhas trafegam entre processos.
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from .indicadores import calcular_indicadores, colunas_necessarias, indicadores_publicos
+
+
+def _anexar(nome, forma):
+    shm = shared_memory.SharedMemory(name=nome)
+    return shm, np.ndarray(forma, dtype=np.float64, buffer=shm.buf)
+
+
+def _calcular_shard(entrada, saida, colunas, alvos, inicio, fim):
+    # Executado no worker: lê o intervalo do bloco de entrada e grava no de saída
+    shm_in, bloco_in = _anexar(*entrada)
+    shm_out, bloco_out = _anexar(*saida)
+    try:
+        df = pd.DataFrame(bloco_in[inicio:fim], columns=colunas)
+        resultado = calcular_indicadores(df, alvos)
+        bloco_out[inicio:fim] = resultado[alvos].to_numpy(dtype=np.float64)
+    finally:
+        del bloco_in, bloco_out
+        shm_in.close()
+        shm_out.close()
+
+
+def _shards_por_ticker(tickers, n_shards):
+    # Hash estável do Ticker (mesmo shard em qualquer processo/execução)
+    hashes = pd.util.hash_array(tickers.fillna("").to_numpy(dtype=object))
+    return (hashes % np.uint64(n_shards)).astype(np.int64)
+
+
+def calcular_indicadores_paralelo(df, indicadores=None, workers=None, shards=None):
+    """Mesmo resultado de calcular_indicadores, calculado em `workers` processos.
+
+    `shards` (padrão: 4 × workers) controla a granularidade da divisão. Indicadores
+    registrados em tempo de execução só chegam aos workers com start method "fork".
+    """
+    workers = workers or os.cpu_count() or 1
+    alvos = indicadores_publicos() if indicadores is None else list(indicadores)
+    if workers <= 1 or len(df) == 0:
+        return calcular_indicadores(df, alvos)
+
+    df = df.sort_values(["Ticker", "Ano"]).reset_index(drop=True)
+    shards = shards or workers * 4
+
+    # Ticker vira código numérico (ordem preservada; NaN continua NaN) para caber no bloco float64
+    codigos, _ = pd.factorize(df["Ticker"], sort=True)
+    codigo_ticker = np.where(codigos >= 0, codigos, np.nan).astype(np.float64)
+    numericas = sorted(colunas_necessarias(alvos) - {"Ticker"})
+    colunas = ["Ticker"] + numericas
+
+    # Linhas agrupadas por shard (estável: dentro do shard segue a ordem Ticker/Ano)
+    shard = _shards_por_ticker(df["Ticker"], shards)
+    permutacao = np.argsort(shard, kind="stable")
+    limites = np.searchsorted(shard[permutacao], np.arange(shards + 1))
+
+    n = len(df)
+    shm_in = shared_memory.SharedMemory(create=True, size=max(n * len(colunas) * 8, 1))
+    shm_out = shared_memory.SharedMemory(create=True, size=max(n * len(alvos) * 8, 1))
+    try:
+        bloco_in = np.ndarray((n, len(colunas)), dtype=np.float64, buffer=shm_in.buf)
+        bloco_in[:, 0] = codigo_ticker[permutacao]
+        for j, coluna in enumerate(numericas, start=1):
+            bloco_in[:, j] = df[coluna].to_numpy(dtype=np.float64)[permutacao]
+
+        entrada = (shm_in.name, (n, len(colunas)))
+        saida = (shm_out.name, (n, len(alvos)))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            tarefas = [
+                executor.submit(_calcular_shard, entrada, saida, colunas, alvos, inicio, fim)
+                for inicio, fim in zip(limites[:-1], limites[1:]) if fim > inicio
+            ]
+            for tarefa in tarefas:
+                tarefa.result()
+
+        bloco_out = np.ndarray((n, len(alvos)), dtype=np.float64, buffer=shm_out.buf)
+        valores = np.empty((n, len(alvos)), dtype=np.float64)
+        valores[permutacao] = bloco_out
+        del bloco_in, bloco_out
+    finally:
+        shm_in.close()
+        shm_in.unlink()
+        shm_out.close()
+        shm_out.unlink()
+
+    # Tipos de saída (ex.: Alavancagem Eficaz é bool) vêm de uma execução sobre zero linhas
+    tipos = calcular_indicadores(df.iloc[:0], alvos)[alvos].dtypes
+    saida_df = pd.DataFrame(
+        {nome: valores[:, j].astype(tipos[nome]) for j, nome in enumerate(alvos)}, index=df.index
+    )
+    return pd.concat([df, saida_df], axis=1)
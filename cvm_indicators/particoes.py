@@ -0,0 +1,140 @@
+# ==============================================================
+# 🗂️ ARMAZENAMENTO PARTICIONADO POR ANO E SETOR (Parquet / hive)
+# ==============================================================
+# Layout: <destino>/Ano=2024/SETOR_ATIV=Energia%20Elétrica/part-0.parquet
+# Os filtros da sidebar (Ano, Setor, Ticker) são empurrados para a leitura:
+# só as partições/linhas do recorte são lidas, então a memória acompanha
+# o recorte visualizado, não o histórico inteiro.
+import json
+import os
+import shutil
+from urllib.parse import unquote
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from .indicadores import INDICADORES
+
+CHAVES_PARTICAO = ["Ano", "SETOR_ATIV"]
+ESQUEMA_PARTICAO = pa.schema([("Ano", pa.int64()), ("SETOR_ATIV", pa.string())])
+ARQUIVO_COLUNAS = "_colunas.json"
+NULO_HIVE = "__HIVE_DEFAULT_PARTITION__"
+
+
+def _particionamento():
+    return ds.partitioning(ESQUEMA_PARTICAO, flavor="hive")
+
+
+def escrever_particoes(df, destino):
+    """Grava `df` particionado por Ano e SETOR_ATIV (troca atômica do diretório)."""
+    tmp = f"{destino}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    tabela = tabela.cast(tabela.schema.set(
+        tabela.schema.get_field_index("SETOR_ATIV"), pa.field("SETOR_ATIV", pa.string())
+    ))
+    ds.write_dataset(
+        tabela, tmp, format="parquet", partitioning=_particionamento(),
+        basename_template="part-{i}.parquet", existing_data_behavior="error",
+    )
+    with open(os.path.join(tmp, ARQUIVO_COLUNAS), "w", encoding="utf-8") as f:
+        json.dump(list(df.columns), f, ensure_ascii=False)
+
+    antigo = f"{destino}.old-{os.getpid()}"
+    if os.path.exists(destino):
+        os.replace(destino, antigo)
+    os.replace(tmp, destino)
+    shutil.rmtree(antigo, ignore_errors=True)
+
+
+def colunas(destino):
+    with open(os.path.join(destino, ARQUIVO_COLUNAS), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _valores_diretorio(caminho, chave):
+    prefixo = f"{chave}="
+    return [
+        unquote(nome[len(prefixo):]) for nome in os.listdir(caminho)
+        if nome.startswith(prefixo) and os.path.isdir(os.path.join(caminho, nome))
+    ]
+
+
+def anos_disponiveis(destino):
+    """Anos presentes, lidos só dos nomes dos diretórios."""
+    return sorted(int(a) for a in _valores_diretorio(destino, "Ano"))
+
+
+def setores_disponiveis(destino, ano=None):
+    """Setores (não nulos) presentes, em todos os anos ou num ano, sem ler dados."""
+    anos = anos_disponiveis(destino) if ano is None else [ano]
+    setores = set()
+    for a in anos:
+        caminho = os.path.join(destino, f"Ano={a}")
+        if os.path.isdir(caminho):
+            setores.update(_valores_diretorio(caminho, "SETOR_ATIV"))
+    setores.discard(NULO_HIVE)
+    return sorted(setores)
+
+
+def expressao_filtro(ano=None, setor=None, ticker=None):
+    # Escalar -> igualdade; lista/tupla/conjunto -> isin
+    filtro = None
+    for campo, valor in (("Ano", ano), ("SETOR_ATIV", setor), ("Ticker", ticker)):
+        if valor is None:
+            continue
+        if isinstance(valor, (list, tuple, set, range)):
+            # Lista vazia: isin([]) não tem tipo no Arrow, então vira um filtro sempre falso
+            expr = ds.field(campo).isin(list(valor)) if len(valor) else ds.scalar(False)
+        else:
+            expr = ds.field(campo) == valor
+        filtro = expr if filtro is None else filtro & expr
+    return filtro
+
+
+def _colunas_lidas(ordem, colunas_lidas=None, indicadores=None):
+    if indicadores is not None:
+        ordem = [c for c in ordem if c not in INDICADORES or c in indicadores]
+    if colunas_lidas is not None:
+        pedidas = set(colunas_lidas) | {"Ticker", "Ano"}
+        ordem = [c for c in ordem if c in pedidas]
+    return ordem
+
+
+def _dataset(destino):
+    return ds.dataset(destino, format="parquet", partitioning=_particionamento())
+
+
+def ler_particoes(destino, ano=None, setor=None, ticker=None, colunas_lidas=None, indicadores=None):
+    """Lê só o recorte pedido (filtros empurrados para o dataset), ordenado por Ticker/Ano.
+
+    colunas_lidas projeta colunas quaisquer; indicadores mantém as colunas da
+    planilha e só os indicadores pedidos (como snapshot.carregar).
+    """
+    tabela = _dataset(destino).to_table(
+        columns=_colunas_lidas(colunas(destino), colunas_lidas, indicadores),
+        filter=expressao_filtro(ano, setor, ticker),
+    )
+    return tabela.to_pandas().sort_values(["Ticker", "Ano"]).reset_index(drop=True)
+
+
+def lotes_dataset(dataset, ano=None, setor=None, ticker=None, colunas_lidas=None, tamanho_lote=65_536,
+                  ordem=None):
+    """(esquema, gerador de RecordBatch) do recorte de um dataset Arrow, sem materializá-lo.
+
+    Mesmos filtros e projeção de ler_particoes; os lotes saem na ordem do
+    dataset, não ordenados por Ticker.
+    """
+    ordem = _colunas_lidas(ordem or dataset.schema.names, colunas_lidas)
+    scanner = dataset.scanner(
+        columns=ordem, filter=expressao_filtro(ano, setor, ticker), batch_size=tamanho_lote
+    )
+    # Metadados pandas do arquivo descrevem todas as colunas: não valem para a projeção
+    lotes = (lote.replace_schema_metadata(None) for lote in scanner.to_batches() if lote.num_rows)
+    return scanner.projected_schema.remove_metadata(), lotes
+
+
+def lotes_particoes(destino, ano=None, setor=None, ticker=None, colunas_lidas=None, tamanho_lote=65_536):
+    """lotes_dataset sobre as partições (lotes na ordem Ano, Setor)."""
+    return lotes_dataset(_dataset(destino), ano, setor, ticker, colunas_lidas, tamanho_lote, colunas(destino))
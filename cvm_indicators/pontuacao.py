@@ -0,0 +1,72 @@
+# ==============================================================
+# 🏅 PONTUAÇÃO RELATIVA: PERCENTIL E Z-SCORE ROBUSTO ENTRE PARES
+# ==============================================================
+# Para cada (Ticker, Ano) e indicador: percentil e z-score robusto
+# (mediana/MAD) dentro do setor no ano e dentro do mercado no ano, mais
+# um score composto (média dos percentis, 0-100). Tudo orientado para
+# "maior = melhor": custos de capital e endividamento entram com o sinal
+# trocado. Montado em poucos groupby vetorizados sobre o frame inteiro e
+# gravado junto do snapshot; as telas leem o resultado pronto.
+import numpy as np
+import pandas as pd
+
+# Indicador -> sentido (+1: maior é melhor; -1: menor é melhor)
+SENTIDO = {
+    "ROE": 1, "ROA": 1, "ROI": 1, "ROI EBITDA": 1,
+    "Margem Bruta": 1, "Margem Operacional": 1, "Margem Líquida": 1,
+    "ki": -1, "ke": -1, "wacc": -1,
+    "Percentual Capital Terceiros": -1,
+}
+INDICADORES_PONTUACAO = list(SENTIDO)
+
+GRUPOS = {"setor": ["Ano", "SETOR_ATIV"], "mercado": ["Ano"]}
+MEDIDAS = ["percentil", "z"]
+
+# Score composto só com pelo menos metade dos indicadores disponíveis
+MINIMO_INDICADORES = len(INDICADORES_PONTUACAO) // 2 + 1
+# MAD -> desvio padrão sob normalidade
+ESCALA_MAD = 1.4826
+
+
+def coluna(indicador, medida, grupo):
+    """Nome da coluna, ex.: coluna("ROE", "percentil", "setor") -> "ROE (percentil setor)"."""
+    return f"{indicador} ({medida} {grupo})"
+
+
+def coluna_score(grupo):
+    return f"Score {grupo}"
+
+
+def calcular_pontuacao(df, indicadores=None):
+    """Frame (Ticker, Ano, SETOR_ATIV) com percentis, z-scores e scores compostos.
+
+    Percentis em (0, 1], z-scores e scores orientados para maior = melhor.
+    Linhas sem setor só recebem as medidas de mercado. Valores infinitos
+    são tratados como ausentes.
+    """
+    indicadores = [c for c in (indicadores or INDICADORES_PONTUACAO) if c in df.columns]
+    sentido = pd.Series({c: SENTIDO.get(c, 1) for c in indicadores}, dtype=np.float64)
+    valores = df[indicadores].astype(np.float64).replace([np.inf, -np.inf], np.nan) * sentido
+
+    partes = [df[["Ticker", "Ano", "SETOR_ATIV"]]]
+    for grupo, chaves in GRUPOS.items():
+        por_grupo = [df[c] for c in chaves]
+        grupos = valores.groupby(por_grupo, observed=True, sort=False)
+
+        percentis = grupos.rank(pct=True)
+        mediana = grupos.transform("median")
+        desvio = valores - mediana
+        mad = desvio.abs().groupby(por_grupo, observed=True, sort=False).transform("median")
+        z = desvio / (ESCALA_MAD * mad.where(mad > 0))
+
+        pares = df["Ticker"].groupby(por_grupo, observed=True, sort=False).transform("size")
+        disponiveis = percentis.notna().sum(axis=1)
+        score = (percentis.mean(axis=1) * 100).where(disponiveis >= min(MINIMO_INDICADORES, len(indicadores)))
+
+        partes += [
+            pares.rename(f"Empresas {grupo}"),
+            score.rename(coluna_score(grupo)),
+            percentis.rename(columns=lambda c: coluna(c, "percentil", grupo)),
+            z.rename(columns=lambda c: coluna(c, "z", grupo)),
+        ]
+    return pd.concat(partes, axis=1).reset_index(drop=True)
@@ -0,0 +1,138 @@
+# ==============================================================
+# 🩺 QUALIDADE DOS DADOS: REGRAS DE CONSISTÊNCIA VETORIZADAS
+# ==============================================================
+# Cada regra roda sobre o frame inteiro (planilha + indicadores) e marca
+# as linhas com problema, com um valor numérico que explica a marcação
+# (diferença, lacuna em anos, valor com sinal inesperado...). O resultado
+# é uma tabela compacta só com as ocorrências (Ticker, Ano, Regra,
+# Severidade, Valor), gravada junto do snapshot a cada atualização.
+# Regras cujas colunas não estão no frame são puladas.
+import numpy as np
+import pandas as pd
+
+from .indicadores import PL
+
+# Tolerâncias: mesma regra da verificação da Visão por Empresa (0,1% do maior valor)
+TOLERANCIA_LUCRO_ECONOMICO = 0.001
+# Balanço: 0,1% do Ativo Total ou R$ 1, o que for maior
+TOLERANCIA_BALANCO = 0.001
+TOLERANCIA_BALANCO_ABSOLUTA = 1.0
+
+SEVERIDADES = ["erro", "aviso"]
+COLUNAS = ["Ticker", "Ano", "SETOR_ATIV", "Regra", "Severidade", "Valor"]
+
+# Nome -> (severidade, descrição, colunas necessárias, função)
+REGRAS = {}
+
+
+def regra(nome, severidade, descricao, *colunas):
+    """Registra uma regra: a função recebe o frame e devolve (máscara, valor) por linha."""
+    def registrar(func):
+        REGRAS[nome] = (severidade, descricao, list(colunas), func)
+        return func
+    return registrar
+
+
+def _valores(df, coluna):
+    return df[coluna].to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+@regra("Lucro Econômico 1 ≠ 2", "erro",
+       "Lucro Econômico 1 e 2 diferem mais que 0,1% do maior (Valor: diferença em R$)",
+       "Lucro Econômico 1", "Lucro Econômico 2")
+def _lucro_economico(df):
+    le1, le2 = _valores(df, "Lucro Econômico 1"), _valores(df, "Lucro Econômico 2")
+    diferenca = np.abs(le1 - le2)
+    with np.errstate(invalid="ignore"):
+        return diferenca > TOLERANCIA_LUCRO_ECONOMICO * np.maximum(np.abs(le1), np.abs(le2)), diferenca
+
+
+@regra("Balanço não fecha", "erro",
+       "Ativo Total ≠ Passivo Circulante + Passivo Não Circulante + PL (Valor: Ativo - soma, em R$)",
+       "Ativo Total", "Passivo Circulante", "Passivo Não Circulante", PL)
+def _balanco(df):
+    ativo = _valores(df, "Ativo Total")
+    diferenca = ativo - (_valores(df, "Passivo Circulante") + _valores(df, "Passivo Não Circulante") + _valores(df, PL))
+    limite = np.maximum(TOLERANCIA_BALANCO * np.abs(ativo), TOLERANCIA_BALANCO_ABSOLUTA)
+    with np.errstate(invalid="ignore"):
+        return np.abs(diferenca) > limite, diferenca
+
+
+@regra("Ano anterior ausente", "aviso",
+       "Anos faltando antes desta linha: as médias com t-1 usam um ano não consecutivo (Valor: anos faltando)",
+       "Ticker", "Ano")
+def _ano_anterior(df):
+    codigos, _ = pd.factorize(df["Ticker"])
+    anos = _valores(df, "Ano")
+    ordem = np.lexsort((anos, codigos))
+    lacuna = np.zeros(len(df))
+    # Linha anterior do mesmo Ticker na ordem (Ticker, Ano), como nas defasagens
+    mesmo = (codigos[ordem][1:] == codigos[ordem][:-1]) & (codigos[ordem][1:] >= 0)
+    lacuna[ordem[1:]] = np.where(mesmo, anos[ordem][1:] - anos[ordem][:-1] - 1, 0)
+    return lacuna > 0, lacuna
+
+
+@regra("(Ticker, Ano) duplicado", "erro",
+       "Mais de uma linha para o mesmo Ticker e Ano (Valor: linhas com a chave)",
+       "Ticker", "Ano")
+def _duplicado(df):
+    repeticoes = df.groupby(["Ticker", "Ano"], observed=True, sort=False, dropna=False)["Ano"].transform("size")
+    repeticoes = repeticoes.to_numpy(dtype=np.float64)
+    return repeticoes > 1, repeticoes
+
+
+@regra("Despesas Financeiras positivas", "aviso",
+       "Despesas Financeiras com sinal positivo; o padrão da DFP é negativo (Valor: valor informado)",
+       "Despesas Financeiras")
+def _sinal_despesas_financeiras(df):
+    valores = _valores(df, "Despesas Financeiras")
+    with np.errstate(invalid="ignore"):
+        return valores > 0, valores
+
+
+@regra("Dividendos positivos", "aviso",
+       "Pagamento de Dividendos com sinal positivo; saída de caixa é negativa (Valor: valor informado)",
+       "Pagamento de Dividendos")
+def _sinal_dividendos(df):
+    valores = _valores(df, "Pagamento de Dividendos")
+    with np.errstate(invalid="ignore"):
+        return valores > 0, valores
+
+
+def verificar_qualidade(df, regras=None):
+    """Tabela de ocorrências (Ticker, Ano, SETOR_ATIV, Regra, Severidade, Valor), uma linha por problema.
+
+    Regra e Severidade são category (com todas as regras/severidades como
+    categorias, mesmo sem ocorrências).
+    """
+    nomes = list(REGRAS) if regras is None else list(regras)
+    chaves = df[["Ticker", "Ano", "SETOR_ATIV"]].reset_index(drop=True)
+    partes = []
+    for nome in nomes:
+        severidade, _, colunas, func = REGRAS[nome]
+        if any(c not in df.columns for c in colunas):
+            continue
+        mascara, valor = func(df)
+        linhas = np.flatnonzero(mascara)
+        partes.append(chaves.iloc[linhas].assign(Regra=nome, Severidade=severidade, Valor=np.asarray(valor)[linhas]))
+
+    problemas = pd.concat(partes, ignore_index=True) if partes else chaves.iloc[:0].assign(
+        Regra=pd.Series(dtype=object), Severidade=pd.Series(dtype=object), Valor=pd.Series(dtype=np.float64)
+    )
+    return problemas.astype({
+        "Regra": pd.CategoricalDtype(list(REGRAS)),
+        "Severidade": pd.CategoricalDtype(SEVERIDADES),
+        "Valor": np.float64,
+    })[COLUNAS]
+
+
+def resumo_qualidade(problemas):
+    """Uma linha por regra (todas): severidade, descrição, ocorrências e tickers afetados."""
+    por_regra = problemas.groupby("Regra", observed=False)
+    return pd.DataFrame({
+        "Regra": list(REGRAS),
+        "Severidade": [REGRAS[n][0] for n in REGRAS],
+        "Descrição": [REGRAS[n][1] for n in REGRAS],
+        "Ocorrências": por_regra.size().reindex(list(REGRAS), fill_value=0).to_numpy(),
+        "Empresas": por_regra["Ticker"].nunique().reindex(list(REGRAS), fill_value=0).to_numpy(),
+    })
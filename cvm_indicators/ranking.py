@@ -0,0 +1,79 @@
+# ==============================================================
+# 🏆 ÍNDICE DE RANKING POR ANO (e opcionalmente por setor)
+# ==============================================================
+# Montado uma vez por versão dos dados: para cada ranking guarda as
+# posições das linhas já ordenadas por (Ano, valor) nas duas direções.
+# Um Top-N vira busca binária do ano + fatia de N posições, em vez de
+# filtrar o ano, aplicar notna() e nlargest/nsmallest a cada rerun.
+import numpy as np
+import pandas as pd
+
+from .instrumentacao import secao
+
+
+class IndiceRanking:
+    """Rankings pré-ordenados sobre `df`.
+
+    `rankings` mapeia nome -> (coluna de ordenação, colunas que precisam
+    estar preenchidas). Empates seguem a ordem das linhas, como em
+    nlargest/nsmallest(keep="first").
+    """
+
+    def __init__(self, df, rankings, por_setor=False):
+        self.df = df
+        self.rankings = dict(rankings)
+        anos = df["Ano"].to_numpy(dtype=np.int64)
+
+        self.setores = None
+        if por_setor:
+            codigos, self.setores = pd.factorize(df["SETOR_ATIV"])
+            self._mapa_setor = {setor: i for i, setor in enumerate(self.setores)}
+
+        self._ordens = {}
+        for nome, (coluna, obrigatorias) in self.rankings.items():
+            valores = df[coluna].to_numpy(dtype=np.float64)
+            valido = ~np.isnan(valores)
+            for extra in obrigatorias:
+                valido &= df[extra].notna().to_numpy()
+            linhas = np.flatnonzero(valido)
+
+            for ascendente in (False, True):
+                chave_valor = valores[linhas] if ascendente else -valores[linhas]
+                # lexsort é estável: a última chave é a primária
+                ordem = linhas[np.lexsort((chave_valor, anos[linhas]))]
+                self._ordens[(nome, ascendente, False)] = (ordem, anos[ordem])
+
+                if por_setor:
+                    com_setor = linhas[codigos[linhas] >= 0]
+                    chave_valor = valores[com_setor] if ascendente else -valores[com_setor]
+                    chave_grupo = anos[com_setor] * len(self.setores) + codigos[com_setor]
+                    ordem = com_setor[np.lexsort((chave_valor, chave_grupo))]
+                    self._ordens[(nome, ascendente, True)] = (
+                        ordem, anos[ordem] * len(self.setores) + codigos[ordem]
+                    )
+
+    def posicoes(self, ano, nome, n=None, ascendente=False, setor=None):
+        """Posições (iloc) das n primeiras linhas do ranking no ano (e setor)."""
+        if setor is None:
+            ordem, chaves = self._ordens[(nome, ascendente, False)]
+            alvo = ano
+        else:
+            if self.setores is None:
+                raise ValueError("Índice montado sem por_setor=True")
+            if setor not in self._mapa_setor:
+                return np.array([], dtype=np.intp)
+            ordem, chaves = self._ordens[(nome, ascendente, True)]
+            # int(): um ano int16 (frame compactado) estouraria na chave (ano, setor)
+            alvo = int(ano) * len(self.setores) + self._mapa_setor[setor]
+
+        inicio = np.searchsorted(chaves, alvo, side="left")
+        fim = np.searchsorted(chaves, alvo, side="right")
+        if n is not None:
+            fim = min(fim, inicio + n)
+        return ordem[inicio:fim]
+
+    def top(self, ano, nome, n, colunas=None, ascendente=False, setor=None):
+        """Top-N do ranking como DataFrame (equivale a filtrar o ano e usar nlargest/nsmallest)."""
+        with secao(f"ranking/{nome}"):
+            linhas = self.df.iloc[self.posicoes(ano, nome, n, ascendente, setor)]
+            return linhas if colunas is None else linhas[colunas]
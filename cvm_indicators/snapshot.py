@@ -0,0 +1,366 @@
+# ==============================================================
+# 🗄️ SNAPSHOT COLUNAR (Arrow IPC) NA FRENTE DA LEITURA DO EXCEL
+# ==============================================================
+# O snapshot guarda a planilha bruta e o frame de indicadores derivados
+# em arquivos Arrow IPC, chaveados pelo caminho, mtime e hash (SHA-256)
+# do arquivo de origem. Enquanto a planilha não muda, a leitura é feita
+# por memory-map em vez de passar pelo openpyxl. O derivado também é
+# gravado particionado por Ano/Setor (ver particoes.py), resumido no cubo
+# setorial (SETOR_ATIV, Ano) (ver cubo.py), pontuado entre pares (ver
+# pontuacao.py), resumido em janelas de 3 e 5 anos (ver janelas.py) e
+# passado pelas regras de qualidade dos dados (ver qualidade.py).
+import hashlib
+import json
+import logging
+import os
+import shutil
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.ipc as ipc
+
+from .cubo import construir_cubo
+from .fonte import ler_planilha
+from .incremental import recalcular_incremental
+from .janelas import calcular_janelas
+from .paralelo import calcular_indicadores_paralelo
+from .particoes import escrever_particoes, ler_particoes, lotes_dataset, lotes_particoes
+from .pontuacao import calcular_pontuacao
+from .qualidade import resumo_qualidade, verificar_qualidade
+
+# Incrementar quando o formato ou as fórmulas mudarem (invalida snapshots antigos)
+VERSAO_FORMATO = 6
+
+DIRETORIO_PADRAO = ".cvm_cache"
+ARTEFATOS = ("bruto", "indicadores", "particoes", "cubo", "pontuacao", "janelas", "qualidade")
+MANIFESTO = "manifesto.json"
+
+logger = logging.getLogger(__name__)
+
+
+def diretorio_cache(data_path, diretorio=None):
+    """Diretório do snapshot: argumento, $CVM_CACHE_DIR ou .cvm_cache/ ao lado da planilha."""
+    if diretorio:
+        return diretorio
+    if os.environ.get("CVM_CACHE_DIR"):
+        return os.environ["CVM_CACHE_DIR"]
+    return os.path.join(os.path.dirname(os.path.abspath(data_path)), DIRETORIO_PADRAO)
+
+
+def hash_arquivo(path, tamanho_bloco=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _ler_manifesto(diretorio):
+    try:
+        with open(os.path.join(diretorio, MANIFESTO), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _escrever_atomico(destino, escrever):
+    # Escreve em arquivo temporário e troca com os.replace (nunca deixa arquivo pela metade)
+    tmp = f"{destino}.tmp-{os.getpid()}"
+    try:
+        escrever(tmp)
+        os.replace(tmp, destino)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def escrever_tabela(df, destino):
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+
+    def _escrever(tmp):
+        with pa.OSFile(tmp, "wb") as sink, ipc.new_file(sink, tabela.schema) as writer:
+            writer.write_table(tabela)
+
+    _escrever_atomico(destino, _escrever)
+
+
+def ler_tabela(path, colunas=None):
+    """Lê um arquivo Arrow IPC via memory-map e devolve um DataFrame (só as colunas pedidas)."""
+    with pa.memory_map(path, "r") as source:
+        tabela = ipc.open_file(source).read_all()
+        if colunas is not None:
+            tabela = tabela.select([c for c in tabela.column_names if c in colunas])
+        return tabela.to_pandas()
+
+
+def snapshot_valido(data_path, diretorio=None):
+    """Retorna o manifesto se o snapshot corresponder à planilha atual, senão None.
+
+    Caminho + mtime + tamanho iguais bastam; se só o mtime mudou (ex.: cópia
+    ou checkout), o hash do conteúdo decide e o manifesto é atualizado.
+    """
+    diretorio = diretorio_cache(data_path, diretorio)
+    manifesto = _ler_manifesto(diretorio)
+    if not manifesto or manifesto.get("versao") != VERSAO_FORMATO:
+        return None
+    if manifesto.get("caminho") != os.path.abspath(data_path):
+        return None
+    if not all(os.path.exists(os.path.join(diretorio, manifesto[k])) for k in ARTEFATOS):
+        return None
+
+    stat = os.stat(data_path)
+    if stat.st_size != manifesto.get("tamanho"):
+        return None
+    if stat.st_mtime_ns == manifesto.get("mtime_ns"):
+        return manifesto
+
+    if hash_arquivo(data_path) != manifesto.get("sha256"):
+        return None
+    manifesto["mtime_ns"] = stat.st_mtime_ns
+    _gravar_manifesto(diretorio, manifesto)
+    return manifesto
+
+
+def _gravar_manifesto(diretorio, manifesto):
+    def _escrever(tmp):
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifesto, f, ensure_ascii=False, indent=2)
+
+    _escrever_atomico(os.path.join(diretorio, MANIFESTO), _escrever)
+
+
+def _carregar_anterior(diretorio, manifesto):
+    # (bruto, derivado) do snapshot anterior, se ainda for do formato atual
+    if not manifesto or manifesto.get("versao") != VERSAO_FORMATO:
+        return None
+    caminhos = [os.path.join(diretorio, manifesto.get(k, "")) for k in ("bruto", "indicadores")]
+    if not all(os.path.isfile(c) for c in caminhos):
+        return None
+    return ler_tabela(caminhos[0]), ler_tabela(caminhos[1])
+
+
+def descartar_sem_chave(bruto):
+    """(frame, descartadas): tira as linhas sem Ticker ou Ano, que não têm lugar nas
+    partições nem nas listas do app (a planilha original já as ignorava)."""
+    sem_chave = bruto["Ticker"].isna() | bruto["Ano"].isna()
+    descartadas = int(sem_chave.sum())
+    if descartadas:
+        logger.warning("%d linha(s) da planilha sem Ticker ou Ano descartada(s)", descartadas)
+        bruto = bruto[~sem_chave].reset_index(drop=True)
+    return bruto, descartadas
+
+
+def construir_snapshot(data_path, diretorio=None, incremental=True, workers=1, validar=None,
+                       remover_anterior=False):
+    """Lê a planilha, calcula os indicadores e persiste ambos. Retorna (bruto, derivado).
+
+    Com incremental=True e um snapshot anterior disponível, só as linhas
+    (Ticker, Ano) novas/alteradas e os anos que dependem delas são recalculados.
+    workers > 1 distribui o recálculo completo entre processos.
+    validar(bruto, derivado) roda antes da troca do manifesto: se levantar, o
+    snapshot servido continua o anterior. Os arquivos da versão anterior ficam
+    em disco (um app em execução pode ainda servi-la); remover_anterior=True os
+    apaga depois da troca, só quando ninguém mais lê a versão anterior.
+    """
+    diretorio = diretorio_cache(data_path, diretorio)
+    os.makedirs(diretorio, exist_ok=True)
+
+    stat = os.stat(data_path)
+    sha256 = hash_arquivo(data_path)
+    bruto, sem_chave = descartar_sem_chave(ler_planilha(data_path))
+
+    anterior = _ler_manifesto(diretorio)
+    base = _carregar_anterior(diretorio, anterior) if incremental else None
+    if base is not None:
+        derivado, estatisticas = recalcular_incremental(base[0], base[1], bruto)
+    else:
+        derivado = calcular_indicadores_paralelo(bruto, workers=workers)
+        estatisticas = {"linhas": len(derivado), "recalculadas": len(derivado), "completo": True}
+
+    # Nomes com o hash: um manifesto antigo nunca aponta para arquivos novos pela metade
+    arquivo_bruto = f"bruto-{sha256[:16]}.arrow"
+    arquivo_indicadores = f"indicadores-{sha256[:16]}.arrow"
+    diretorio_particoes = f"particoes-{sha256[:16]}"
+    arquivo_cubo = f"cubo-{sha256[:16]}.arrow"
+    arquivo_pontuacao = f"pontuacao-{sha256[:16]}.arrow"
+    arquivo_janelas = f"janelas-{sha256[:16]}.arrow"
+    arquivo_qualidade = f"qualidade-{sha256[:16]}.arrow"
+    problemas = verificar_qualidade(derivado)
+    resumo = resumo_qualidade(problemas)
+    novo = {
+        "versao": VERSAO_FORMATO,
+        "caminho": os.path.abspath(data_path),
+        "mtime_ns": stat.st_mtime_ns,
+        "tamanho": stat.st_size,
+        "sha256": sha256,
+        "bruto": arquivo_bruto,
+        "indicadores": arquivo_indicadores,
+        "particoes": diretorio_particoes,
+        "cubo": arquivo_cubo,
+        "pontuacao": arquivo_pontuacao,
+        "janelas": arquivo_janelas,
+        "qualidade": arquivo_qualidade,
+        "ultima_atualizacao": estatisticas,
+        "linhas_sem_chave": sem_chave,
+        "resumo_qualidade": dict(zip(resumo["Regra"], resumo["Ocorrências"].tolist())),
+    }
+    try:
+        if validar is not None:
+            validar(bruto, derivado)
+        escrever_tabela(bruto, os.path.join(diretorio, arquivo_bruto))
+        escrever_tabela(derivado, os.path.join(diretorio, arquivo_indicadores))
+        escrever_particoes(derivado, os.path.join(diretorio, diretorio_particoes))
+        escrever_tabela(construir_cubo(derivado), os.path.join(diretorio, arquivo_cubo))
+        escrever_tabela(calcular_pontuacao(derivado), os.path.join(diretorio, arquivo_pontuacao))
+        escrever_tabela(calcular_janelas(derivado), os.path.join(diretorio, arquivo_janelas))
+        escrever_tabela(problemas, os.path.join(diretorio, arquivo_qualidade))
+    except BaseException:
+        # Falha antes da troca: descarta só o que não pertence ao snapshot servido
+        remover_artefatos(diretorio, novo, manter=anterior)
+        raise
+
+    # A troca de versão é a escrita (atômica) do manifesto
+    _gravar_manifesto(diretorio, novo)
+
+    if remover_anterior and anterior:
+        remover_artefatos(diretorio, anterior, manter=novo)
+
+    return bruto, derivado
+
+
+def remover_artefatos(diretorio, manifesto, manter=None):
+    """Apaga os arquivos de um snapshot, exceto os que também pertencem a `manter`."""
+    preservar = {(manter or {}).get(k) for k in ARTEFATOS}
+    for chave in ARTEFATOS:
+        nome = manifesto.get(chave)
+        if not nome or nome in preservar:
+            continue
+        caminho = os.path.join(diretorio, nome)
+        if os.path.isdir(caminho):
+            shutil.rmtree(caminho, ignore_errors=True)
+        elif os.path.exists(caminho):
+            os.remove(caminho)
+
+
+def garantir_snapshot(data_path, diretorio=None):
+    """Manifesto de um snapshot válido para a planilha, construindo-o se necessário."""
+    manifesto = snapshot_valido(data_path, diretorio)
+    if manifesto is None:
+        construir_snapshot(data_path, diretorio)
+        manifesto = snapshot_valido(data_path, diretorio)
+    return manifesto
+
+
+def diretorio_particoes(data_path, diretorio=None):
+    """Caminho do armazenamento particionado (Ano/Setor) atualizado para a planilha."""
+    manifesto = garantir_snapshot(data_path, diretorio)
+    return os.path.join(diretorio_cache(data_path, diretorio), manifesto["particoes"])
+
+
+def _artefato_das_particoes(caminho_particoes, chave):
+    # Outro artefato do mesmo snapshot das partições (o manifesto fica no diretório pai)
+    diretorio = os.path.dirname(os.path.abspath(caminho_particoes))
+    manifesto = _ler_manifesto(diretorio)
+    if manifesto and manifesto.get("particoes") == os.path.basename(os.path.normpath(caminho_particoes)):
+        caminho = os.path.join(diretorio, manifesto.get(chave, ""))
+        if os.path.isfile(caminho):
+            return caminho
+    return None
+
+
+def ler_cubo(caminho_particoes):
+    """Cubo setorial do mesmo snapshot das partições.
+
+    Partições sem cubo no manifesto (ex.: montadas à mão) têm o cubo agregado na hora.
+    """
+    caminho = _artefato_das_particoes(caminho_particoes, "cubo")
+    if caminho is not None:
+        return ler_tabela(caminho)
+    return construir_cubo(ler_particoes(caminho_particoes))
+
+
+def ler_pontuacao(caminho_particoes):
+    """Percentis, z-scores e scores por (Ticker, Ano) do mesmo snapshot das partições.
+
+    Sem o artefato no manifesto, calcula na hora a partir das partições.
+    """
+    caminho = _artefato_das_particoes(caminho_particoes, "pontuacao")
+    if caminho is not None:
+        return ler_tabela(caminho)
+    return calcular_pontuacao(ler_particoes(caminho_particoes))
+
+
+def ler_janelas(caminho_particoes):
+    """Médias móveis, CAGR e tendências de 3/5 anos por (Ticker, Ano) do mesmo snapshot das partições.
+
+    Sem o artefato no manifesto, calcula na hora a partir das partições.
+    """
+    caminho = _artefato_das_particoes(caminho_particoes, "janelas")
+    if caminho is not None:
+        return ler_tabela(caminho)
+    return calcular_janelas(ler_particoes(caminho_particoes))
+
+
+def ler_qualidade(caminho_particoes):
+    """Ocorrências das regras de qualidade (ver qualidade.py) do mesmo snapshot das partições.
+
+    Sem o artefato no manifesto, verifica na hora a partir das partições.
+    """
+    caminho = _artefato_das_particoes(caminho_particoes, "qualidade")
+    if caminho is not None:
+        return ler_tabela(caminho)
+    return verificar_qualidade(ler_particoes(caminho_particoes))
+
+
+def ler_indicadores(caminho_particoes, colunas=None, ano=None, ticker=None):
+    """Frame de indicadores do mesmo snapshot das partições (memory-map do IPC).
+
+    ano/ticker filtram como em ler_particoes: só o recorte é materializado.
+    Sem o IPC no manifesto, lê das partições.
+    """
+    caminho = _artefato_das_particoes(caminho_particoes, "indicadores")
+    if caminho is None:
+        return ler_particoes(caminho_particoes, ano=ano, ticker=ticker, colunas_lidas=colunas)
+    if ano is None and ticker is None:
+        return ler_tabela(caminho, colunas)
+    esquema, lotes = lotes_dataset(ds.dataset(caminho, format="ipc"), ano, ticker=ticker, colunas_lidas=colunas)
+    return pa.Table.from_batches(list(lotes), schema=esquema).to_pandas()
+
+
+def lotes_indicadores(caminho_particoes, ano=None, setor=None, ticker=None, colunas_lidas=None,
+                      tamanho_lote=65_536):
+    """(esquema, lotes) do recorte lidos do Arrow IPC do snapshot (um arquivo, memory-map).
+
+    Varrer centenas de arquivos de partição custa muito mais que filtrar o IPC
+    quando o recorte é grande; sem o IPC no manifesto, lê das partições.
+    """
+    caminho = _artefato_das_particoes(caminho_particoes, "indicadores")
+    if caminho is None:
+        return lotes_particoes(caminho_particoes, ano, setor, ticker, colunas_lidas, tamanho_lote)
+    return lotes_dataset(ds.dataset(caminho, format="ipc"), ano, setor, ticker, colunas_lidas, tamanho_lote)
+
+
+def carregar(data_path, diretorio=None, bruto=False, indicadores=None):
+    """Frame de indicadores (ou a planilha bruta, se bruto=True), usando o snapshot quando válido.
+
+    indicadores restringe o frame às colunas da planilha mais os indicadores pedidos.
+    """
+    diretorio = diretorio_cache(data_path, diretorio)
+    manifesto = snapshot_valido(data_path, diretorio)
+    if manifesto is None:
+        df_bruto, derivado = construir_snapshot(data_path, diretorio)
+        if bruto:
+            return df_bruto
+        if indicadores is not None:
+            derivado = derivado[list(df_bruto.columns) + list(indicadores)]
+        return derivado
+
+    colunas = None
+    if indicadores is not None and not bruto:
+        colunas = set(_ler_colunas(os.path.join(diretorio, manifesto["bruto"]))) | set(indicadores)
+    return ler_tabela(os.path.join(diretorio, manifesto["bruto" if bruto else "indicadores"]), colunas)
+
+
+def _ler_colunas(path):
+    with pa.memory_map(path, "r") as source:
+        return ipc.open_file(source).schema.names
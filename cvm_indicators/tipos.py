@@ -0,0 +1,80 @@
+# ==============================================================
+# 🗜️ TIPOS COMPACTOS PARA O FRAME EM CACHE
+# ==============================================================
+# Textos repetidos (Ticker, SETOR_ATIV, cadastro) viram category, Ano e
+# CD_CVM viram inteiros pequenos e, opcionalmente, as razões (ROE, margens,
+# wacc...) ficam em float32. Valores em R$ continuam float64: somas de
+# setor em float32 perderiam precisão. O frame compacto é o que o
+# st.cache_data serializa e copia a cada sessão.
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from .indicadores import INDICADORES
+
+CATEGORICAS = ["Ticker", "SETOR_ATIV", "DENOM_CIA", "CNPJ_CIA", "Tipo_Acao", "Versao"]
+INTEIROS = {"Ano": np.int16, "CD_CVM": np.int32}
+
+# Indicadores adimensionais (razões/percentuais): candidatos a float32
+RAZOES = [
+    "ROA", "ROI", "ROE", "ROI EBITDA", "Margem Bruta", "Margem Operacional", "Margem Líquida",
+    "Percentual Capital Terceiros", "Percentual Capital Próprio", "ki", "ke", "wacc",
+]
+
+# Colunas intermediárias: só servem de entrada para outros indicadores
+AUXILIARES = [
+    "Passivo Oneroso Atual", "Passivo Oneroso Anterior",
+    "Investimento Atual", "Investimento Anterior",
+]
+
+
+def compactar(df, float32=False, remover_auxiliares=True):
+    """Cópia de `df` com tipos compactos (mesmos valores, exceto float32 nas razões).
+
+    Categorias sem uso são descartadas: um recorte só carrega as próprias.
+    """
+    colunas = [c for c in df.columns if not (remover_auxiliares and c in AUXILIARES)]
+    saida = {}
+    for coluna in colunas:
+        serie = df[coluna]
+        if coluna in CATEGORICAS:
+            serie = serie.astype("category").cat.remove_unused_categories()
+        elif coluna in INTEIROS and serie.notna().all():
+            tipo = INTEIROS[coluna]
+            limites = np.iinfo(tipo)
+            if serie.empty or (serie.min() >= limites.min and serie.max() <= limites.max):
+                serie = serie.astype(tipo)
+        elif float32 and coluna in RAZOES and coluna in INDICADORES:
+            serie = serie.astype(np.float32)
+        saida[coluna] = serie
+    return pd.DataFrame(saida, index=df.index)
+
+
+def memoria(df):
+    """Bytes do frame em memória (deep) e serializado com pickle (o que o cache_data guarda)."""
+    return {
+        "memoria_bytes": int(df.memory_usage(deep=True).sum()),
+        "pickle_bytes": len(pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL)),
+    }
+
+
+def relatorio_memoria(antes, depois):
+    """Comparação por coluna (bytes antes/depois) e totais, incluindo o tamanho serializado."""
+    uso_antes = antes.memory_usage(deep=True, index=False)
+    uso_depois = depois.memory_usage(deep=True, index=False).reindex(uso_antes.index, fill_value=0)
+    por_coluna = pd.DataFrame({
+        "tipo_antes": antes.dtypes.astype(str),
+        "tipo_depois": depois.dtypes.reindex(antes.columns).astype(str).replace("nan", "removida"),
+        "bytes_antes": uso_antes,
+        "bytes_depois": uso_depois,
+    })
+    por_coluna["reducao"] = 1 - por_coluna["bytes_depois"] / por_coluna["bytes_antes"]
+    m_antes, m_depois = memoria(antes), memoria(depois)
+    totais = {
+        **{f"{k}_antes": v for k, v in m_antes.items()},
+        **{f"{k}_depois": v for k, v in m_depois.items()},
+        "reducao_memoria": 1 - m_depois["memoria_bytes"] / m_antes["memoria_bytes"],
+        "reducao_pickle": 1 - m_depois["pickle_bytes"] / m_antes["pickle_bytes"],
+    }
+    return por_coluna.sort_values("bytes_antes", ascending=False), totais
@@ -0,0 +1,73 @@
+# ==============================================================
+# 🧪 TESTES - recortes do dataset compartilhado contra máscaras booleanas
+# ==============================================================
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.sintetico import gerar
+from cvm_indicators.compartilhado import DatasetCompartilhado
+from cvm_indicators.tipos import compactar
+
+
+@pytest.fixture(scope="module", params=[False, True], ids=["float64", "compacto"])
+def df(request):
+    df = gerar(n_tickers=50, n_anos=5, n_setores=4, seed=5)
+    df = df.sample(frac=0.9, random_state=2).reset_index(drop=True)  # anos faltando, fora de ordem
+    df.loc[df.sample(n=8, random_state=3).index, "SETOR_ATIV"] = np.nan
+    return compactar(df) if request.param else df
+
+
+@pytest.fixture(scope="module")
+def dataset(df):
+    return DatasetCompartilhado(df)
+
+
+def _esperado(df, ano=None, setor=None, ticker=None):
+    mascara = np.ones(len(df), dtype=bool)
+    for coluna, valor in (("Ano", ano), ("SETOR_ATIV", setor), ("Ticker", ticker)):
+        if valor is not None:
+            mascara &= df[coluna].isin(np.atleast_1d(valor)).to_numpy()
+    return df[mascara].sort_values(["Ticker", "Ano"]).reset_index(drop=True)
+
+
+def _recortes(df):
+    anos = sorted(df["Ano"].unique())
+    setores = sorted(df["SETOR_ATIV"].dropna().unique())
+    tickers = sorted(df["Ticker"].unique())
+    yield {}
+    for ano in anos:
+        yield {"ano": ano}
+        for setor in setores:
+            yield {"ano": ano, "setor": setor}
+    yield {"ano": anos[1:3]}
+    yield {"setor": setores[0]}
+    yield {"setor": setores[:2], "ano": anos[-1]}
+    yield {"ticker": tickers[0]}
+    yield {"ticker": tickers[:5], "ano": anos[:2]}
+    yield {"ticker": tickers[:10], "setor": setores[1]}
+    yield {"ticker": "INEXISTENTE"}
+    yield {"ano": 1900}
+
+
+def test_recorte_igual_a_mascara(df, dataset):
+    for filtros in _recortes(df):
+        pd.testing.assert_frame_equal(
+            pd.DataFrame(dataset.recorte(**filtros)), _esperado(df, **filtros), obj=str(filtros)
+        )
+
+
+def test_opcoes(df, dataset):
+    assert dataset.opcoes["anos"] == sorted(df["Ano"].unique().tolist(), reverse=True)
+    assert dataset.opcoes["setores"] == sorted(df["SETOR_ATIV"].dropna().unique())
+    assert dataset.opcoes["tickers"] == sorted(df["Ticker"].unique())
+
+
+def test_recorte_somente_leitura(df, dataset):
+    recorte = dataset.recorte(ano=df["Ano"].iloc[0])
+    with pytest.raises(ValueError):
+        recorte.loc[0, "Ativo Total"] = 0.0
+    with pytest.raises(ValueError):
+        recorte["Ativo Total"].to_numpy()[0] = 0.0
+    # Derivar com assign/copy continua permitido
+    assert recorte.assign(x=1)["x"].eq(1).all()
@@ -0,0 +1,58 @@
+# ==============================================================
+# 🧪 TESTES - recálculo incremental contra o recálculo completo
+# ==============================================================
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.sintetico import gerar
+from cvm_indicators.incremental import recalcular_incremental
+from cvm_indicators.indicadores import calcular_indicadores
+
+RECEITA = "Receita de Venda de Bens e/ou Serviços"
+
+
+@pytest.fixture(scope="module")
+def planilha():
+    return gerar(n_tickers=40, n_anos=8, n_setores=4, seed=3)
+
+
+def _ordenado(df):
+    return df.sort_values(["Ticker", "Ano"]).reset_index(drop=True)
+
+
+def _conferir(bruto_anterior, bruto_novo):
+    derivado_anterior = calcular_indicadores(bruto_anterior)
+    derivado, estatisticas = recalcular_incremental(bruto_anterior, derivado_anterior, bruto_novo)
+    pd.testing.assert_frame_equal(_ordenado(derivado), _ordenado(calcular_indicadores(bruto_novo)))
+    assert not estatisticas["completo"]
+    return estatisticas
+
+
+def test_ano_novo(planilha):
+    ultimo = planilha["Ano"].max()
+    estatisticas = _conferir(planilha[planilha["Ano"] < ultimo], planilha)
+    assert estatisticas["alteradas"] == (planilha["Ano"] == ultimo).sum()
+    assert estatisticas["recalculadas"] < len(planilha)
+
+
+def test_linhas_alteradas(planilha):
+    novo = planilha.copy()
+    linhas = np.random.default_rng(0).choice(len(novo), 15, replace=False)
+    novo.loc[linhas, RECEITA] = 12_345.0
+    novo.loc[linhas[:5], "Patrimônio Líquido Consolidado"] = np.nan
+    estatisticas = _conferir(planilha, novo)
+    assert estatisticas["alteradas"] == 15
+
+
+def test_anos_removidos(planilha):
+    # Um ano no meio da série de alguns Tickers e o primeiro ano de todos
+    tickers = planilha["Ticker"].unique()[:10]
+    meio = planilha["Ticker"].isin(tickers) & (planilha["Ano"] == planilha["Ano"].min() + 3)
+    primeiro = planilha["Ano"] == planilha["Ano"].min()
+    _conferir(planilha, planilha[~meio & ~primeiro].reset_index(drop=True))
+
+
+def test_ticker_novo_e_removido(planilha):
+    tickers = planilha["Ticker"].unique()
+    _conferir(planilha[planilha["Ticker"] != tickers[0]], planilha[planilha["Ticker"] != tickers[1]])
@@ -0,0 +1,112 @@
+# ==============================================================
+# 🧪 TESTES - ingestão dos zips DFP / ITR da CVM
+# ==============================================================
+# Zips pequenos montados em memória, no layout dos dados abertos da CVM.
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from cvm_indicators import ingestao
+
+RECEITA = "Receita de Venda de Bens e/ou Serviços"
+ATIVO = "Ativo Total"
+
+
+def _linha(conta, valor, dt_refer, ini=None, fim=None, ordem="ÚLTIMO", versao=1, cd_cvm=1234, descricao="conta"):
+    linha = {
+        "CNPJ_CIA": "00.000.000/0001-00", "DT_REFER": dt_refer, "VERSAO": versao,
+        "CD_CVM": cd_cvm, "DENOM_CIA": "EMPRESA TESTE SA", "GRUPO_DFP": "DF Consolidado",
+        "MOEDA": "REAL", "ESCALA_MOEDA": "MIL", "ORDEM_EXERC": ordem,
+        "DT_FIM_EXERC": fim or dt_refer, "CD_CONTA": conta, "DS_CONTA": descricao, "VL_CONTA": valor,
+    }
+    if ini is not None:
+        linha["DT_INI_EXERC"] = ini
+    return linha
+
+
+def _zip(caminho, tipo, ano, demonstracoes):
+    with zipfile.ZipFile(caminho, "w") as arquivo:
+        for demonstracao, linhas in demonstracoes.items():
+            csv = pd.DataFrame(linhas).to_csv(sep=";", index=False)
+            arquivo.writestr(f"{tipo}_cia_aberta_{demonstracao}_con_{ano}.csv", csv.encode(ingestao.ENCODING_CVM))
+    return str(caminho)
+
+
+def _ingerir(*caminhos):
+    return pd.concat(list(ingestao.ingerir_arquivos(caminhos)), ignore_index=True)
+
+
+def test_dfp_valores_anuais(tmp_path):
+    dfp = _zip(tmp_path / "dfp_cia_aberta_2023.zip", "dfp", 2023, {
+        "BPA": [_linha("1", 1000.0, "2023-12-31"), _linha("1", 900.0, "2023-12-31", ordem="PENÚLTIMO")],
+        "DRE": [_linha("3.01", 400.0, "2023-12-31", ini="2023-01-01")],
+    })
+    largo = _ingerir(dfp)
+    assert len(largo) == 1
+    assert largo.loc[0, "Versao"] == "DFP"
+    assert largo.loc[0, ATIVO] == 1000.0
+    assert largo.loc[0, RECEITA] == 400.0
+
+
+def test_itr_trimestre_e_acumulado_nao_viram_anual(tmp_path):
+    # Q3: mesma conta no trimestre (100) e no acumulado de 9 meses (300), ambos "ÚLTIMO"
+    itr = _zip(tmp_path / "itr_cia_aberta_2024.zip", "itr", 2024, {
+        "BPA": [_linha("1", 1200.0, "2024-09-30")],
+        "DRE": [
+            _linha("3.01", 100.0, "2024-09-30", ini="2024-07-01"),
+            _linha("3.01", 300.0, "2024-09-30", ini="2024-01-01"),
+        ],
+    })
+    largo = _ingerir(itr)
+    assert len(largo) == 1
+    assert largo.loc[0, "Versao"] == "ITR"
+    assert largo.loc[0, ATIVO] == 1200.0
+    assert np.isnan(largo.loc[0, RECEITA])
+
+
+def test_dfp_prevalece_sobre_itr_do_mesmo_ano(tmp_path):
+    dfp = _zip(tmp_path / "dfp_cia_aberta_2023.zip", "dfp", 2023, {
+        "DRE": [_linha("3.01", 400.0, "2023-12-31", ini="2023-01-01")],
+    })
+    itr = _zip(tmp_path / "itr_cia_aberta_2023.zip", "itr", 2023, {
+        "DRE": [_linha("3.01", 300.0, "2023-09-30", ini="2023-01-01")],
+    })
+    largo = ingestao.pivotar(pd.concat(
+        list(ingestao.ler_contas(dfp)) + list(ingestao.ler_contas(itr)), ignore_index=True
+    ))
+    assert largo["Versao"].tolist() == ["DFP"]
+    assert largo.loc[0, RECEITA] == 400.0
+
+
+def test_ultima_versao_do_documento(tmp_path):
+    dfp = _zip(tmp_path / "dfp_cia_aberta_2023.zip", "dfp", 2023, {
+        "DRE": [
+            _linha("3.01", 400.0, "2023-12-31", ini="2023-01-01", versao=1),
+            _linha("3.01", 410.0, "2023-12-31", ini="2023-01-01", versao=2),
+        ],
+    })
+    assert _ingerir(dfp).loc[0, RECEITA] == 410.0
+
+
+def test_conta_repetida_fica_vazia_sem_parar_as_demais(tmp_path, caplog):
+    # Empresa 1: duas linhas 6.03.xx com a mesma descrição; empresa 2: normal
+    dividendos = "Pagamento de Dividendos"
+    dfp = _zip(tmp_path / "dfp_cia_aberta_2023.zip", "dfp", 2023, {
+        "DRE": [
+            _linha("3.01", 400.0, "2023-12-31", ini="2023-01-01", cd_cvm=1),
+            _linha("3.01", 500.0, "2023-12-31", ini="2023-01-01", cd_cvm=2),
+        ],
+        "DFC_MI": [
+            _linha("6.03.02", -10.0, "2023-12-31", ini="2023-01-01", cd_cvm=1, descricao=dividendos),
+            _linha("6.03.05", -30.0, "2023-12-31", ini="2023-01-01", cd_cvm=1, descricao=dividendos),
+            _linha("6.03.02", -20.0, "2023-12-31", ini="2023-01-01", cd_cvm=2, descricao=dividendos),
+        ],
+    })
+    with caplog.at_level("WARNING", logger="cvm_indicators.ingestao"):
+        largo = _ingerir(dfp).set_index("CD_CVM")
+    assert "repetida" in caplog.text
+    assert largo.loc[1, RECEITA] == 400.0
+    assert np.isnan(largo.loc[1, dividendos])
+    assert largo.loc[2, RECEITA] == 500.0
+    assert largo.loc[2, dividendos] == -20.0
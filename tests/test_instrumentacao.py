@@ -0,0 +1,72 @@
+# ==============================================================
+# 🧪 TESTES - instrumentação (tracemalloc compartilhado entre sessões)
+# ==============================================================
+import threading
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from cvm_indicators import instrumentacao
+
+
+class RerunInterrompido(Exception):
+    """Faz o papel da exceção de rerun/st.stop() do Streamlit."""
+
+
+@pytest.fixture(autouse=True)
+def sem_tracemalloc():
+    assert not tracemalloc.is_tracing()
+    yield
+    assert instrumentacao._sessoes_tracemalloc == 0
+    assert not tracemalloc.is_tracing()
+
+
+def test_rerun_interrompido_desliga_tracemalloc():
+    medicao = instrumentacao.iniciar(memoria=True)
+    with pytest.raises(RerunInterrompido):
+        with instrumentacao.secao("externa"):
+            with instrumentacao.secao("interna"):
+                assert tracemalloc.is_tracing()
+                raise RerunInterrompido
+    # finalizar() nunca é chamado: o script parou antes do fim
+    assert [r["secao"] for r in medicao.secoes] == ["interna", "externa"]
+    instrumentacao.iniciar(ativo=False)
+
+
+def test_tracemalloc_so_durante_secoes():
+    medicao = instrumentacao.Instrumentacao(memoria=True)
+    assert not tracemalloc.is_tracing()
+    with medicao.secao("s"):
+        assert tracemalloc.is_tracing()
+        bloco = np.ones(1_000_000)
+        del bloco
+    medicao.finalizar()
+    assert medicao.secoes[0]["pico_bytes"] >= 8_000_000
+
+
+def test_pico_zerado_por_outra_sessao_e_descartado():
+    a, b = instrumentacao.Instrumentacao(), instrumentacao.Instrumentacao()
+    with a.secao("externa"):
+        with a.secao("interna"):
+            bloco = np.ones(1_000_000)
+            with b.secao("outra sessão"):  # reset_peak no meio das seções de a
+                pass
+            del bloco
+    assert [("pico_bytes" in r) for r in a.secoes] == [False, False]
+    assert "pico_bytes" in b.secoes[0]
+
+
+def test_sessoes_concorrentes():
+    def sessao():
+        for _ in range(100):
+            medicao = instrumentacao.Instrumentacao(memoria=True)
+            with medicao.secao("s"):
+                np.ones(1000)
+            medicao.finalizar()
+
+    threads = [threading.Thread(target=sessao) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
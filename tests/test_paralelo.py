@@ -0,0 +1,32 @@
+# ==============================================================
+# 🧪 TESTES - cálculo paralelo contra calcular_indicadores
+# ==============================================================
+import numpy as np
+import pandas as pd
+
+from benchmarks.sintetico import gerar
+from cvm_indicators.indicadores import calcular_indicadores
+from cvm_indicators.paralelo import calcular_indicadores_paralelo
+
+
+def _ordenado(df):
+    return df.sort_values(["Ticker", "Ano"]).reset_index(drop=True)
+
+
+def test_paralelo_igual_ao_serial():
+    # Linhas embaralhadas e um Ticker nulo: shards por Ticker não podem mudar o resultado
+    df = gerar(n_tickers=60, n_anos=6, n_setores=5, seed=7)
+    df = df.sample(frac=1.0, random_state=1).reset_index(drop=True)
+    df.loc[3, "Ticker"] = np.nan
+    serial = calcular_indicadores(df)
+    paralelo = calcular_indicadores_paralelo(df, workers=2, shards=7)
+    pd.testing.assert_frame_equal(_ordenado(paralelo), _ordenado(serial))
+
+
+def test_paralelo_subconjunto_de_indicadores():
+    df = gerar(n_tickers=30, n_anos=5, n_setores=3, seed=2)
+    alvos = ["ROE", "wacc", "Lucro Econômico 1"]
+    pd.testing.assert_frame_equal(
+        _ordenado(calcular_indicadores_paralelo(df, alvos, workers=2)),
+        _ordenado(calcular_indicadores(df, alvos)),
+    )
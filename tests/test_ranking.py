@@ -0,0 +1,69 @@
+# ==============================================================
+# 🧪 TESTES - rankings pré-ordenados contra nlargest/nsmallest
+# ==============================================================
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.sintetico import gerar
+from cvm_indicators.indicadores import calcular_indicadores
+from cvm_indicators.ranking import IndiceRanking
+
+RANKINGS = {
+    "ROE": ("ROE", []),
+    "Lucro": ("Lucro/Prejuízo Consolidado do Período", []),
+    "Rentabilidade": ("ROE", ["ROA", "ROI"]),
+}
+
+
+@pytest.fixture(scope="module")
+def df():
+    df = calcular_indicadores(gerar(n_tickers=80, n_anos=4, n_setores=5, seed=11))
+    # Valores arredondados: empates seguem a ordem das linhas (keep="first")
+    df["ROE"] = df["ROE"].round(1)
+    df.loc[df.sample(frac=0.1, random_state=0).index, "SETOR_ATIV"] = np.nan
+    return df
+
+
+@pytest.fixture(scope="module")
+def indice(df):
+    return IndiceRanking(df, RANKINGS, por_setor=True)
+
+
+def _esperado(df, ano, nome, n, ascendente, setor=None):
+    coluna, obrigatorias = RANKINGS[nome]
+    recorte = df[df["Ano"] == ano]
+    if setor is not None:
+        recorte = recorte[recorte["SETOR_ATIV"] == setor]
+    recorte = recorte.dropna(subset=[coluna, *obrigatorias])
+    return recorte.nsmallest(n, coluna) if ascendente else recorte.nlargest(n, coluna)
+
+
+@pytest.mark.parametrize("nome", list(RANKINGS))
+@pytest.mark.parametrize("ascendente", [False, True])
+@pytest.mark.parametrize("n", [1, 10, 1000])
+def test_top_igual_a_nlargest(df, indice, nome, ascendente, n):
+    for ano in df["Ano"].unique():
+        pd.testing.assert_frame_equal(
+            indice.top(ano, nome, n, ascendente=ascendente), _esperado(df, ano, nome, n, ascendente)
+        )
+        for setor in df["SETOR_ATIV"].dropna().unique():
+            pd.testing.assert_frame_equal(
+                indice.top(ano, nome, n, ascendente=ascendente, setor=setor),
+                _esperado(df, ano, nome, n, ascendente, setor),
+            )
+
+
+def test_ano_ou_setor_ausente(indice):
+    assert indice.top(1900, "ROE", 5).empty
+    assert indice.top(2010, "ROE", 5, setor="Setor inexistente").empty
+
+
+def test_ano_int16():
+    # Ano lido de um frame compactado (int16): ano × 20 setores passa de 32767
+    df = calcular_indicadores(gerar(n_tickers=60, n_anos=2, n_setores=20, seed=4))
+    indice = IndiceRanking(df, RANKINGS, por_setor=True)
+    ano, setor = df["Ano"].max(), df["SETOR_ATIV"].iloc[0]
+    pd.testing.assert_frame_equal(
+        indice.top(np.int16(ano), "ROE", 5, setor=setor), _esperado(df, ano, "ROE", 5, False, setor)
+    )
@@ -0,0 +1,45 @@
+# ==============================================================
+# 🧪 TESTES - snapshot e atualização em segundo plano
+# ==============================================================
+import os
+
+import numpy as np
+
+from benchmarks.sintetico import gerar
+from cvm_indicators import particoes, snapshot
+from cvm_indicators.atualizacao import Atualizador
+
+
+def test_linhas_sem_ticker_ou_ano_sao_descartadas(tmp_path):
+    df = gerar(n_tickers=20, n_anos=4, n_setores=3)
+    df.loc[5, "Ticker"] = None
+    df.loc[9, "Ano"] = np.nan
+    df.to_parquet(tmp_path / "planilha.parquet")
+
+    atualizador = Atualizador(str(tmp_path / "planilha.parquet"), tmp_path / "cache")
+    versao = atualizador.versao()
+    assert versao["manifesto"]["linhas_sem_chave"] == 2
+    assert particoes.anos_disponiveis(versao["particoes"]) == [2010, 2011, 2012, 2013]
+    derivado = snapshot.ler_indicadores(versao["particoes"])
+    assert len(derivado) == len(df) - 2
+    assert derivado["Ticker"].notna().all()
+
+
+def test_versao_anterior_fica_em_disco(tmp_path):
+    caminho = str(tmp_path / "planilha.parquet")
+    cache = tmp_path / "cache"
+    gerar(n_tickers=20, n_anos=4, n_setores=3).to_parquet(caminho)
+    snapshot.construir_snapshot(caminho, cache)
+    primeira = snapshot.diretorio_particoes(caminho, cache)
+
+    gerar(n_tickers=20, n_anos=5, n_setores=3).to_parquet(caminho)
+    snapshot.construir_snapshot(caminho, cache)
+    segunda = snapshot.diretorio_particoes(caminho, cache)
+    # Um app que ainda serve a primeira versão continua lendo as partições dela
+    assert segunda != primeira
+    assert len(particoes.ler_particoes(primeira)) == 80
+
+    gerar(n_tickers=20, n_anos=6, n_setores=3).to_parquet(caminho)
+    snapshot.construir_snapshot(caminho, cache, remover_anterior=True)
+    assert not os.path.exists(segunda)
+    assert len(particoes.ler_particoes(snapshot.diretorio_particoes(caminho, cache))) == 120